@@ -9,11 +9,13 @@ https://docs.djangoproject.com/en/5.1/topics/settings/
 For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.1/ref/settings/
 """
+import importlib.util
 import os
 from pathlib import Path
 import environ
 import dj_database_url
 from . import settings
+from django.core.exceptions import ImproperlyConfigured
 from django.utils.timezone import timedelta
 
 env = environ.Env()
@@ -50,6 +52,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover every other middleware
+    'features.instrumentation.instrumentation_middleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -57,7 +61,6 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    'features.views.session_authentication_middleware',
 ]
 
 ROOT_URLCONF = 'backend.urls'
@@ -79,13 +82,53 @@ TEMPLATES = [
 ]
 
 REST_FRAMEWORK = {
+    # Students and providers are not Django users, so tokens are trusted on their
+    # signature alone and never looked up in the database
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'rest_framework_simplejwt.authentication.JWTStatelessUserAuthentication',
+    ),
+    # orjson-backed when orjson is installed, DRF's stdlib encoder/decoder otherwise
+    'DEFAULT_RENDERER_CLASSES': (
+        'features.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+    'DEFAULT_PARSER_CLASSES': (
+        'features.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ),
-    
 }
 
-SESSION_ENGINE = 'django.contrib.sessions.backends.db'
+# Response cache for the public scholarship endpoints. Local memory by default;
+# set REDIS_URL (requires the `redis` package) to share it between workers
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+if env('REDIS_URL', default=None):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': env('REDIS_URL'),
+    }
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 300  # seconds
+
+# Session storage, chosen with SESSION_BACKEND. `cache` needs a cache shared by all
+# workers (REDIS_URL) and loses sessions on eviction; `signed_cookies` keeps nothing
+# server side. Compare them with `manage.py benchmark_auth`
+SESSION_ENGINES = {
+    'db': 'django.contrib.sessions.backends.db',
+    'cached_db': 'django.contrib.sessions.backends.cached_db',
+    'cache': 'django.contrib.sessions.backends.cache',
+    'signed_cookies': 'django.contrib.sessions.backends.signed_cookies',
+}
+SESSION_BACKEND = env('SESSION_BACKEND', default='db')
+if SESSION_BACKEND not in SESSION_ENGINES:
+    raise ImproperlyConfigured(
+        f"SESSION_BACKEND must be one of {', '.join(SESSION_ENGINES)}, not {SESSION_BACKEND!r}"
+    )
+SESSION_ENGINE = SESSION_ENGINES[SESSION_BACKEND]
 SESSION_COOKIE_AGE = 86400  # 1 day in seconds
 SESSION_COOKIE_SECURE = True  # Use only with HTTPS
 SESSION_COOKIE_HTTPONLY = True
@@ -97,6 +140,39 @@ JWT_SECRET_KEY = settings.SECRET_KEY
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_DELTA = timedelta(days=1)
 
+SIMPLE_JWT = {
+    'ACCESS_TOKEN_LIFETIME': timedelta(minutes=30),
+    'REFRESH_TOKEN_LIFETIME': JWT_EXPIRATION_DELTA,
+    'ALGORITHM': JWT_ALGORITHM,
+    'SIGNING_KEY': JWT_SECRET_KEY,
+    'UPDATE_LAST_LOGIN': False,
+}
+
+# Also accept (and set at login) the session-based login used before tokens.
+# Turn off once every client sends bearer tokens to skip session reads entirely
+AUTH_SESSION_FALLBACK = env.bool('AUTH_SESSION_FALLBACK', default=True)
+
+
+# Seconds between scholarship expiry runs inside each web server process (started by
+# backend/wsgi.py and asgi.py, never by management commands); leave unset when
+# `manage.py expire_scholarships` is scheduled externally (e.g. cron)
+SCHOLARSHIP_EXPIRY_INTERVAL = env.int('SCHOLARSHIP_EXPIRY_INTERVAL', default=None)
+
+# How stale (seconds) each process's recommendation feature table may get before it
+# re-reads the scholarships changed since its last refresh
+RECOMMENDATION_REFRESH_SECONDS = env.int('RECOMMENDATION_REFRESH_SECONDS', default=5)
+
+# How `manage.py send_notifications` delivers the outbox: console, file (NOTIFICATION_FILE,
+# one JSON object per line) or email (EMAIL_BACKEND)
+NOTIFICATION_SENDER = env('NOTIFICATION_SENDER', default='console')
+NOTIFICATION_FILE = env('NOTIFICATION_FILE', default=str(BASE_DIR / 'notifications.ndjson'))
+# Providers are reminded this many days before an active scholarship's deadline
+NOTIFICATION_DEADLINE_REMINDER_DAYS = env.int('NOTIFICATION_DEADLINE_REMINDER_DAYS', default=3)
+
+# Hours finished background jobs, and the export files they wrote, are kept before
+# `manage.py purge_jobs` deletes them; the download link of a job stops working then
+JOB_RETENTION_HOURS = env.int('JOB_RETENTION_HOURS', default=24)
+
 
 CSRF_COOKIE_SECURE = True  # for HTTPS
 CSRF_USE_SESSIONS = True
@@ -137,6 +213,35 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Password hashing policy. PASSWORD_HASHER picks the hasher for new and upgraded
+# hashes; the others stay listed so existing hashes still verify, and are re-hashed
+# on the next successful login. 'argon2' needs argon2-cffi, which is not in
+# requirements.txt, so Argon2 is only listed when it is installed
+PASSWORD_HASHER_CHOICES = {
+    'pbkdf2': 'features.hashers.PBKDF2PasswordHasher',
+    'argon2': 'features.hashers.Argon2PasswordHasher',
+    'scrypt': 'django.contrib.auth.hashers.ScryptPasswordHasher',
+}
+PASSWORD_HASHER = env('PASSWORD_HASHER', default='pbkdf2')
+if PASSWORD_HASHER not in PASSWORD_HASHER_CHOICES:
+    raise ImproperlyConfigured(
+        f"PASSWORD_HASHER must be one of {', '.join(PASSWORD_HASHER_CHOICES)}, not {PASSWORD_HASHER!r}"
+    )
+if importlib.util.find_spec('argon2') is None:
+    if PASSWORD_HASHER == 'argon2':
+        raise ImproperlyConfigured("PASSWORD_HASHER 'argon2' needs the argon2-cffi package")
+    del PASSWORD_HASHER_CHOICES['argon2']
+PASSWORD_HASHERS = [PASSWORD_HASHER_CHOICES[PASSWORD_HASHER]] + [
+    hasher for name, hasher in PASSWORD_HASHER_CHOICES.items() if name != PASSWORD_HASHER
+]
+PASSWORD_PBKDF2_ITERATIONS = env.int('PASSWORD_PBKDF2_ITERATIONS', default=870000)
+PASSWORD_ARGON2_TIME_COST = env.int('PASSWORD_ARGON2_TIME_COST', default=2)
+PASSWORD_ARGON2_MEMORY_COST = env.int('PASSWORD_ARGON2_MEMORY_COST', default=102400)  # KiB
+PASSWORD_ARGON2_PARALLELISM = env.int('PASSWORD_ARGON2_PARALLELISM', default=8)
+# Threads hashing passwords at once for the async login/register views
+PASSWORD_HASH_WORKERS = env.int('PASSWORD_HASH_WORKERS', default=4)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.1/topics/i18n/
 
@@ -155,6 +260,14 @@ USE_TZ = True
 STATIC_URL = 'static/'
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
+# Uploaded application files. Point APPLICATION_UPLOAD_STORAGE at another STORAGES
+# alias to keep them somewhere other than MEDIA_ROOT
+MEDIA_URL = 'media/'
+MEDIA_ROOT = env('MEDIA_ROOT', default=str(BASE_DIR / 'media'))
+APPLICATION_UPLOAD_STORAGE = 'default'
+APPLICATION_UPLOAD_MAX_SIZE_MB = 10
+APPLICATION_UPLOAD_ALLOWED_EXTENSIONS = ['.pdf', '.doc', '.docx', '.txt', '.png', '.jpg', '.jpeg']
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
 
@@ -173,8 +286,20 @@ LOGGING = {
         'handlers': ['console'],
         'level': 'INFO',
     },
+    'loggers': {
+        # One JSON line per request: DEBUG for every request, INFO for requests slower than
+        # SLOW_REQUEST_MS, WARNING for those that ran a query slower than SLOW_QUERY_MS
+        'features.instrumentation': {
+            'level': env('REQUEST_LOG_LEVEL', default='INFO'),
+        },
+    },
 }
 
+# Queries at least this slow (ms) are sampled into the request log and counted in /metrics/
+SLOW_QUERY_MS = env.int('SLOW_QUERY_MS', default=100)
+# Requests at least this slow (ms) are logged at INFO; the rest only at DEBUG
+SLOW_REQUEST_MS = env.int('SLOW_REQUEST_MS', default=500)
+
 # Security settings for production
 SECURE_SSL_REDIRECT = True
 SECURE_PROXY_SSL_HEADER = ('HTTP_X_FORWARDED_PROTO', 'https')
\ No newline at end of file
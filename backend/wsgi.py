@@ -14,3 +14,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Optional in-process alternative to running the expire_scholarships command on a schedule
+from features.expiry import start_configured_runner  # noqa: E402
+
+start_configured_runner()
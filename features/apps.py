@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class FeaturesConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'features'
+
+    def ready(self):
+        from . import instrumentation, signals, tasks  # noqa: F401
+
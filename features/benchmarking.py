@@ -0,0 +1,53 @@
+import statistics
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, setup_test_environment, teardown_test_environment
+
+
+@contextmanager
+def benchmark_environment():
+    """
+    Run the block against a throwaway test database, as the test runner does,
+    so benchmarks never touch real data.
+    """
+    setup_test_environment()
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def measure(send, iterations):
+    """
+    Call ``send()`` ``iterations`` times and summarize latency (ms), queries and throughput.
+    """
+    timings, query_counts = [], []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as queries:
+            request_started = time.perf_counter()
+            send()
+            timings.append((time.perf_counter() - request_started) * 1000)
+        query_counts.append(len(queries))
+    elapsed = time.perf_counter() - started
+
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'p50': cuts[49],
+        'p95': cuts[94],
+        'p99': cuts[98],
+        'mean': statistics.fmean(timings),
+        'queries': statistics.fmean(query_counts),
+        'throughput': iterations / elapsed,
+    }
+
+
+def format_result(name, result):
+    return (
+        f"{name:<32} p50 {result['p50']:7.2f}ms  p95 {result['p95']:7.2f}ms  p99 {result['p99']:7.2f}ms  "
+        f"{result['queries']:5.1f} queries  {result['throughput']:8.1f} req/s"
+    )
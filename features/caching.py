@@ -0,0 +1,139 @@
+import hashlib
+import json
+import threading
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import HttpResponseNotModified
+from django.utils.http import parse_etags, quote_etag
+
+from .renderers import json_response
+
+# Cache scopes: every cached response is built under the current version of its scopes,
+# and invalidating a scope gives it a new version so those responses are never read again
+SCHOLARSHIP_LIST = 'scholarship-list'
+
+_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def scholarship_scope(scholarship_id):
+    return f'scholarship:{scholarship_id}'
+
+
+def get_cache():
+    return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _version_key(scope):
+    return f'response-cache:version:{scope}'
+
+
+def invalidate(*scopes):
+    if scopes:
+        get_cache().set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, timeout=None)
+
+
+def _versions(cache, scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            # add() keeps whichever version another process stored first
+            cache.add(key, uuid.uuid4().hex, timeout=None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+async def _aversions(cache, scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, uuid.uuid4().hex, timeout=None)
+            versions[key] = await cache.aget(key)
+    return [versions[key] for key in keys]
+
+
+def _entry_key(name, params, versions):
+    key_source = json.dumps([name, params, versions], sort_keys=True)
+    return f'response-cache:{name}:{hashlib.md5(key_source.encode()).hexdigest()}'
+
+
+def _make_entry(value):
+    body = json.dumps(value, cls=DjangoJSONEncoder, sort_keys=True)
+    return value, quote_etag(hashlib.md5(body.encode()).hexdigest())
+
+
+def _timeout(value, max_age):
+    timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 300)
+    seconds = max_age(value) if max_age else None
+    # A timeout of 0 stores nothing
+    return timeout if seconds is None else max(0, min(timeout, int(seconds)))
+
+
+def _record(name, hit):
+    with _stats_lock:
+        _stats[(name, 'hits' if hit else 'misses')] += 1
+
+
+def stats():
+    with _stats_lock:
+        counts = dict(_stats)
+    names = sorted({name for name, _ in counts})
+    return {
+        name: {'hits': counts.get((name, 'hits'), 0), 'misses': counts.get((name, 'misses'), 0)}
+        for name in names
+    }
+
+
+def get_or_build(name, scopes, params, build, max_age=None):
+    """
+    Return ``(value, etag, hit)`` for the response ``name`` with request ``params``,
+    calling ``build()`` on a miss. ``value`` must be JSON serializable.
+    ``max_age(value)`` may return the seconds a built value stays valid, for values
+    that go stale with time rather than through a scope; None keeps the usual timeout.
+    """
+    cache = get_cache()
+    key = _entry_key(name, params, _versions(cache, scopes))
+
+    entry = cache.get(key)
+    hit = entry is not None
+    _record(name, hit)
+    if not hit:
+        entry = _make_entry(build())
+        cache.set(key, entry, _timeout(entry[0], max_age))
+    return entry[0], entry[1], hit
+
+
+async def aget_or_build(name, scopes, params, build, max_age=None):
+    """
+    Async version of get_or_build; ``build`` is a coroutine function.
+    """
+    cache = get_cache()
+    key = _entry_key(name, params, await _aversions(cache, scopes))
+
+    entry = await cache.aget(key)
+    hit = entry is not None
+    _record(name, hit)
+    if not hit:
+        entry = _make_entry(await build())
+        await cache.aset(key, entry, _timeout(entry[0], max_age))
+    return entry[0], entry[1], hit
+
+
+def cached_response(request, data, etag, hit):
+    """
+    Response for cached data, or an empty 304 if the client already has this ETag.
+    """
+    if_none_match = parse_etags(request.headers.get('If-None-Match', ''))
+    if etag in if_none_match or '*' in if_none_match:
+        response = HttpResponseNotModified()
+    else:
+        response = json_response(data)
+    response['ETag'] = etag
+    response['X-Cache'] = 'HIT' if hit else 'MISS'
+    return response
@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.db.models import F
+from django.utils import timezone
+
+from . import caching
+from .models import Scholarship
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def _update_in_batches(queryset, new_status, now, batch_size):
+    # Pick a batch of ids through the (status, deadline) index, then flip them with one UPDATE.
+    # The filter is repeated in the UPDATE so rows changed in between are left alone.
+    total = 0
+    while True:
+        ids = list(queryset.values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return total
+        changed = queryset.filter(id__in=ids).update(status=new_status, updated_at=now)
+        if changed:
+            caching.invalidate(caching.SCHOLARSHIP_LIST, *[caching.scholarship_scope(pk) for pk in ids])
+        total += changed
+        if len(ids) < batch_size:
+            return total
+
+
+def expire_due_scholarships(now=None, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Expire every scholarship whose deadline has passed and close every active
+    scholarship that has reached max_applications.
+    Returns a dict with the number of rows expired and closed and the elapsed time in ms.
+    """
+    now = now or timezone.now()
+    started = time.perf_counter()
+
+    expired = _update_in_batches(
+        Scholarship.objects.filter(status__in=['DRAFT', 'ACTIVE', 'CLOSED'], deadline__lt=now),
+        'EXPIRED', now, batch_size
+    )
+    closed = _update_in_batches(
+        Scholarship.objects.filter(status='ACTIVE', current_applicants__gte=F('max_applications')),
+        'CLOSED', now, batch_size
+    )
+
+    return {
+        'expired': expired,
+        'closed': closed,
+        'elapsed_ms': round((time.perf_counter() - started) * 1000, 2),
+    }
+
+
+def start_expiry_runner(interval, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Run expire_due_scholarships every ``interval`` seconds in a daemon thread.
+    Safe to start in several processes at once: each run only touches rows that are still due.
+    """
+    def run():
+        while True:
+            try:
+                result = expire_due_scholarships(batch_size=batch_size)
+                if result['expired'] or result['closed']:
+                    logger.info('Scholarship expiry: %(expired)d expired, %(closed)d closed in %(elapsed_ms)sms', result)
+            except DatabaseError:
+                logger.exception('Scholarship expiry run failed')
+            time.sleep(interval)
+
+    thread = threading.Thread(target=run, name='scholarship-expiry', daemon=True)
+    thread.start()
+    return thread
+
+
+def start_configured_runner():
+    """
+    Start the expiry runner if SCHOLARSHIP_EXPIRY_INTERVAL is set. Called from the WSGI and
+    ASGI entrypoints only, so management commands (migrate, test, the workers) never start it.
+    """
+    interval = getattr(settings, 'SCHOLARSHIP_EXPIRY_INTERVAL', None)
+    if interval:
+        return start_expiry_runner(interval)
+    return None
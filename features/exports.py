@@ -0,0 +1,156 @@
+import csv
+import io
+import json
+
+from .models import ApplicationFormField, ScholarshipApplication
+from .renderers import dumps
+from .rows import datetime_field
+
+# Rows fetched per round trip through the database cursor, and written per streamed chunk
+CHUNK_SIZE = 2000
+
+RECORD_COLUMNS = [
+    'application_id', 'student_id', 'first_name', 'last_name', 'email', 'education_level',
+    'status', 'submitted_at', 'reviewed_at', 'review_notes',
+]
+EXPORT_VALUES = (
+    'id', 'student_id', 'student__firstName', 'student__lastName', 'student__email', 'student__educationLevel',
+    'status', 'submitted_at', 'reviewed_at', 'review_notes', 'responses', 'files',
+)
+
+
+def _form_fields(scholarship):
+    return ApplicationFormField.objects.filter(scholarship=scholarship).values_list('id', 'label')
+
+
+def _applications(scholarship):
+    return ScholarshipApplication.objects.filter(
+        scholarship=scholarship
+    ).order_by('submitted_at', 'id').values(*EXPORT_VALUES)
+
+
+def form_columns(fields):
+    """
+    ``(field id, column name)`` for each ``(id, label)`` form field, named by label.
+    Repeated labels get a number so every column name is unique.
+    """
+    columns, seen = [], set(RECORD_COLUMNS)
+    for field_id, label in fields:
+        name, suffix = label, 2
+        while name in seen:
+            name, suffix = f'{label} ({suffix})', suffix + 1
+        seen.add(name)
+        columns.append((str(field_id), name))
+    return columns
+
+
+def _answers(value):
+    # Rows written before submissions were validated may hold something other than an object
+    return value if isinstance(value, dict) else {}
+
+
+def _record(row, columns):
+    answers = {**_answers(row['responses']), **_answers(row['files'])}
+    return {
+        'application_id': row['id'],
+        'student_id': row['student_id'],
+        'first_name': row['student__firstName'],
+        'last_name': row['student__lastName'],
+        'email': row['student__email'],
+        'education_level': row['student__educationLevel'],
+        'status': row['status'],
+        'submitted_at': datetime_field(row['submitted_at']),
+        'reviewed_at': datetime_field(row['reviewed_at']),
+        'review_notes': row['review_notes'],
+    }, {name: answers.get(field_id) for field_id, name in columns}
+
+
+# Spreadsheets run a cell starting with one of these as a formula, so such text is
+# written with a leading quote to keep it text
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def _csv_text(value):
+    return "'" + value if value.startswith(FORMULA_PREFIXES) else value
+
+
+def _csv_value(value):
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        return _csv_text(json.dumps(value, ensure_ascii=False))
+    if isinstance(value, str):
+        return _csv_text(value)
+    return value
+
+
+def _csv_lines(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue().encode()
+
+
+class CSVExport:
+    content_type = 'text/csv; charset=utf-8'
+
+    @staticmethod
+    def header(columns):
+        return _csv_lines([RECORD_COLUMNS + [_csv_text(name) for _, name in columns]])
+
+    @staticmethod
+    def chunk(records):
+        return _csv_lines([
+            [_csv_value(value) for value in (*record.values(), *answers.values())]
+            for record, answers in records
+        ])
+
+
+class NDJSONExport:
+    # One object per application, with its form answers under ``responses`` keyed by label
+    content_type = 'application/x-ndjson'
+
+    @staticmethod
+    def header(columns):
+        return b''
+
+    @staticmethod
+    def chunk(records):
+        return b''.join(dumps({**record, 'responses': answers}) + b'\n' for record, answers in records)
+
+
+EXPORT_FORMATS = {'csv': CSVExport, 'ndjson': NDJSONExport}
+
+
+def stream_export(scholarship, export):
+    """
+    Yield a scholarship's applications in ``export`` format, CHUNK_SIZE rows per chunk.
+    iterator() reads through a server-side cursor where the database has one, so memory
+    use stays flat however many applications there are.
+    """
+    columns = form_columns(_form_fields(scholarship))
+    yield export.header(columns)
+    records = []
+    for row in _applications(scholarship).iterator(chunk_size=CHUNK_SIZE):
+        records.append(_record(row, columns))
+        if len(records) == CHUNK_SIZE:
+            yield export.chunk(records)
+            records = []
+    if records:
+        yield export.chunk(records)
+
+
+async def astream_export(scholarship, export):
+    """
+    Async version of stream_export. ASGI servers need an async iterator to stream;
+    given a sync one, Django reads it into memory first.
+    """
+    columns = form_columns([field async for field in _form_fields(scholarship)])
+    yield export.header(columns)
+    records = []
+    async for row in _applications(scholarship).aiterator(chunk_size=CHUNK_SIZE):
+        records.append(_record(row, columns))
+        if len(records) == CHUNK_SIZE:
+            yield export.chunk(records)
+            records = []
+    if records:
+        yield export.chunk(records)
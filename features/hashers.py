@@ -0,0 +1,71 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.contrib.auth.hashers import check_password, make_password
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with the work factor taken from PASSWORD_PBKDF2_ITERATIONS.
+    Hashes made with a different iteration count are upgraded on the next login.
+    """
+    @property
+    def iterations(self):
+        return settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """
+    Django's Argon2 hasher (needs argon2-cffi) with costs from PASSWORD_ARGON2_* settings.
+    """
+    @property
+    def time_cost(self):
+        return settings.PASSWORD_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.PASSWORD_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.PASSWORD_ARGON2_PARALLELISM
+
+
+# Hashing is CPU bound; hashlib and argon2 release the GIL, so a small pool lets
+# several logins hash at once without starving the threads that serve other requests
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix='password-hash'
+)
+
+
+async def run_hasher(func, *args):
+    """
+    Run a password hashing function in the bounded hashing pool, off the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hash_executor, functools.partial(func, *args))
+
+
+def verify_password(raw_password, encoded):
+    """
+    Check a password and, if its hash no longer matches the hasher policy, make the
+    replacement hash. Returns ``(is_correct, new_encoded_or_None)``.
+    """
+    upgraded = []
+    is_correct = check_password(raw_password, encoded, setter=lambda raw: upgraded.append(make_password(raw)))
+    return is_correct, upgraded[0] if upgraded else None
+
+
+async def acheck_user_password(user, raw_password):
+    """
+    Check a student's or provider's password in the hashing pool and store an
+    upgraded hash when the hasher policy has changed. The login views go through this.
+    """
+    is_correct, upgraded = await run_hasher(verify_password, raw_password, user.password)
+    if upgraded:
+        user.password = upgraded
+        await type(user).objects.filter(pk=user.pk).aupdate(password=upgraded)
+    return is_correct
@@ -0,0 +1,222 @@
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.decorators import sync_and_async_middleware
+
+from . import caching
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'scholarhive'
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+HISTOGRAMS = {
+    'request_duration_seconds': ('Wall time spent handling a request.', DURATION_BUCKETS),
+    'db_queries': ('Database queries run by a request.', QUERY_BUCKETS),
+    'db_duration_seconds': ('Time a request spent waiting on the database.', DURATION_BUCKETS),
+    'response_size_bytes': ('Size of a response body.', SIZE_BUCKETS),
+}
+# Slow queries kept per request for its log line
+MAX_SLOW_QUERY_SAMPLES = 5
+MAX_SAMPLE_SQL_LENGTH = 500
+
+# The metrics of the request being handled; context variables follow the request
+# into the threads that sync_to_async runs ORM calls on
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+_lock = threading.Lock()
+_histograms = {}  # (metric, view) -> bucket counts followed by the sum and the count
+_counters = Counter()  # (metric, labels) -> value
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.slow_queries = []
+
+    def add_query(self, sql, seconds):
+        self.queries += 1
+        self.db_seconds += seconds
+        if seconds * 1000 >= settings.SLOW_QUERY_MS:
+            self.slow_queries.append((sql, seconds))
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(sql, time.perf_counter() - started)
+
+
+def instrument_connection(connection, **kwargs):
+    """
+    Time every query run on ``connection``. Connected to connection_created, so each
+    thread's connection is instrumented when it opens.
+    """
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+connection_created.connect(instrument_connection)
+
+
+def _observe(metric, view, value):
+    buckets = HISTOGRAMS[metric][1]
+    key = (metric, view)
+    if key not in _histograms:
+        _histograms[key] = [0] * (len(buckets) + 2)
+    counts = _histograms[key]
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            counts[index] += 1
+    counts[-2] += value
+    counts[-1] += 1
+
+
+def _finish(request, response, metrics):
+    elapsed = time.perf_counter() - metrics.started
+    match = request.resolver_match
+    view = (match.url_name or match.view_name) if match else 'unmatched'
+    size = None if response.streaming else len(response.content)
+
+    with _lock:
+        _observe('request_duration_seconds', view, elapsed)
+        _observe('db_queries', view, metrics.queries)
+        _observe('db_duration_seconds', view, metrics.db_seconds)
+        if size is not None:
+            _observe('response_size_bytes', view, size)
+        _counters[('requests_total', (('view', view), ('method', request.method), ('status', str(response.status_code))))] += 1
+        if metrics.slow_queries:
+            _counters[('slow_queries_total', (('view', view),))] += len(metrics.slow_queries)
+
+    response['Server-Timing'] = (
+        f'db;dur={metrics.db_seconds * 1000:.2f};desc="{metrics.queries} queries", '
+        f'total;dur={elapsed * 1000:.2f}'
+    )
+
+    # Every request at DEBUG; INFO for slow requests and WARNING when slow queries were sampled
+    slowest = sorted(metrics.slow_queries, key=lambda sample: -sample[1])[:MAX_SLOW_QUERY_SAMPLES]
+    if slowest:
+        level = logging.WARNING
+    elif elapsed * 1000 >= settings.SLOW_REQUEST_MS:
+        level = logging.INFO
+    else:
+        level = logging.DEBUG
+    if not logger.isEnabledFor(level):
+        return response
+    logger.log(level, json.dumps({
+        'view': view,
+        'method': request.method,
+        'path': request.path,
+        'status': response.status_code,
+        'duration_ms': round(elapsed * 1000, 2),
+        'db_queries': metrics.queries,
+        'db_ms': round(metrics.db_seconds * 1000, 2),
+        'response_bytes': size,
+        'slow_queries': [
+            {'sql': sql[:MAX_SAMPLE_SQL_LENGTH], 'ms': round(seconds * 1000, 2)} for sql, seconds in slowest
+        ],
+    }))
+    return response
+
+
+@sync_and_async_middleware
+def instrumentation_middleware(get_response):
+    """
+    Record wall time, database queries and time, and response size for every request:
+    as a Server-Timing header, a JSON log line and the histograms behind the metrics endpoint.
+    """
+    if iscoroutinefunction(get_response):
+        async def middleware(request):
+            metrics = RequestMetrics()
+            token = _current.set(metrics)
+            try:
+                response = await get_response(request)
+            finally:
+                _current.reset(token)
+            return _finish(request, response, metrics)
+    else:
+        def middleware(request):
+            # Connections opened before this module was imported missed connection_created
+            for connection in connections.all(initialized_only=True):
+                instrument_connection(connection)
+            metrics = RequestMetrics()
+            token = _current.set(metrics)
+            try:
+                response = get_response(request)
+            finally:
+                _current.reset(token)
+            return _finish(request, response, metrics)
+
+    return middleware
+
+
+def _labels(pairs):
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def render_metrics():
+    """
+    Everything recorded by this process, in the Prometheus text exposition format.
+    """
+    with _lock:
+        histograms = {key: list(counts) for key, counts in _histograms.items()}
+        counters = dict(_counters)
+
+    lines = []
+    for metric, (description, buckets) in HISTOGRAMS.items():
+        name = f'{METRIC_PREFIX}_{metric}'
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+        for (recorded, view), counts in sorted(histograms.items()):
+            if recorded != metric:
+                continue
+            for bound, count in zip(buckets, counts):
+                lines.append(f'{name}_bucket{_labels([("view", view), ("le", bound)])} {count}')
+            lines.append(f'{name}_bucket{_labels([("view", view), ("le", "+Inf")])} {counts[-1]}')
+            lines.append(f'{name}_sum{_labels([("view", view)])} {counts[-2]}')
+            lines.append(f'{name}_count{_labels([("view", view)])} {counts[-1]}')
+
+    counter_help = {
+        'requests_total': 'Requests handled, by view, method and status.',
+        'slow_queries_total': 'Queries slower than SLOW_QUERY_MS, by view.',
+    }
+    by_metric = defaultdict(list)
+    for (metric, labels), value in sorted(counters.items()):
+        by_metric[metric].append((labels, value))
+    for metric, description in counter_help.items():
+        name = f'{METRIC_PREFIX}_{metric}'
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+        lines += [f'{name}{_labels(labels)} {value}' for labels, value in by_metric[metric]]
+
+    name = f'{METRIC_PREFIX}_response_cache_total'
+    lines += [f'# HELP {name} Response cache lookups, by response and result.', f'# TYPE {name} counter']
+    for response_name, counts in caching.stats().items():
+        for result, value in counts.items():
+            lines.append(f'{name}{_labels([("name", response_name), ("result", result)])} {value}')
+
+    return '\n'.join(lines) + '\n'
+
+
+def reset():
+    with _lock:
+        _histograms.clear()
+        _counters.clear()
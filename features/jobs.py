@@ -0,0 +1,230 @@
+import datetime
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable, NamedTuple
+
+import django
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .models import Job
+from .storage import get_storage
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_VISIBILITY_TIMEOUT = datetime.timedelta(minutes=5)
+DEFAULT_MAX_ATTEMPTS = 3
+# Delay before the first retry, doubled after every further failure up to MAX_BACKOFF
+BASE_BACKOFF = datetime.timedelta(seconds=10)
+MAX_BACKOFF = datetime.timedelta(minutes=30)
+
+
+class Task(NamedTuple):
+    func: Callable
+    cpu_bound: bool
+    # A running job not finished within this is assumed lost with its worker and run again
+    visibility_timeout: datetime.timedelta
+    max_attempts: int
+
+
+TASKS = {}
+
+
+def task(name, cpu_bound=False, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Register a function as a job task under ``name``. It is called with the job's
+    kwargs and must return something JSON serializable, which becomes the job's result.
+    ``cpu_bound`` tasks run in the worker's process pool, so they must be importable
+    module-level functions.
+    """
+    def register(func):
+        TASKS[name] = Task(func, cpu_bound, visibility_timeout, max_attempts)
+        return func
+    return register
+
+
+def enqueue(name, kwargs=None, priority=0, idempotency_key=None, owner=None):
+    """
+    Queue a run of task ``name``. Returns ``(job, created)``: when a job with the same
+    idempotency key already exists, that job is returned instead of queueing another.
+    ``owner`` is the Identity allowed to see the job through the API.
+    """
+    values = {
+        'task': name,
+        'kwargs': kwargs or {},
+        'priority': priority,
+        'max_attempts': TASKS[name].max_attempts,
+        'owner_type': owner.user_type if owner else '',
+        'owner_id': owner.user_id if owner else None,
+    }
+    if idempotency_key is None:
+        return Job.objects.create(**values), True
+    try:
+        with transaction.atomic():
+            return Job.objects.create(idempotency_key=idempotency_key, **values), True
+    except IntegrityError:
+        return Job.objects.get(idempotency_key=idempotency_key), False
+
+
+def backoff(attempts):
+    return min(BASE_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+
+
+def claim(limit, now=None):
+    """
+    Take up to ``limit`` due jobs, highest priority first, and mark them RUNNING until
+    their visibility timeout. Running jobs whose timeout ran out are due again, unless
+    they used up their attempts, in which case they are marked FAILED here.
+    """
+    now = now or timezone.now()
+    claimed, abandoned = [], []
+    with transaction.atomic():
+        due = Job.objects.filter(
+            status__in=['QUEUED', 'RUNNING'], available_at__lte=now
+        ).order_by('-priority', 'available_at', 'id').select_for_update(skip_locked=True)[:limit]
+        for job in due:
+            if job.status == 'RUNNING' and job.attempts >= job.max_attempts:
+                job.status, job.finished_at = 'FAILED', now
+                job.error = 'Visibility timeout ran out on the last attempt'
+                abandoned.append(job)
+                continue
+            task = TASKS.get(job.task)
+            job.status, job.started_at = 'RUNNING', now
+            job.attempts += 1
+            job.available_at = now + (task.visibility_timeout if task else DEFAULT_VISIBILITY_TIMEOUT)
+            claimed.append(job)
+        Job.objects.bulk_update(claimed + abandoned, ['status', 'started_at', 'attempts', 'available_at', 'finished_at', 'error'])
+    return claimed
+
+
+def finish(job, result=None, error=None):
+    """
+    Record the outcome of a claimed job: SUCCEEDED, QUEUED again after ``backoff``,
+    or FAILED once its attempts are used up. Returns False if the job's visibility
+    timeout ran out and another worker has taken it over, in which case nothing is saved.
+    """
+    now = timezone.now()
+    if error is None:
+        values = {'status': 'SUCCEEDED', 'result': result, 'error': '', 'finished_at': now}
+    elif job.attempts >= job.max_attempts:
+        values = {'status': 'FAILED', 'error': error, 'finished_at': now}
+    else:
+        values = {'status': 'QUEUED', 'error': error, 'available_at': now + backoff(job.attempts)}
+    for field, value in values.items():
+        setattr(job, field, value)
+    return Job.objects.filter(id=job.id, status='RUNNING', attempts=job.attempts).update(**values) == 1
+
+
+def _delete_result_files(results):
+    # Results of tasks that write a file, such as the exports, hold its storage path
+    storage = get_storage()
+    paths = [result['path'] for result in results if isinstance(result, dict) and 'path' in result]
+    for path in paths:
+        storage.delete(path)
+    return len(paths)
+
+
+def purge_finished(finished_before, batch_size=1000):
+    """
+    Delete jobs that SUCCEEDED or FAILED before ``finished_before``, with the files
+    they wrote, ``batch_size`` jobs at a time. Returns the number of jobs and files deleted.
+    """
+    deleted = {'jobs': 0, 'files': 0}
+    finished = Job.objects.filter(status__in=['SUCCEEDED', 'FAILED'], finished_at__lt=finished_before)
+    while True:
+        batch = list(finished.values_list('id', 'result')[:batch_size])
+        if not batch:
+            return deleted
+        deleted['files'] += _delete_result_files([result for _, result in batch])
+        deleted['jobs'] += Job.objects.filter(id__in=[pk for pk, _ in batch]).delete()[0]
+
+
+def _error(e):
+    return f'{type(e).__name__}: {e}'[:1000]
+
+
+class Worker:
+    """
+    Runs claimed jobs: cpu_bound tasks in a pool of ``processes`` processes, the rest
+    (mostly waiting on the database or storage) in the worker's own thread while the
+    pool works. With ``processes=0`` every task runs in the worker's thread.
+    """
+
+    def __init__(self, processes=0, batch_size=None):
+        self.processes = processes
+        self.batch_size = batch_size or max(processes, 1)
+        self.pool = self._make_pool()
+
+    def _make_pool(self):
+        if not self.processes:
+            return None
+        # Fresh interpreters rather than forks, so no database connection is shared with the worker
+        return ProcessPoolExecutor(
+            self.processes, mp_context=multiprocessing.get_context('spawn'), initializer=django.setup
+        )
+
+    def _finish(self, job, result, error, counts):
+        if not finish(job, result, error):
+            logger.warning('Job %d was taken over by another worker; its result is dropped', job.id)
+            _delete_result_files([result])
+        elif error is None:
+            counts['succeeded'] += 1
+        elif job.status == 'FAILED':
+            counts['failed'] += 1
+            logger.warning('Job %d (%s) failed after %d attempts: %s', job.id, job.task, job.attempts, error)
+        else:
+            counts['retried'] += 1
+
+    def run_once(self):
+        """
+        Claim and run one batch. Returns the number of jobs that succeeded, will be
+        retried and failed.
+        """
+        counts = {'succeeded': 0, 'retried': 0, 'failed': 0}
+        in_pool = []
+        for job in claim(self.batch_size):
+            task = TASKS.get(job.task)
+            if task is None:
+                self._finish(job, None, f'Unknown task {job.task}', counts)
+            elif task.cpu_bound and self.pool is not None:
+                in_pool.append((job, self.pool.submit(task.func, **job.kwargs)))
+            else:
+                try:
+                    result, error = task.func(**job.kwargs), None
+                except Exception as e:
+                    result, error = None, _error(e)
+                self._finish(job, result, error, counts)
+
+        for job, future in in_pool:
+            try:
+                result, error = future.result(), None
+            except BrokenProcessPool as e:
+                # A pool process died (e.g. killed for memory); later jobs need a new pool
+                result, error = None, _error(e)
+                self.pool = self._make_pool()
+            except Exception as e:
+                result, error = None, _error(e)
+            self._finish(job, result, error, counts)
+        return counts
+
+    def run(self, poll_interval=1.0, until_empty=False):
+        """
+        Run batches until stopped, sleeping ``poll_interval`` seconds whenever no job is
+        due. With ``until_empty``, return the totals once no job is due instead.
+        """
+        totals = {'succeeded': 0, 'retried': 0, 'failed': 0}
+        while True:
+            counts = self.run_once()
+            for key, value in counts.items():
+                totals[key] += value
+            if not any(counts.values()):
+                if until_empty:
+                    return totals
+                time.sleep(poll_interval)
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
@@ -0,0 +1,200 @@
+import functools
+import hashlib
+
+from django.template import Context, Engine, Library, defaultfilters, defaulttags
+
+from . import caching
+from .exports import form_columns
+from .models import ApplicationFormField, ScholarshipApplication
+from .renderers import dumps
+
+# Rows fetched per round trip, and letters rendered and cached per batch, when streaming letters
+CHUNK_SIZE = 500
+# Rendered letters are keyed by a hash of everything they are rendered from, so they never go stale
+LETTER_CACHE_SECONDS = 60 * 60 * 24
+
+DEFAULT_TEMPLATE = """\
+Dear {{ scholarship.provider }} Selection Committee,
+
+My name is {{ student.firstName }} {{ student.lastName }}{% if student.educationLevel %}, \
+a {{ student.educationLevel }} student{% endif %}, and I am writing to apply for the \
+{{ scholarship.title }}.
+{% for label, answer in responses.items %}
+{{ label }}:
+{{ answer }}
+{% endfor %}
+Thank you for considering my application before the {{ scholarship.deadline|date:"F j, Y" }} deadline.
+
+Sincerely,
+{{ student.firstName }} {{ student.lastName }}
+{{ student.email }}
+"""
+
+# Providers write these templates, so they get only the tags and filters below: no
+# {% load %}, {% include %}, {% debug %} or anything else that reaches past the context
+LETTER_TAGS = ('if', 'for')
+# Nothing that takes a width or precision from the template: center, ljust, rjust,
+# stringformat and floatformat would build a string as large as the provider asks for
+LETTER_FILTERS = (
+    'add', 'capfirst', 'cut', 'date', 'default', 'default_if_none', 'first', 'join', 'last', 'length',
+    'lower', 'pluralize', 'slice', 'time', 'title', 'truncatechars', 'truncatewords', 'upper',
+    'wordcount', 'wordwrap', 'yesno',
+)
+
+letter_library = Library()
+for name in LETTER_TAGS:
+    letter_library.tag(name, defaulttags.register.tags[name])
+for name in LETTER_FILTERS:
+    letter_library.filter(name, defaultfilters.register.filters[name])
+
+
+class LetterEngine(Engine):
+    def get_template_builtins(self, builtins):
+        return [letter_library]
+
+
+# Letters are plain text, so nothing is HTML-escaped. Templates only ever see the plain
+# dicts built below, never model instances.
+engine = LetterEngine(autoescape=False)
+
+LETTER_VALUES = (
+    'id', 'student_id', 'responses', 'student__firstName', 'student__lastName', 'student__email',
+    'student__educationLevel',
+)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(source):
+    """
+    Parse a letter template once. Keyed by the template text, so each scholarship's
+    template is compiled on first use and again only after the provider edits it.
+    Raises TemplateSyntaxError for an invalid template.
+    """
+    return engine.from_string(source)
+
+
+def template_source(scholarship):
+    return scholarship.letter_template or DEFAULT_TEMPLATE
+
+
+def scholarship_context(scholarship, provider_name):
+    return {'title': scholarship.title, 'provider': provider_name, 'deadline': scholarship.deadline}
+
+
+def letter_context(scholarship, row, columns):
+    # ``row`` has LETTER_VALUES; answers are keyed by form field label, in form order.
+    # Rows written before submissions were validated may hold something other than an object.
+    responses = row['responses'] if isinstance(row['responses'], dict) else {}
+    return {
+        'student': {
+            'firstName': row['student__firstName'],
+            'lastName': row['student__lastName'],
+            'email': row['student__email'],
+            'educationLevel': row['student__educationLevel'],
+        },
+        'scholarship': scholarship,
+        'responses': {name: responses[field_id] for field_id, name in columns if responses.get(field_id) not in (None, '')},
+    }
+
+
+def _cache_key(source, context):
+    return 'letter:' + hashlib.sha256(source.encode() + b'\0' + dumps(context)).hexdigest()
+
+
+def _render_missing(source, contexts, keys, cached):
+    rendered = {}
+    for key, context in zip(keys, contexts):
+        if key not in cached and key not in rendered:
+            rendered[key] = compile_template(source).render(Context(context)).strip() + '\n'
+    return rendered
+
+
+def render_letters(source, contexts):
+    """
+    Render one letter per context, reusing any already rendered from the same inputs.
+    Looks every letter up in one cache round trip and stores the new ones in another.
+    """
+    cache = caching.get_cache()
+    keys = [_cache_key(source, context) for context in contexts]
+    cached = cache.get_many(keys)
+    rendered = _render_missing(source, contexts, keys, cached)
+    if rendered:
+        cache.set_many(rendered, LETTER_CACHE_SECONDS)
+    return [cached.get(key) or rendered[key] for key in keys]
+
+
+async def arender_letters(source, contexts):
+    cache = caching.get_cache()
+    keys = [_cache_key(source, context) for context in contexts]
+    cached = await cache.aget_many(keys)
+    rendered = _render_missing(source, contexts, keys, cached)
+    if rendered:
+        await cache.aset_many(rendered, LETTER_CACHE_SECONDS)
+    return [cached.get(key) or rendered[key] for key in keys]
+
+
+def _form_fields(scholarship_id):
+    return ApplicationFormField.objects.filter(scholarship_id=scholarship_id).values_list('id', 'label')
+
+
+def _applications(scholarship_id):
+    return ScholarshipApplication.objects.filter(
+        scholarship_id=scholarship_id
+    ).exclude(status='DRAFT').order_by('submitted_at', 'id').values(*LETTER_VALUES)
+
+
+def application_letter(application):
+    """
+    The letter for one application, loaded with its scholarship, provider and student.
+    """
+    scholarship = application.scholarship
+    columns = form_columns(_form_fields(scholarship.id))
+    row = {
+        'responses': application.responses,
+        'student__firstName': application.student.firstName,
+        'student__lastName': application.student.lastName,
+        'student__email': application.student.email,
+        'student__educationLevel': application.student.educationLevel,
+    }
+    context = letter_context(scholarship_context(scholarship, scholarship.provider.organizationName), row, columns)
+    return render_letters(template_source(scholarship), [context])[0]
+
+
+def _chunk(rows, letters):
+    return b''.join(
+        dumps({'application_id': row['id'], 'student_id': row['student_id'], 'letter': letter}) + b'\n'
+        for row, letter in zip(rows, letters)
+    )
+
+
+def stream_letters(scholarship, provider_name):
+    """
+    Yield the letter of every submitted application for a scholarship as NDJSON,
+    CHUNK_SIZE applications per chunk, reading them through iterator() like the exports.
+    """
+    source, context = template_source(scholarship), scholarship_context(scholarship, provider_name)
+    columns = form_columns(_form_fields(scholarship.id))
+    rows = []
+    for row in _applications(scholarship.id).iterator(chunk_size=CHUNK_SIZE):
+        rows.append(row)
+        if len(rows) == CHUNK_SIZE:
+            yield _chunk(rows, render_letters(source, [letter_context(context, row, columns) for row in rows]))
+            rows = []
+    if rows:
+        yield _chunk(rows, render_letters(source, [letter_context(context, row, columns) for row in rows]))
+
+
+async def astream_letters(scholarship, provider_name):
+    """
+    Async version of stream_letters, for ASGI servers.
+    """
+    source, context = template_source(scholarship), scholarship_context(scholarship, provider_name)
+    columns = form_columns([field async for field in _form_fields(scholarship.id)])
+    rows = []
+    async for row in _applications(scholarship.id).aiterator(chunk_size=CHUNK_SIZE):
+        rows.append(row)
+        if len(rows) == CHUNK_SIZE:
+            yield _chunk(rows, await arender_letters(source, [letter_context(context, row, columns) for row in rows]))
+            rows = []
+    if rows:
+        yield _chunk(rows, await arender_letters(source, [letter_context(context, row, columns) for row in rows]))
@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from features.benchmarking import benchmark_environment, format_result, measure
+from features.models import Students
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request authentication overhead for each session backend and for JWTs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests per backend.')
+
+    def handle(self, *args, **options):
+        credentials = {'email': 'benchmark@example.com', 'password': 'benchmark-password'}
+        url = reverse('list_student_applications')
+
+        with benchmark_environment():
+            student = Students(firstName='Bench', lastName='Mark', email=credentials['email'])
+            student.set_password(credentials['password'])
+            student.save()
+
+            for name, engine in settings.SESSION_ENGINES.items():
+                with override_settings(SESSION_ENGINE=engine, AUTH_SESSION_FALLBACK=True):
+                    client = Client()
+                    client.post(reverse('student_login'), credentials, secure=True)
+                    result = measure(lambda: client.get(url, secure=True), options['requests'])
+                self.stdout.write(format_result(f'session ({name})', result))
+
+            with override_settings(AUTH_SESSION_FALLBACK=False):
+                client = Client()
+                tokens = client.post(reverse('student_login'), credentials, secure=True).json()
+                client.defaults['HTTP_AUTHORIZATION'] = f"Bearer {tokens['access']}"
+                result = measure(lambda: client.get(url, secure=True), options['requests'])
+            self.stdout.write(format_result('jwt', result))
@@ -0,0 +1,386 @@
+import datetime
+import itertools
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from features import jobs, urls
+from features.benchmarking import benchmark_environment, format_result, measure
+from features.models import Students, Scholarship
+from features.seeding import SEED_PASSWORD, seed
+from features.utils import Identity
+
+
+def bearer_client(user_type, user_id):
+    refresh = RefreshToken()
+    refresh['user_type'] = user_type
+    refresh['user_id'] = user_id
+    return Client(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+
+def scholarship_payload(title):
+    return {
+        'title': title,
+        'description': 'A benchmark scholarship for students of engineering and science. ' * 2,
+        'requirements': 'Applicants must be enrolled full time at an accredited school.',
+        'educationLevel': 'Undergraduate',
+        'deadline': (timezone.now() + datetime.timedelta(days=60)).isoformat(),
+        'max_applications': 100,
+    }
+
+
+class Fixtures:
+    """
+    The seeded rows each scenario works on: the busiest provider's busiest active
+    scholarship, and a student with applications.
+    """
+
+    def __init__(self):
+        self.scholarship = Scholarship.objects.filter(status='ACTIVE').annotate(
+            applications_count=Count('applications')
+        ).select_related('provider').order_by('-applications_count', 'id').first()
+        if self.scholarship is None:
+            raise CommandError('Seeded data has no active scholarship; seed more scholarships.')
+        self.provider = self.scholarship.provider
+        self.application = self.scholarship.applications.order_by('id').first()
+        if self.application is None:
+            raise CommandError('Seeded data has no applications; seed more applications per student.')
+        self.student = self.application.student
+
+
+# One scenario per URL name in features/urls.py. Each takes the fixtures and the number of
+# requests it will send, does any setup, and returns the function that sends one request.
+
+def provider_register(fixtures, requests):
+    client, counter = Client(), itertools.count()
+
+    def send():
+        index = next(counter)
+        return client.post(reverse('provider_register'), {
+            'organizationName': f'Benchmark Foundation {index}',
+            'organizationEmail': f'bench{index}@example.com',
+            'organizationWebsite': 'https://example.com',
+            'password': 'benchmark-password',
+        }, content_type='application/json', secure=True)
+    return send
+
+
+def provider_login(fixtures, requests):
+    client = Client()
+    credentials = {'organizationEmail': fixtures.provider.organizationEmail, 'password': SEED_PASSWORD}
+    return lambda: client.post(reverse('provider_login'), credentials, content_type='application/json', secure=True)
+
+
+def student_register(fixtures, requests):
+    client, counter = Client(), itertools.count()
+
+    def send():
+        index = next(counter)
+        return client.post(reverse('student_register'), {
+            'firstName': 'Bench', 'lastName': str(index), 'email': f'bench{index}@example.com',
+            'password': 'benchmark-password',
+        }, content_type='application/json', secure=True)
+    return send
+
+
+def student_login(fixtures, requests):
+    client = Client()
+    credentials = {'email': fixtures.student.email, 'password': SEED_PASSWORD}
+    return lambda: client.post(reverse('student_login'), credentials, content_type='application/json', secure=True)
+
+
+def token_refresh(fixtures, requests):
+    client = Client()
+    refresh = RefreshToken()
+    refresh['user_type'] = 'student'
+    refresh['user_id'] = fixtures.student.id
+    body = {'refresh': str(refresh)}
+    return lambda: client.post(reverse('token_refresh'), body, content_type='application/json', secure=True)
+
+
+def user_logout(fixtures, requests):
+    client = bearer_client('student', fixtures.student.id)
+    return lambda: client.post(reverse('user_logout'), secure=True)
+
+
+def get_session_status(fixtures, requests):
+    client = bearer_client('student', fixtures.student.id)
+    return lambda: client.get(reverse('get_session_status'), secure=True)
+
+
+def create_scholarship(fixtures, requests):
+    client, counter = bearer_client('provider', fixtures.provider.id), itertools.count()
+    return lambda: client.post(reverse('create_scholarship'), scholarship_payload(f'Benchmark Scholarship {next(counter)}'),
+                               content_type='application/json', secure=True)
+
+
+def update_scholarship(fixtures, requests):
+    client, counter = bearer_client('provider', fixtures.provider.id), itertools.count()
+    url = reverse('update_scholarship', args=[fixtures.scholarship.id])
+    return lambda: client.patch(url, {'title': f'Renamed Scholarship {next(counter)}'},
+                                content_type='application/json', secure=True)
+
+
+def delete_scholarship(fixtures, requests):
+    # Every request deletes a scholarship of its own
+    client = bearer_client('provider', fixtures.provider.id)
+    scholarships = iter(Scholarship.objects.bulk_create(
+        Scholarship(provider=fixtures.provider, status='ACTIVE', **scholarship_payload(f'Disposable Scholarship {index}'))
+        for index in range(requests)
+    ))
+    return lambda: client.delete(reverse('delete_scholarship', args=[next(scholarships).id]), secure=True)
+
+
+def scholarship_details(fixtures, requests):
+    client = Client()
+    url = reverse('scholarship_details', args=[fixtures.scholarship.id])
+    return lambda: client.get(url, secure=True)
+
+
+def list_all_scholarships(fixtures, requests):
+    client = Client()
+    return lambda: client.get(reverse('list_all_scholarships'), secure=True)
+
+
+def search_scholarships(fixtures, requests):
+    client = Client()
+    return lambda: client.get(reverse('search_scholarships'), {'q': 'engineering scholarship'}, secure=True)
+
+
+def create_application_form(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('create_application_form', args=[fixtures.scholarship.id])
+    body = {'fields': [
+        {'field_type': 'text', 'label': 'Full name', 'required': True, 'order': 0},
+        {'field_type': 'textarea', 'label': 'Personal statement', 'required': True, 'order': 1},
+        {'field_type': 'select', 'label': 'Year of study', 'required': False, 'options': ['1', '2', '3', '4'], 'order': 2},
+    ]}
+    return lambda: client.post(url, body, content_type='application/json', secure=True)
+
+
+def get_application_form(fixtures, requests):
+    client = Client()
+    url = reverse('get_application_form', args=[fixtures.scholarship.id])
+    return lambda: client.get(url, secure=True)
+
+
+def submit_application(fixtures, requests):
+    # Every request comes from a new student, into a scholarship with room for all of them
+    scholarship = fixtures.scholarship
+    Scholarship.objects.filter(id=scholarship.id).update(max_applications=scholarship.current_applicants + requests)
+    students = Students.objects.bulk_create(
+        Students(firstName='Bench', lastName=str(index), email=f'applicant{index}@example.com', password='unused')
+        for index in range(requests)
+    )
+    clients = iter([bearer_client('student', student.id) for student in students])
+    url = reverse('submit_application', args=[scholarship.id])
+    body = {'responses': {str(field.id): 'Benchmark answer' for field in scholarship.form_fields.all()}}
+    return lambda: next(clients).post(url, body, content_type='application/json', secure=True)
+
+
+def list_scholarship_applications(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('list_scholarship_applications', args=[fixtures.scholarship.id])
+    return lambda: client.get(url, secure=True)
+
+
+def export_scholarship_applications(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('export_scholarship_applications', args=[fixtures.scholarship.id, 'csv'])
+
+    def send():
+        response = client.get(url, secure=True)
+        # The body is only generated as it is read
+        b''.join(response.streaming_content)
+        return response
+    return send
+
+
+def queue_application_export(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('queue_application_export', args=[fixtures.scholarship.id, 'csv'])
+    return lambda: client.post(url, secure=True)
+
+
+def stream_application_letters(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('stream_application_letters', args=[fixtures.scholarship.id])
+
+    def send():
+        response = client.get(url, secure=True)
+        b''.join(response.streaming_content)
+        return response
+    return send
+
+
+def queue_letter_export(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('queue_letter_export', args=[fixtures.scholarship.id])
+    return lambda: client.post(url, secure=True)
+
+
+def get_application_detail(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('get_application_detail', args=[fixtures.application.id])
+    return lambda: client.get(url, secure=True)
+
+
+def review_application(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('review_application', args=[fixtures.application.id])
+    statuses = itertools.cycle(['ACCEPTED', 'REJECTED'])
+    return lambda: client.post(url, {'status': next(statuses), 'notes': 'Reviewed'},
+                               content_type='application/json', secure=True)
+
+
+def review_applications(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    ids = list(fixtures.scholarship.applications.order_by('id').values_list('id', flat=True)[:100])
+    statuses = itertools.cycle(['ACCEPTED', 'REJECTED'])
+
+    def send():
+        decision = next(statuses)
+        return client.post(reverse('review_applications'), {
+            'reviews': [{'id': pk, 'status': decision, 'notes': 'Reviewed'} for pk in ids]
+        }, content_type='application/json', secure=True)
+    return send
+
+
+def list_student_applications(fixtures, requests):
+    client = bearer_client('student', fixtures.student.id)
+    return lambda: client.get(reverse('list_student_applications'), secure=True)
+
+
+def recommend_scholarships(fixtures, requests):
+    client = bearer_client('student', fixtures.student.id)
+    return lambda: client.get(reverse('recommend_scholarships'), secure=True)
+
+
+def get_application_status(fixtures, requests):
+    client = bearer_client('student', fixtures.student.id)
+    url = reverse('get_application_status', args=[fixtures.application.id])
+    return lambda: client.get(url, secure=True)
+
+
+def get_application_letter(fixtures, requests):
+    client = bearer_client('student', fixtures.student.id)
+    url = reverse('get_application_letter', args=[fixtures.application.id])
+    return lambda: client.get(url, secure=True)
+
+
+def finished_export_job(fixtures):
+    job, _ = jobs.enqueue(
+        'export_applications', {'scholarship_id': fixtures.scholarship.id, 'export_format': 'csv'},
+        owner=Identity('provider', fixtures.provider.id)
+    )
+    jobs.Worker().run(until_empty=True)
+    return job
+
+
+def job_status(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('job_status', args=[finished_export_job(fixtures).id])
+    return lambda: client.get(url, secure=True)
+
+
+def download_job_result(fixtures, requests):
+    client = bearer_client('provider', fixtures.provider.id)
+    url = reverse('download_job_result', args=[finished_export_job(fixtures).id])
+
+    def send():
+        response = client.get(url, secure=True)
+        b''.join(response.streaming_content)
+        return response
+    return send
+
+
+def staff_client():
+    client = Client()
+    client.force_login(get_user_model().objects.create_user('benchmark-staff', is_staff=True))
+    return client
+
+
+def cache_stats(fixtures, requests):
+    client = staff_client()
+    return lambda: client.get(reverse('cache_stats'), secure=True)
+
+
+def metrics(fixtures, requests):
+    client = staff_client()
+    return lambda: client.get(reverse('metrics'), secure=True)
+
+
+SCENARIOS = {
+    scenario.__name__: scenario for scenario in [
+        provider_register, provider_login, student_register, student_login, token_refresh, user_logout,
+        get_session_status, create_scholarship, update_scholarship, delete_scholarship, scholarship_details,
+        list_all_scholarships, search_scholarships, create_application_form, get_application_form,
+        submit_application, list_scholarship_applications, export_scholarship_applications, queue_application_export,
+        stream_application_letters, queue_letter_export, get_application_detail, review_application, review_applications,
+        list_student_applications, get_application_status, get_application_letter, recommend_scholarships,
+        job_status, download_job_result, cache_stats, metrics,
+    ]
+}
+
+
+def checked(name, send):
+    # A scenario that starts failing would otherwise just report fast error responses
+    def send_checked():
+        response = send()
+        if response.status_code >= 400:
+            raise CommandError(f'{name} returned {response.status_code}: {response.content[:200]!r}')
+        return response
+    return send_checked
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed a throwaway test database and report latency percentiles, queries per request '
+        'and throughput for every URL in features/urls.py, using the Django test client.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Requests per URL.')
+        parser.add_argument('--only', nargs='+', metavar='URL_NAME', help='Benchmark only these URL names.')
+        parser.add_argument('--providers', type=int, default=20)
+        parser.add_argument('--students', type=int, default=500)
+        parser.add_argument('--scholarships', type=int, default=1000)
+        parser.add_argument('--applications-per-student', type=int, default=5)
+
+    def handle(self, *args, **options):
+        names = [pattern.name for pattern in urls.urlpatterns]
+        missing = [name for name in names if name not in SCENARIOS]
+        if missing:
+            raise CommandError(f'No benchmark scenario for: {", ".join(missing)}')
+        if options['only']:
+            unknown = set(options['only']) - set(names)
+            if unknown:
+                raise CommandError(f'Unknown URL names: {", ".join(sorted(unknown))}')
+            names = [name for name in names if name in options['only']]
+
+        # Files written by the scenarios (uploads, exports) are kept in memory, like the data
+        storages = {**settings.STORAGES, 'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'}}
+        with benchmark_environment(), override_settings(STORAGES=storages):
+            created = seed(
+                providers=options['providers'],
+                students=options['students'],
+                scholarships=options['scholarships'],
+                applications_per_student=options['applications_per_student'],
+            )
+            self.stdout.write('Seeded ' + ', '.join(f'{count} {model}' for model, count in created.items()))
+            fixtures = Fixtures()
+
+            for name in names:
+                # Roll back each URL's writes so every scenario starts from the same data
+                with transaction.atomic():
+                    send = checked(name, SCENARIOS[name](fixtures, options['requests']))
+                    result = measure(send, options['requests'])
+                    transaction.set_rollback(True)
+                self.stdout.write(format_result(name, result))
@@ -0,0 +1,50 @@
+import io
+
+from django.core.management.base import BaseCommand
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from features.benchmarking import benchmark_environment, format_result, measure
+from features.models import Scholarship, ScholarshipApplication
+from features.parsers import FastJSONParser
+from features.renderers import FastJSONRenderer, orjson
+from features.seeding import seed
+from features.serializers import (
+    ScholarshipApplicationListSerializer, ScholarshipApplicationSerializer, ScholarshipListPreviewSerializer
+)
+
+
+class Command(BaseCommand):
+    help = "Compare DRF's JSON renderer and parser with the orjson-backed ones on real serializer output."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Rows per payload (100 is the largest page).')
+        parser.add_argument('--iterations', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write(self.style.WARNING('orjson is not installed; the fast classes fall back to DRF.'))
+        rows = options['rows']
+
+        with benchmark_environment():
+            seed(providers=10, students=rows, scholarships=rows * 2, applications_per_student=3)
+            applications = ScholarshipApplicationSerializer.setup_eager_loading(ScholarshipApplication.objects.all())[:rows]
+            payloads = {
+                'scholarship list': ScholarshipListPreviewSerializer(
+                    Scholarship.objects.select_related('provider')[:rows], many=True
+                ).data,
+                'application inbox': ScholarshipApplicationListSerializer(
+                    ScholarshipApplicationListSerializer.setup_eager_loading(ScholarshipApplication.objects.all())[:rows],
+                    many=True
+                ).data,
+                'student applications': ScholarshipApplicationSerializer(applications, many=True).data,
+            }
+
+        for name, data in payloads.items():
+            body = JSONRenderer().render(data)
+            self.stdout.write(f'{name}: {len(data)} rows, {len(body)} bytes')
+            for label, renderer in [('render drf', JSONRenderer()), ('render fast', FastJSONRenderer())]:
+                self.stdout.write(format_result(f'  {label}', measure(lambda: renderer.render(data), options['iterations'])))
+            for label, parser in [('parse drf', JSONParser()), ('parse fast', FastJSONParser())]:
+                result = measure(lambda: parser.parse(io.BytesIO(body)), options['iterations'])
+                self.stdout.write(format_result(f'  {label}', result))
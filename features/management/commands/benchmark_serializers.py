@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from features import rows
+from features.benchmarking import benchmark_environment, format_result, measure
+from features.models import Scholarship, ScholarshipApplication
+from features.seeding import seed
+from features.serializers import ScholarshipApplicationSerializer, ScholarshipListPreviewSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare the serializers with the .values() fast paths used by the list endpoints, per row.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100, help='Rows per list (100 is the largest page).')
+        parser.add_argument('--iterations', type=int, default=200)
+
+    def handle(self, *args, **options):
+        count, iterations = options['rows'], options['iterations']
+
+        with benchmark_environment():
+            seed(providers=10, students=count, scholarships=count * 2, applications_per_student=5)
+            scholarships = Scholarship.objects.order_by('deadline', 'id')[:count]
+            applications = ScholarshipApplication.objects.order_by('-submitted_at')[:count]
+
+            cases = {
+                'scholarship previews': (
+                    lambda: ScholarshipListPreviewSerializer(scholarships.select_related('provider'), many=True).data,
+                    lambda: [rows.scholarship_preview(row) for row in rows.scholarship_previews(scholarships)],
+                ),
+                'applications': (
+                    lambda: ScholarshipApplicationSerializer(
+                        ScholarshipApplicationSerializer.setup_eager_loading(applications), many=True
+                    ).data,
+                    lambda: rows.serialize_applications(applications),
+                ),
+            }
+            for name, (serializer, fast) in cases.items():
+                self.stdout.write(f'{name} ({count} rows, query included)')
+                results = {}
+                for label, build in [('serializer', serializer), ('fast path', fast)]:
+                    results[label] = measure(build, iterations)
+                    per_row_us = results[label]['p50'] * 1000 / count
+                    self.stdout.write(format_result(f'  {label}', results[label]) + f'  {per_row_us:6.1f}us/row')
+                speedup = results['serializer']['p50'] / results['fast path']['p50']
+                self.stdout.write(f'  {speedup:.1f}x faster per row')
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from features.expiry import DEFAULT_BATCH_SIZE, expire_due_scholarships
+
+
+class Command(BaseCommand):
+    help = 'Expire scholarships past their deadline and close those that are full.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Rows updated per UPDATE statement.')
+        parser.add_argument('--interval', type=int, default=None,
+                            help='Keep running, repeating every INTERVAL seconds.')
+
+    def handle(self, *args, **options):
+        while True:
+            result = expire_due_scholarships(batch_size=options['batch_size'])
+            self.stdout.write(
+                f"Expired {result['expired']} and closed {result['closed']} scholarships "
+                f"in {result['elapsed_ms']}ms"
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,21 @@
+import datetime
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from features.jobs import purge_finished
+
+
+class Command(BaseCommand):
+    help = 'Delete finished background jobs, and the export files they wrote, once JOB_RETENTION_HOURS have passed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--hours', type=int, default=None,
+                            help='Keep jobs that finished within this many hours (defaults to JOB_RETENTION_HOURS).')
+        parser.add_argument('--batch-size', type=int, default=1000, help='Jobs deleted per DELETE statement.')
+
+    def handle(self, *args, **options):
+        hours = options['hours'] if options['hours'] is not None else settings.JOB_RETENTION_HOURS
+        deleted = purge_finished(timezone.now() - datetime.timedelta(hours=hours), options['batch_size'])
+        self.stdout.write(f"Purged {deleted['jobs']} finished jobs and {deleted['files']} files.")
@@ -0,0 +1,32 @@
+from django.conf import settings
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+DB_SESSION_ENGINES = {
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+}
+
+
+class Command(BaseCommand):
+    help = 'Delete expired session rows in batches (unlike clearsessions, which deletes them in one statement).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows deleted per DELETE statement.')
+
+    def handle(self, *args, **options):
+        if settings.SESSION_ENGINE not in DB_SESSION_ENGINES:
+            self.stdout.write(f'{settings.SESSION_ENGINE} keeps no session rows; nothing to purge.')
+            return
+
+        now = timezone.now()
+        deleted = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now).values_list('pk', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            deleted += Session.objects.filter(pk__in=keys).delete()[0]
+        self.stdout.write(f'Purged {deleted} expired sessions.')
@@ -0,0 +1,31 @@
+import os
+
+from django.core.management.base import BaseCommand
+
+from features.jobs import Worker
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs, CPU-bound ones in a pool of processes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=os.cpu_count(),
+                            help='Processes for CPU-bound jobs; 0 runs every job in this process.')
+        parser.add_argument('--batch-size', type=int, default=None,
+                            help='Jobs claimed at a time (defaults to the number of processes).')
+        parser.add_argument('--poll-interval', type=float, default=1.0,
+                            help='Seconds to wait when no job is due.')
+        parser.add_argument('--until-empty', action='store_true',
+                            help='Exit once no job is due instead of waiting for more.')
+
+    def handle(self, *args, **options):
+        worker = Worker(options['processes'], options['batch_size'])
+        try:
+            totals = worker.run(options['poll_interval'], until_empty=options['until_empty'])
+        except KeyboardInterrupt:
+            return
+        finally:
+            worker.close()
+        self.stdout.write(
+            f"{totals['succeeded']} jobs succeeded, {totals['retried']} will be retried and {totals['failed']} failed"
+        )
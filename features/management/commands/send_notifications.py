@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from features.notifications import (
+    DEFAULT_BATCH_SIZE, DEFAULT_MAX_ATTEMPTS, SENDERS, ConsoleSender, drain, enqueue_deadline_reminders, get_sender
+)
+
+
+class Command(BaseCommand):
+    help = 'Queue deadline reminders, then send every due notification in the outbox.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sender', choices=sorted(SENDERS), default=None,
+                            help='Defaults to the NOTIFICATION_SENDER setting.')
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                            help='Notifications claimed per transaction.')
+        parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                            help='Attempts before a notification is marked FAILED.')
+        parser.add_argument('--interval', type=int, default=None,
+                            help='Keep running, repeating every INTERVAL seconds.')
+
+    def handle(self, *args, **options):
+        sender = get_sender(options['sender'])
+        if isinstance(sender, ConsoleSender):
+            sender = ConsoleSender(self.stdout)
+        while True:
+            reminders = enqueue_deadline_reminders()
+            result = drain(sender, options['batch_size'], options['max_attempts'])
+            self.stdout.write(
+                f"Checked {reminders} upcoming deadlines; sent {result['sent']}, retried {result['retried']} "
+                f"and failed {result['failed']} notifications in {result['elapsed_ms']}ms"
+            )
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
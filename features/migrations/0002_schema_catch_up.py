@@ -0,0 +1,117 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:26
+
+# Brings the migration history up to the models, which had changed since 0001 without
+# migrations. A database that already has these tables should mark it applied with
+# `manage.py migrate features 0002_schema_catch_up --fake` instead of running it.
+
+import django.core.validators
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationFormField',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field_type', models.CharField(choices=[('text', 'Text Input'), ('textarea', 'Text Area'), ('number', 'Number Input'), ('select', 'Select Dropdown'), ('file', 'File Upload'), ('checkbox', 'Checkbox')], max_length=20)),
+                ('label', models.CharField(max_length=100)),
+                ('required', models.BooleanField(default=True)),
+                ('options', models.JSONField(blank=True, null=True)),
+                ('order', models.IntegerField()),
+            ],
+            options={
+                'ordering': ['order'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Scholarship',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100, validators=[django.core.validators.MinLengthValidator(5, message='Titile must be at least 5 characters long.')])),
+                ('description', models.TextField(validators=[django.core.validators.MinLengthValidator(50, message='Description must be at least 50 characters long.')])),
+                ('deadline', models.DateTimeField()),
+                ('requirements', models.TextField(validators=[django.core.validators.MinLengthValidator(30, message='Requirements must be at least 30 characters long.')])),
+                ('educationLevel', models.CharField(blank=True, choices=[('Undergraduate', 'Undergraduate'), ('Masters', 'Masters'), ('PhD', 'PhD')], max_length=50, null=True)),
+                ('max_applications', models.IntegerField(default=1, validators=[django.core.validators.MinValueValidator(1, message='Maximum applications must be at least 1'), django.core.validators.MaxValueValidator(10000, message='Maximum applications cannot exceed 10,000')])),
+                ('current_applicants', models.IntegerField(default=0, validators=[django.core.validators.MinValueValidator(0)])),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('ACTIVE', 'Active'), ('CLOSED', 'Closed'), ('EXPIRED', 'Expired')], default='DRAFT', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScholarshipApplication',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('DRAFT', 'Draft'), ('SUBMITTED', 'Submitted'), ('UNDER_REVIEW', 'Under Review'), ('ACCEPTED', 'Accepted'), ('REJECTED', 'Rejected')], default='DRAFT', max_length=20)),
+                ('responses', models.JSONField()),
+                ('files', models.JSONField(default=dict)),
+                ('submitted_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('reviewed_at', models.DateTimeField(blank=True, null=True)),
+                ('review_notes', models.TextField(blank=True, null=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Students',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('firstName', models.CharField(max_length=15)),
+                ('lastName', models.CharField(max_length=15)),
+                ('email', models.EmailField(max_length=254, unique=True)),
+                ('educationLevel', models.CharField(blank=True, choices=[('Undergraduate', 'Undergraduate'), ('Masters', 'Masters'), ('PhD', 'PhD')], max_length=50, null=True)),
+                ('is_premium', models.BooleanField(default=False)),
+                ('password', models.CharField(max_length=128)),
+            ],
+        ),
+        migrations.DeleteModel(
+            name='Student',
+        ),
+        migrations.AlterField(
+            model_name='providers',
+            name='organizationEmail',
+            field=models.EmailField(max_length=30),
+        ),
+        migrations.AlterField(
+            model_name='providers',
+            name='organizationName',
+            field=models.CharField(max_length=50, unique=True),
+        ),
+        migrations.AlterField(
+            model_name='providers',
+            name='password',
+            field=models.CharField(max_length=128),
+        ),
+        migrations.AddField(
+            model_name='scholarship',
+            name='provider',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scholarships', to='features.providers'),
+        ),
+        migrations.AddField(
+            model_name='applicationformfield',
+            name='scholarship',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='form_fields', to='features.scholarship'),
+        ),
+        migrations.AddField(
+            model_name='scholarshipapplication',
+            name='scholarship',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='features.scholarship'),
+        ),
+        migrations.AddField(
+            model_name='scholarshipapplication',
+            name='student',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='applications', to='features.students'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='scholarshipapplication',
+            unique_together={('scholarship', 'student')},
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0002_schema_catch_up'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['status', 'deadline', 'id'], name='scholarship_status_deadline'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['status', 'educationLevel', 'deadline', 'id'], name='scholarship_level_deadline'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['provider', 'status', 'deadline', 'id'], name='scholarship_provider_deadline'),
+        ),
+    ]
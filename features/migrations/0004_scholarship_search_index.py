@@ -0,0 +1,31 @@
+from django.db import migrations
+
+INDEX_NAME = 'scholarship_search'
+
+
+def create_search_index(apps, schema_editor):
+    # Full-text search only exists on PostgreSQL; other databases use the in-process index
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    from django.contrib.postgres.indexes import GinIndex
+    from features.search import search_vector
+
+    Scholarship = apps.get_model('features', 'Scholarship')
+    schema_editor.add_index(Scholarship, GinIndex(search_vector(), name=INDEX_NAME))
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0003_scholarship_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:40
+
+from django.db import migrations, models
+from django.db.models import F
+
+INBOX_INDEX_NAME = 'application_inbox'
+
+
+def create_inbox_index(apps, schema_editor):
+    # Matches the keyset ordering of a scholarship's applications: submitted_at DESC NULLS LAST, id DESC.
+    # SQLite can't declare NULLS LAST on an index, but already sorts NULLs last in a descending index
+    ScholarshipApplication = apps.get_model('features', 'ScholarshipApplication')
+    if schema_editor.connection.vendor == 'postgresql':
+        index = models.Index(
+            F('scholarship'), F('submitted_at').desc(nulls_last=True), F('id').desc(), name=INBOX_INDEX_NAME
+        )
+    else:
+        index = models.Index(fields=['scholarship', '-submitted_at', '-id'], name=INBOX_INDEX_NAME)
+    schema_editor.add_index(ScholarshipApplication, index)
+
+
+def drop_inbox_index(apps, schema_editor):
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INBOX_INDEX_NAME}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0004_scholarship_search_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='scholarshipapplication',
+            index=models.Index(fields=['student', '-submitted_at'], name='application_student_submitted'),
+        ),
+        migrations.AddIndex(
+            model_name='scholarshipapplication',
+            index=models.Index(fields=['scholarship', 'status'], name='application_scholarship_status'),
+        ),
+        migrations.RunPython(create_inbox_index, drop_inbox_index),
+    ]
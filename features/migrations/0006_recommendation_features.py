@@ -0,0 +1,26 @@
+# Generated by Django 5.1.5 on 2026-10-18 14:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0005_application_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RecommendationFeatures',
+            fields=[
+                ('scholarship', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='recommendation_features', serialize=False, to='features.scholarship')),
+                ('version', models.PositiveSmallIntegerField()),
+                ('text_vector', models.BinaryField()),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='scholarship',
+            index=models.Index(fields=['updated_at'], name='scholarship_updated'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.5 on 2026-10-18 15:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('features', '0008_job_queue'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='scholarship',
+            name='letter_template',
+            field=models.TextField(blank=True, default=''),
+        ),
+    ]
@@ -1,9 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 from django.contrib.auth.hashers import make_password, check_password
 from django.core.validators import MinValueValidator, MaxValueValidator, MinLengthValidator
 import datetime
 from django.core.exceptions import ValidationError
 from django.utils import timezone
+from . import caching
 
 
 # User Types: Students and Providers
@@ -77,6 +78,8 @@ class Scholarship(models.Model):
             MinLengthValidator(30, message="Requirements must be at least 30 characters long.")
         ])
     educationLevel = models.CharField(max_length=50, choices=EDUCATION_CHOICES, blank=True, null=True)
+    # Django template for application letters, see letters.py; blank uses the default letter
+    letter_template = models.TextField(blank=True, default='')
 
     # Tracking fields
     max_applications = models.IntegerField(validators=[
@@ -90,9 +93,36 @@ class Scholarship(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        # Keyset pagination of the public listing walks (deadline, id) within each filter
+        indexes = [
+            models.Index(fields=['status', 'deadline', 'id'], name='scholarship_status_deadline'),
+            models.Index(fields=['status', 'educationLevel', 'deadline', 'id'], name='scholarship_level_deadline'),
+            models.Index(fields=['provider', 'status', 'deadline', 'id'], name='scholarship_provider_deadline'),
+            # Lets the recommendation feature table pick up only rows changed since it last looked
+            models.Index(fields=['updated_at'], name='scholarship_updated'),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the loaded values so clean() and save() can compare against them
+        # without querying the row again
+        instance._loaded_values = dict(
+            zip(field_names, (value for value in values if value is not models.DEFERRED))
+        )
+        return instance
+
+    def _original_value(self, attname):
+        loaded = getattr(self, '_loaded_values', {})
+        if attname in loaded:
+            return loaded[attname]
+        return Scholarship.objects.filter(pk=self.pk).values_list(attname, flat=True).first()
+
     def clean(self):
-        # Custom validation for deadline
-        if self.deadline:
+        # Custom validation for deadline, only when it is being set or changed so
+        # that saving a scholarship past its deadline can still expire it
+        if self.deadline and (not self.pk or self.deadline != getattr(self, '_loaded_values', {}).get('deadline')):
             if self.deadline < timezone.now():
                 raise ValidationError({
                     'deadline': 'Deadline cannot be in the past.'
@@ -111,9 +141,8 @@ class Scholarship(models.Model):
             })
 
         # Validate status transitions
-        if self.pk:  # If this is an existing scholarship
-            old_instance = Scholarship.objects.get(pk=self.pk)
-            if old_instance.status in ['CLOSED', 'EXPIRED'] and self.status == 'ACTIVE':
+        if self.pk and self.status == 'ACTIVE':  # If this is an existing scholarship
+            if self._original_value('status') in ['CLOSED', 'EXPIRED']:
                 raise ValidationError({
                     'status': 'Cannot reactivate a closed or expired scholarship.'
                 })
@@ -128,9 +157,57 @@ class Scholarship(models.Model):
             self.status = 'CLOSED'
         elif not self.pk and self.status == 'DRAFT':
             self.status = 'ACTIVE'
+
+        # Only write the fields that changed since the instance was loaded
+        loaded = getattr(self, '_loaded_values', {})
+        if self.pk and loaded and kwargs.get('update_fields') is None:
+            changed = [name for name, value in loaded.items() if name != 'id' and getattr(self, name) != value]
+            # Fields deferred by only()/defer() and assigned since are not in loaded; write them too
+            deferred = self.get_deferred_fields()
+            changed += [
+                field.attname for field in self._meta.concrete_fields
+                if field.attname not in loaded and field.attname not in deferred
+            ]
+            kwargs['update_fields'] = set(changed) | {'updated_at'}
         
         super().save(*args, **kwargs)
 
+        # What was just written is now the stored value
+        saved = kwargs.get('update_fields')
+        if saved is None:
+            saved = loaded or [field.attname for field in self._meta.concrete_fields]
+        saved = [self._meta.get_field(name).attname for name in saved]
+        self._loaded_values = {**loaded, **{name: getattr(self, name) for name in saved}}
+
+    def add_applicant(self):
+        """
+        Count one more applicant with a conditional UPDATE, closing the scholarship when
+        this applicant takes the last slot. Safe under concurrent submissions: the row
+        lock taken by the UPDATE serializes them and the WHERE clauses stop oversubscription.
+        Returns False if the scholarship is no longer accepting applications.
+        The in-memory instance is not refreshed.
+        """
+        now = timezone.now()
+        open_rows = Scholarship.objects.filter(pk=self.pk, status='ACTIVE', deadline__gt=now)
+        increment = {'current_applicants': models.F('current_applicants') + 1, 'updated_at': now}
+        # Which guard matched tells whether this applicant filled the last slot, without
+        # trusting this instance, which concurrent submissions may have left behind
+        if open_rows.filter(current_applicants__lt=models.F('max_applications') - 1).update(**increment):
+            closed = False
+        elif open_rows.filter(current_applicants=models.F('max_applications') - 1).update(status='CLOSED', **increment):
+            closed = True
+        else:
+            return False
+
+        # Bulk updates skip the save signals, so refresh cached responses here. The public
+        # list only changes when the scholarship closed. Wait for the caller's transaction
+        # to commit, or a concurrent request could cache the old row under the new version.
+        scopes = [caching.scholarship_scope(self.pk)]
+        if closed:
+            scopes.append(caching.SCHOLARSHIP_LIST)
+        transaction.on_commit(lambda: caching.invalidate(*scopes))
+        return True
+
     def __str__(self):
         return f"{self.title} by {self.provider.organizationName} is {self.status}"
 
@@ -178,5 +255,88 @@ class ScholarshipApplication(models.Model):
 
     class Meta:
         unique_together = ['scholarship', 'student']  # Prevent multiple applications
+        # The provider inbox ordering index (scholarship, submitted_at, id) is created in
+        # migration 0005, since its NULLS LAST ordering is PostgreSQL-specific
+        indexes = [
+            models.Index(fields=['student', '-submitted_at'], name='application_student_submitted'),
+            models.Index(fields=['scholarship', 'status'], name='application_scholarship_status'),
+        ]
+
+
+# Inputs to recommendations.py that are costly to derive, computed when a scholarship's text changes
+class RecommendationFeatures(models.Model):
+    scholarship = models.OneToOneField(Scholarship, on_delete=models.CASCADE, primary_key=True, related_name='recommendation_features')
+    version = models.PositiveSmallIntegerField()  # Recomputed when it differs from recommendations.FEATURE_VERSION
+    text_vector = models.BinaryField()  # float32 hashed term vector of the title, description and requirements
+
+
+
+# Transactional outbox: rows are written in the same transaction as the change they announce
+# and delivered later by `manage.py send_notifications`, see notifications.py
+class Notification(models.Model):
+    EVENT_CHOICES = [
+        ('APPLICATION_SUBMITTED', 'Application Submitted'),
+        ('APPLICATION_REVIEWED', 'Application Reviewed'),
+        ('DEADLINE_REMINDER', 'Deadline Reminder'),
+    ]
+    STATUS_CHOICES = [
+        ('PENDING', 'Pending'),
+        ('SENT', 'Sent'),
+        ('FAILED', 'Failed'),
+    ]
+
+    event = models.CharField(max_length=30, choices=EVENT_CHOICES)
+    recipient = models.EmailField()
+    payload = models.JSONField(default=dict)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='PENDING')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    available_at = models.DateTimeField(default=timezone.now)  # Next attempt, or when a claimed row's lease runs out
+    dedupe_key = models.CharField(max_length=100, unique=True, null=True, blank=True)  # For events that must only be sent once
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='notification_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.event} to {self.recipient}"
+
+
+# Background jobs run by `manage.py run_jobs`, see jobs.py
+class Job(models.Model):
+    STATUS_CHOICES = [
+        ('QUEUED', 'Queued'),
+        ('RUNNING', 'Running'),
+        ('SUCCEEDED', 'Succeeded'),
+        ('FAILED', 'Failed'),
+    ]
+
+    task = models.CharField(max_length=100)  # Name in jobs.TASKS
+    kwargs = models.JSONField(default=dict)
+    priority = models.SmallIntegerField(default=0)  # Higher runs first
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='QUEUED')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    # When a queued job may next run; for a running job, when its visibility timeout runs out
+    available_at = models.DateTimeField(default=timezone.now)
+    idempotency_key = models.CharField(max_length=200, unique=True, null=True, blank=True)
+    owner_type = models.CharField(max_length=10, blank=True)  # 'student' or 'provider' who may see the job
+    owner_id = models.PositiveIntegerField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'available_at'], name='job_due'),
+        ]
+
+    def __str__(self):
+        return f"{self.task} ({self.status})"
 
 # To create scholarship application response from students
\ No newline at end of file
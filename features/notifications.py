@@ -0,0 +1,215 @@
+import datetime
+import logging
+import sys
+import time
+
+from django.conf import settings
+from django.core.mail import send_mail
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Notification, Scholarship
+from .renderers import dumps
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+DEFAULT_MAX_ATTEMPTS = 5
+# Delay before the first retry, doubled after every further failure up to MAX_BACKOFF
+BASE_BACKOFF = datetime.timedelta(seconds=30)
+MAX_BACKOFF = datetime.timedelta(hours=1)
+# How long a claimed notification stays hidden from other workers. A worker that dies
+# mid-batch leaves its rows PENDING, so they are picked up again once this runs out.
+CLAIM_LEASE = datetime.timedelta(minutes=5)
+
+# The outbox rows are written with bulk_create/create inside the caller's transaction, so a
+# notification exists exactly when the change it announces was committed.
+
+
+def application_submitted(application, scholarship, student):
+    return Notification.objects.create(
+        event='APPLICATION_SUBMITTED',
+        recipient=scholarship.provider.organizationEmail,
+        payload={
+            'application_id': application.id,
+            'scholarship_id': scholarship.id,
+            'scholarship_title': scholarship.title,
+            'student_name': f'{student.firstName} {student.lastName}',
+        }
+    )
+
+
+def applications_reviewed(reviews):
+    """
+    One notification per ``(application, scholarship title, student email)``.
+    """
+    return Notification.objects.bulk_create([
+        Notification(
+            event='APPLICATION_REVIEWED',
+            recipient=email,
+            payload={
+                'application_id': application.id,
+                'scholarship_title': title,
+                'status': application.status,
+                'notes': application.review_notes or '',
+            }
+        )
+        for application, title, email in reviews
+    ], batch_size=500)
+
+
+def enqueue_deadline_reminders(now=None, days=None):
+    """
+    Queue a reminder to the provider of every active scholarship whose deadline is
+    within ``days``. Each deadline is only reminded about once, even across workers.
+    Returns the number of scholarships checked.
+    """
+    now = now or timezone.now()
+    days = days if days is not None else getattr(settings, 'NOTIFICATION_DEADLINE_REMINDER_DAYS', 3)
+    due = Scholarship.objects.filter(
+        status='ACTIVE', deadline__gt=now, deadline__lte=now + datetime.timedelta(days=days)
+    ).values_list('id', 'title', 'deadline', 'provider__organizationEmail')
+    reminders = [
+        Notification(
+            event='DEADLINE_REMINDER',
+            recipient=email,
+            payload={'scholarship_id': pk, 'scholarship_title': title, 'deadline': deadline.isoformat()},
+            # A moved deadline gets its own reminder
+            dedupe_key=f'deadline-reminder:{pk}:{deadline.isoformat()}',
+        )
+        for pk, title, deadline, email in due.iterator(chunk_size=1000)
+    ]
+    Notification.objects.bulk_create(reminders, batch_size=500, ignore_conflicts=True)
+    return len(reminders)
+
+
+MESSAGES = {
+    'APPLICATION_SUBMITTED': (
+        'New application for {scholarship_title}',
+        '{student_name} applied for {scholarship_title}.',
+    ),
+    'APPLICATION_REVIEWED': (
+        'Your application for {scholarship_title}',
+        'Your application for {scholarship_title} was {status}. {notes}',
+    ),
+    'DEADLINE_REMINDER': (
+        '{scholarship_title} closes soon',
+        'Applications for {scholarship_title} close at {deadline}.',
+    ),
+}
+
+
+def message(notification):
+    """
+    ``(subject, body)`` of a notification.
+    """
+    payload = dict(notification.payload)
+    if 'status' in payload:
+        payload['status'] = payload['status'].lower()
+    subject, body = MESSAGES[notification.event]
+    return subject.format(**payload), body.format(**payload).strip()
+
+
+# Senders deliver one notification or raise; any exception is retried with backoff
+
+class ConsoleSender:
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, notification):
+        subject, body = message(notification)
+        self.stream.write(f'To: {notification.recipient}\nSubject: {subject}\n\n{body}\n\n')
+
+
+class FileSender:
+    # Appends one JSON object per notification, for tests and local development
+    def __init__(self, path=None):
+        self.path = path or settings.NOTIFICATION_FILE
+
+    def send(self, notification):
+        subject, body = message(notification)
+        with open(self.path, 'ab') as file:
+            file.write(dumps({
+                'id': notification.id,
+                'event': notification.event,
+                'to': notification.recipient,
+                'subject': subject,
+                'body': body,
+            }) + b'\n')
+
+
+class EmailSender:
+    # Through Django's EMAIL_BACKEND
+    def send(self, notification):
+        subject, body = message(notification)
+        send_mail(subject, body, None, [notification.recipient])
+
+
+SENDERS = {'console': ConsoleSender, 'file': FileSender, 'email': EmailSender}
+
+
+def get_sender(name=None):
+    return SENDERS[name or getattr(settings, 'NOTIFICATION_SENDER', 'console')]()
+
+
+def backoff(attempts):
+    return min(BASE_BACKOFF * 2 ** (attempts - 1), MAX_BACKOFF)
+
+
+def _claim(batch_size, now):
+    # Lock a batch of due rows, skipping rows another worker holds, and lease them out.
+    # The lock only lasts for this short transaction, not while the batch is being sent.
+    with transaction.atomic():
+        ids = list(Notification.objects.filter(
+            status='PENDING', available_at__lte=now
+        ).order_by('available_at', 'id').select_for_update(skip_locked=True).values_list('id', flat=True)[:batch_size])
+        Notification.objects.filter(id__in=ids).update(available_at=now + CLAIM_LEASE, attempts=F('attempts') + 1)
+    return list(Notification.objects.filter(id__in=ids).order_by('id'))
+
+
+def send_batch(sender, batch_size=DEFAULT_BATCH_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS, now=None):
+    """
+    Claim up to ``batch_size`` due notifications and send them. Failed ones are retried
+    after ``backoff``, and marked FAILED after ``max_attempts``.
+    Returns a dict with the number of notifications sent, retried and failed.
+    """
+    now = now or timezone.now()
+    result = {'sent': 0, 'retried': 0, 'failed': 0}
+    notifications = _claim(batch_size, now)
+    for notification in notifications:
+        try:
+            sender.send(notification)
+        except Exception as e:
+            notification.last_error = f'{type(e).__name__}: {e}'[:1000]
+            if notification.attempts >= max_attempts:
+                notification.status = 'FAILED'
+                result['failed'] += 1
+                logger.warning('Notification %d failed after %d attempts: %s',
+                               notification.id, notification.attempts, notification.last_error)
+            else:
+                notification.available_at = now + backoff(notification.attempts)
+                result['retried'] += 1
+        else:
+            notification.status = 'SENT'
+            notification.sent_at = timezone.now()
+            result['sent'] += 1
+    Notification.objects.bulk_update(notifications, ['status', 'available_at', 'last_error', 'sent_at'])
+    return result
+
+
+def drain(sender, batch_size=DEFAULT_BATCH_SIZE, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """
+    Send batches until no notification is due.
+    Returns the totals of send_batch and the elapsed time in ms.
+    """
+    started = time.perf_counter()
+    totals = {'sent': 0, 'retried': 0, 'failed': 0}
+    while True:
+        result = send_batch(sender, batch_size, max_attempts)
+        for key, value in result.items():
+            totals[key] += value
+        if sum(result.values()) < batch_size:
+            break
+    totals['elapsed_ms'] = round((time.perf_counter() - started) * 1000, 2)
+    return totals
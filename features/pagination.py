@@ -0,0 +1,104 @@
+import base64
+import json
+
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(value, pk):
+    """
+    Encode the (ordering value, id) of the last row on a page into an opaque cursor.
+    """
+    if hasattr(value, 'isoformat'):
+        value = value.isoformat()
+    raw = json.dumps([value, pk], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        raw_value, pk = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        pk = int(pk)
+        value = parse_datetime(raw_value) if raw_value is not None else None
+    except (ValueError, TypeError):
+        raise InvalidCursor('Invalid cursor')
+
+    if raw_value is not None and value is None:
+        raise InvalidCursor('Invalid cursor')
+    return value, pk
+
+
+def get_page_size(request):
+    try:
+        page_size = int(request.GET.get('page_size', DEFAULT_PAGE_SIZE))
+    except (TypeError, ValueError):
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(page_size, MAX_PAGE_SIZE))
+
+
+def _keyset_query(queryset, request, field, descending):
+    page_size = get_page_size(request)
+    after = 'lt' if descending else 'gt'
+
+    cursor = request.GET.get('cursor')
+    if cursor:
+        value, pk = decode_cursor(cursor)
+        if value is None:
+            queryset = queryset.filter(**{f'{field}__isnull': True, f'id__{after}': pk})
+        else:
+            queryset = queryset.filter(
+                Q(**{f'{field}__{after}': value}) |
+                Q(**{field: value, f'id__{after}': pk}) |
+                Q(**{f'{field}__isnull': True})
+            )
+
+    if descending:
+        ordering = [F(field).desc(nulls_last=True), '-id']
+    else:
+        ordering = [F(field).asc(nulls_last=True), 'id']
+
+    # One extra row tells us whether there is a next page
+    return queryset.order_by(*ordering)[:page_size + 1], page_size
+
+
+def _split_page(rows, page_size, field):
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        last = rows[-1]
+        # Rows are model instances, or dicts from .values() that include field and id
+        if isinstance(last, dict):
+            next_cursor = encode_cursor(last[field], last['id'])
+        else:
+            next_cursor = encode_cursor(getattr(last, field), last.pk)
+    return rows, next_cursor
+
+
+def paginate_by_keyset(queryset, request, field, descending=False):
+    """
+    Keyset (cursor) pagination over ``(field, id)``.
+
+    Rows are ordered by ``field`` then ``id`` (both descending if requested, NULLs last)
+    and each page starts strictly after the row encoded in ``?cursor=``, so the cost of a
+    page does not depend on how deep into the list it is.
+    Returns ``(rows, next_cursor)``; ``next_cursor`` is None on the last page.
+    Raises InvalidCursor if the cursor cannot be decoded.
+    """
+    query, page_size = _keyset_query(queryset, request, field, descending)
+    return _split_page(list(query), page_size, field)
+
+
+async def apaginate_by_keyset(queryset, request, field, descending=False):
+    """
+    Async version of paginate_by_keyset, for views using the async ORM.
+    """
+    query, page_size = _keyset_query(queryset, request, field, descending)
+    return _split_page([row async for row in query], page_size, field)
@@ -0,0 +1,34 @@
+import json
+
+from django.conf import settings
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from .renderers import orjson
+
+
+def loads(body):
+    """
+    Decode a UTF-8 JSON request body, with orjson when it is installed.
+    Raises ValueError if the body isn't valid JSON.
+    """
+    if orjson is None:
+        return json.loads(body)
+    return orjson.loads(body)
+
+
+class FastJSONParser(parsers.JSONParser):
+    """
+    JSONParser that decodes UTF-8 bodies with orjson when it is installed.
+    Other charsets, and installs without orjson, go through DRF's parser.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') not in ('utf-8', 'utf8'):
+            return super().parse(stream, media_type, parser_context)
+        try:
+            return orjson.loads(stream.read())
+        except ValueError as exc:
+            raise ParseError('JSON parse error - %s' % str(exc))
@@ -0,0 +1,193 @@
+import datetime
+import math
+import threading
+import time
+import zlib
+from collections import Counter
+
+import numpy as np
+from django.conf import settings
+from django.utils import timezone
+
+from .models import Scholarship, RecommendationFeatures
+from .search import FALLBACK_WEIGHTS, FIELD_WEIGHTS, tokenize
+
+# Bump when text_vector changes meaning; stored vectors of older versions are recomputed
+FEATURE_VERSION = 1
+TEXT_DIMENSIONS = 64
+
+# Each component scores 0..1; the recommendation score is their weighted sum
+WEIGHTS = {'education': 0.35, 'similarity': 0.3, 'urgency': 0.2, 'capacity': 0.15}
+# A scholarship open to every level matches any student halfway
+OPEN_LEVEL_MATCH = 0.5
+# Urgency decays by 1/e for every this many days until the deadline
+URGENCY_DAYS = 30
+# Remaining places at which the capacity component reaches 0.5
+CAPACITY_HALF = 10
+# Rows re-read on every refresh from before the watermark, for transactions that committed late
+REFRESH_OVERLAP = datetime.timedelta(minutes=1)
+
+NO_LEVEL = -1
+LEVEL_CODES = {code: index for index, (code, _) in enumerate(Scholarship.EDUCATION_CHOICES)}
+TEXT_FIELDS = list(FIELD_WEIGHTS)
+
+
+def text_vector(fields):
+    """
+    Unit-length hashed term vector of a scholarship's text, weighted like the search index.
+    Uses crc32 rather than hash() so vectors stay comparable across processes.
+    """
+    vector = np.zeros(TEXT_DIMENSIONS, dtype=np.float32)
+    for field, weight in FIELD_WEIGHTS.items():
+        for token, count in Counter(tokenize(fields[field])).items():
+            digest = zlib.crc32(token.encode())
+            sign = 1.0 if digest & 1 else -1.0
+            vector[(digest >> 1) % TEXT_DIMENSIONS] += sign * FALLBACK_WEIGHTS[weight] * (1 + math.log(count))
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def store_features(scholarship):
+    RecommendationFeatures.objects.update_or_create(scholarship=scholarship, defaults={
+        'version': FEATURE_VERSION,
+        'text_vector': text_vector({field: getattr(scholarship, field) for field in TEXT_FIELDS}).tobytes(),
+    })
+
+
+def _compute_missing_vectors(ids, batch_size=1000):
+    # Scholarships saved without the signal (bulk inserts) or with an outdated feature version
+    vectors = {}
+    for start in range(0, len(ids), batch_size):
+        rows = Scholarship.objects.filter(id__in=ids[start:start + batch_size]).values('id', *TEXT_FIELDS)
+        batch = [RecommendationFeatures(scholarship_id=row['id'], version=FEATURE_VERSION,
+                                        text_vector=text_vector(row).tobytes()) for row in rows]
+        RecommendationFeatures.objects.bulk_create(
+            batch, update_conflicts=True, unique_fields=['scholarship'], update_fields=['version', 'text_vector']
+        )
+        vectors.update((features.scholarship_id, features.text_vector) for features in batch)
+    return vectors
+
+
+class FeatureTable:
+    """
+    Every scholarship's recommendation features as NumPy columns, one row per scholarship.
+    Loaded from the database on first use, then refreshed with only the rows whose
+    updated_at moved since the last refresh, at most every RECOMMENDATION_REFRESH_SECONDS.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self._rows = {}  # scholarship id -> row
+        self.ids = np.empty(0, dtype=np.int64)
+        self.active = np.empty(0, dtype=bool)
+        self.level = np.empty(0, dtype=np.int8)
+        self.deadline = np.empty(0, dtype=np.float64)  # Unix time
+        self.remaining = np.empty(0, dtype=np.float64)
+        self.vectors = np.empty((0, TEXT_DIMENSIONS), dtype=np.float32)
+        self._watermark = None
+        self._refreshed_at = None
+
+    def refresh(self):
+        with self._lock:
+            interval = getattr(settings, 'RECOMMENDATION_REFRESH_SECONDS', 5)
+            if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < interval:
+                return
+            self._refreshed_at = time.monotonic()
+
+            scholarships = Scholarship.objects.all()
+            if self._watermark is not None:
+                scholarships = scholarships.filter(updated_at__gte=self._watermark - REFRESH_OVERLAP)
+            changed = list(scholarships.values_list(
+                'id', 'status', 'educationLevel', 'deadline', 'max_applications', 'current_applicants', 'updated_at',
+                'recommendation_features__version', 'recommendation_features__text_vector',
+            ).iterator(chunk_size=5000))
+            if not changed:
+                return
+
+            missing = _compute_missing_vectors([row[0] for row in changed if row[7] != FEATURE_VERSION])
+            new_rows = []
+            for pk, status, level, deadline, max_applications, current, updated_at, _, vector in changed:
+                values = (
+                    status == 'ACTIVE',
+                    LEVEL_CODES.get(level, NO_LEVEL),
+                    deadline.timestamp(),
+                    max_applications - current,
+                    np.frombuffer(missing.get(pk, vector), dtype=np.float32),
+                )
+                row = self._rows.get(pk)
+                if row is None:
+                    new_rows.append((pk, values))
+                else:
+                    self.active[row], self.level[row], self.deadline[row], self.remaining[row], self.vectors[row] = values
+                if self._watermark is None or updated_at > self._watermark:
+                    self._watermark = updated_at
+
+            if new_rows:
+                start = len(self.ids)
+                self._rows.update((pk, start + offset) for offset, (pk, _) in enumerate(new_rows))
+                columns = list(zip(*(values for _, values in new_rows)))
+                self.ids = np.concatenate([self.ids, [pk for pk, _ in new_rows]])
+                self.active = np.concatenate([self.active, columns[0]])
+                self.level = np.concatenate([self.level, np.array(columns[1], dtype=np.int8)])
+                self.deadline = np.concatenate([self.deadline, columns[2]])
+                self.remaining = np.concatenate([self.remaining, np.array(columns[3], dtype=np.float64)])
+                self.vectors = np.concatenate([self.vectors, np.stack(columns[4])])
+
+    def remove(self, scholarship_id):
+        with self._lock:
+            row = self._rows.get(scholarship_id)
+            if row is not None:
+                self.active[row] = False
+
+    def profile(self, scholarship_ids):
+        """
+        Unit-length mean text vector of the given scholarships, or None if none are known.
+        """
+        with self._lock:
+            rows = [self._rows[pk] for pk in scholarship_ids if pk in self._rows]
+            if not rows:
+                return None
+            vector = self.vectors[rows].sum(axis=0)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else None
+
+    def score(self, education_level, applied_ids, limit, now=None):
+        """
+        The best ``limit`` open scholarships the student hasn't applied to, as
+        ``[(scholarship id, score)]`` best first.
+        """
+        now = (now or timezone.now()).timestamp()
+        profile = self.profile(applied_ids)
+        with self._lock:
+            candidates = self.active & (self.deadline > now) & (self.remaining > 0)
+            candidates[[self._rows[pk] for pk in applied_ids if pk in self._rows]] = False
+            rows = np.flatnonzero(candidates)
+
+            level = LEVEL_CODES.get(education_level, NO_LEVEL)
+            if level == NO_LEVEL:
+                education = np.full(len(rows), OPEN_LEVEL_MATCH)
+            else:
+                levels = self.level[rows]
+                education = np.where(levels == level, 1.0, np.where(levels == NO_LEVEL, OPEN_LEVEL_MATCH, 0.0))
+            urgency = np.exp(-(self.deadline[rows] - now) / (URGENCY_DAYS * 86400))
+            remaining = self.remaining[rows]
+            capacity = remaining / (remaining + CAPACITY_HALF)
+            # One matrix-vector product over the whole table is cheaper than copying out the candidate rows
+            similarity = np.clip((self.vectors @ profile)[rows], 0, 1) if profile is not None else 0.0
+            scores = (
+                WEIGHTS['education'] * education + WEIGHTS['similarity'] * similarity
+                + WEIGHTS['urgency'] * urgency + WEIGHTS['capacity'] * capacity
+            )
+            ids = self.ids[rows]
+
+        if len(rows) > limit:
+            best = np.argpartition(-scores, limit - 1)[:limit]
+            ids, scores = ids[best], scores[best]
+        order = np.lexsort((ids, -scores))
+        return [(int(ids[index]), float(scores[index])) for index in order]
+
+
+feature_table = FeatureTable()
@@ -0,0 +1,80 @@
+import math
+
+from django.http import HttpResponse
+from rest_framework import renderers
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # Optional: without it responses are encoded by DRF's stdlib renderer
+    orjson = None
+
+# Unknown types (Decimal, lazy strings, querysets, ...) are converted the way DRF's encoder does it,
+# OPT_UTC_Z writes UTC datetimes with a Z suffix like DRF, and OPT_NON_STR_KEYS allows the
+# integer keys json.dumps accepts
+ORJSON_OPTIONS = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS) if orjson else 0
+_encoder_default = JSONEncoder().default
+
+
+def _default(obj):
+    value = _encoder_default(obj)
+    if isinstance(value, float) and not math.isfinite(value):
+        # e.g. Decimal('NaN'); a TypeError hands the whole payload to DRF
+        raise TypeError('Out of range float value')
+    return value
+
+
+# Skipped by exact type while looking for floats; they are most of the values in a payload
+_SCALARS = frozenset({str, int, bool, type(None)})
+
+
+def _has_non_finite_float(data):
+    # orjson writes NaN and Infinity as null, where DRF raises (STRICT_JSON) or writes them out
+    if isinstance(data, dict):
+        values = data.values()
+    elif isinstance(data, (list, tuple)):
+        values = data
+    else:
+        return isinstance(data, float) and not math.isfinite(data)
+    for value in values:
+        if type(value) not in _SCALARS and _has_non_finite_float(value):
+            return True
+    return False
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed, producing the same
+    bytes as DRF's compact output. Indented output (browsable API, ``; indent=``),
+    data holding NaN or Infinity and installs without orjson go through DRF's renderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (orjson is None or data is None or self.get_indent(accepted_media_type, renderer_context or {})
+                or _has_non_finite_float(data)):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except TypeError:
+            # orjson only serializes exact dict/list subclasses it knows; let DRF handle the rest
+            return super().render(data, accepted_media_type, renderer_context)
+        # Escaped by DRF because they are line terminators in JavaScript
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+_renderer = FastJSONRenderer()
+
+
+def dumps(data):
+    """
+    Encode ``data`` as FastJSONRenderer does.
+    """
+    return _renderer.render(data)
+
+
+def json_response(data, status=200):
+    """
+    JSON response for views that don't go through DRF (async views, cached responses),
+    encoded exactly as the REST_FRAMEWORK renderer would encode it.
+    """
+    return HttpResponse(dumps(data), content_type='application/json', status=status)
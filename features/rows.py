@@ -0,0 +1,111 @@
+from django.utils import timezone
+
+from .models import ApplicationFormField
+
+# Read-only fast paths for the list endpoints: response dicts are built straight from
+# .values() rows, without a serializer field or model instance per row. Each builder
+# must produce exactly what its serializer would; the parity tests check that.
+
+
+def datetime_field(value):
+    # Same as DRF's DateTimeField with the default ISO 8601 format
+    if not value:
+        return None
+    if timezone.is_aware(value):
+        value = value.astimezone(timezone.get_current_timezone())
+    value = value.isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+# ScholarshipListPreviewSerializer
+SCHOLARSHIP_PREVIEW_VALUES = ('id', 'title', 'provider__organizationName', 'deadline')
+
+
+def scholarship_previews(queryset):
+    return queryset.values(*SCHOLARSHIP_PREVIEW_VALUES)
+
+
+def scholarship_preview(row):
+    return {
+        'id': row['id'],
+        'title': row['title'],
+        'provider_name': row['provider__organizationName'],
+        'deadline': datetime_field(row['deadline']),
+    }
+
+
+# ScholarshipApplicationSerializer
+APPLICATION_VALUES = (
+    'id', 'scholarship_id', 'status', 'responses', 'files', 'submitted_at', 'created_at', 'updated_at',
+    'reviewed_at', 'review_notes', 'scholarship__title', 'scholarship__provider__organizationName',
+    'student__id', 'student__firstName', 'student__lastName', 'student__email', 'student__educationLevel',
+)
+FORM_FIELD_VALUES = ('scholarship_id', 'id', 'field_type', 'label', 'required', 'options', 'order')
+
+
+def applications(queryset):
+    return queryset.values(*APPLICATION_VALUES)
+
+
+def form_fields(scholarship_ids):
+    """
+    Form fields of every given scholarship in one query, in form order.
+    Build the result with ``group_form_fields``.
+    """
+    return ApplicationFormField.objects.filter(scholarship_id__in=scholarship_ids).values(*FORM_FIELD_VALUES)
+
+
+def group_form_fields(rows):
+    by_scholarship = {}
+    for row in rows:
+        by_scholarship.setdefault(row['scholarship_id'], []).append({
+            'id': row['id'],
+            'field_type': row['field_type'],
+            'label': row['label'],
+            'required': row['required'],
+            'options': row['options'],
+            'order': row['order'],
+        })
+    return by_scholarship
+
+
+def application(row, form_fields_by_scholarship):
+    return {
+        'id': row['id'],
+        'scholarship': row['scholarship_id'],
+        'student': {
+            'id': row['student__id'],
+            'firstName': row['student__firstName'],
+            'lastName': row['student__lastName'],
+            'email': row['student__email'],
+            'educationLevel': row['student__educationLevel'],
+        },
+        'status': row['status'],
+        'responses': row['responses'],
+        'files': row['files'],
+        'submitted_at': datetime_field(row['submitted_at']),
+        'created_at': datetime_field(row['created_at']),
+        'updated_at': datetime_field(row['updated_at']),
+        'reviewed_at': datetime_field(row['reviewed_at']),
+        'review_notes': row['review_notes'],
+        'scholarship_title': row['scholarship__title'],
+        'provider_name': row['scholarship__provider__organizationName'],
+        'form_fields': form_fields_by_scholarship.get(row['scholarship_id'], []),
+    }
+
+
+def serialize_applications(queryset):
+    """
+    What ScholarshipApplicationSerializer(queryset, many=True).data would be, in two queries.
+    """
+    rows = list(applications(queryset))
+    fields = group_form_fields(form_fields({row['scholarship_id'] for row in rows}))
+    return [application(row, fields) for row in rows]
+
+
+async def aserialize_applications(queryset):
+    rows = [row async for row in applications(queryset)]
+    fields = group_form_fields([row async for row in form_fields({row['scholarship_id'] for row in rows})])
+    return [application(row, fields) for row in rows]
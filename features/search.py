@@ -0,0 +1,158 @@
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import Scholarship
+
+SEARCH_CONFIG = 'english'
+# Title matches count more than description matches, which count more than requirements
+FIELD_WEIGHTS = {'title': 'A', 'description': 'B', 'requirements': 'C'}
+FALLBACK_WEIGHTS = {'A': 1.0, 'B': 0.4, 'C': 0.2}
+
+TOKEN_RE = re.compile(r'\w+')
+STOP_WORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it',
+    'of', 'on', 'or', 'that', 'the', 'this', 'to', 'with',
+}
+
+
+def search_vector():
+    """
+    The weighted tsvector expression. The scholarship_search_index migration builds
+    the GIN index on this expression, so changing it needs a migration that rebuilds the index.
+    """
+    from django.contrib.postgres.search import SearchVector
+
+    vectors = [SearchVector(field, weight=weight, config=SEARCH_CONFIG) for field, weight in FIELD_WEIGHTS.items()]
+    combined = vectors[0]
+    for vector in vectors[1:]:
+        combined = combined + vector
+    return combined
+
+
+def active_scholarships():
+    return Scholarship.objects.filter(status='ACTIVE', deadline__gt=timezone.now())
+
+
+def search_scholarships(query, offset, limit):
+    """
+    Rank active scholarships against ``query``.
+    Returns ``(total, scholarships)`` for the requested slice, best match first,
+    each scholarship annotated with ``rank``.
+    """
+    if connection.vendor == 'postgresql':
+        return _search_postgres(query, offset, limit)
+    return _search_fallback(query, offset, limit)
+
+
+def _search_postgres(query, offset, limit):
+    from django.contrib.postgres.search import SearchQuery, SearchRank
+
+    search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type='websearch')
+    matches = active_scholarships().annotate(search=search_vector()).filter(search=search_query)
+    total = matches.count()
+    page = matches.annotate(
+        rank=SearchRank(search_vector(), search_query)
+    ).select_related('provider').order_by('-rank', 'deadline', 'id')[offset:offset + limit]
+    return total, list(page)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall((text or '').lower()) if token not in STOP_WORDS]
+
+
+class InvertedIndex:
+    """
+    In-process index used when the database has no full-text search (SQLite test runs).
+    Built lazily from the database and kept current by the Scholarship save/delete signals.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = defaultdict(dict)  # token -> {scholarship id: weighted term frequency}
+        self._documents = {}  # scholarship id -> tokens it is posted under
+        self._built = False
+
+    def _add(self, scholarship_id, fields):
+        # Sublinear term frequency so a long description can't outweigh a title match
+        scores = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            for token, count in Counter(tokenize(fields[field])).items():
+                scores[token] += FALLBACK_WEIGHTS[weight] * (1 + math.log(count))
+        for token, score in scores.items():
+            self._postings[token][scholarship_id] = score
+        self._documents[scholarship_id] = set(scores)
+
+    def _remove(self, scholarship_id):
+        for token in self._documents.pop(scholarship_id, ()):
+            postings = self._postings[token]
+            postings.pop(scholarship_id, None)
+            if not postings:
+                del self._postings[token]
+
+    def _ensure_built(self):
+        if self._built:
+            return
+        for row in Scholarship.objects.values('id', *FIELD_WEIGHTS).iterator(chunk_size=2000):
+            self._add(row['id'], row)
+        self._built = True
+
+    def update(self, scholarship):
+        with self._lock:
+            if self._built:
+                self._remove(scholarship.pk)
+                self._add(scholarship.pk, {field: getattr(scholarship, field) for field in FIELD_WEIGHTS})
+
+    def remove(self, scholarship_id):
+        with self._lock:
+            self._remove(scholarship_id)
+
+    def reset(self):
+        with self._lock:
+            self._postings.clear()
+            self._documents.clear()
+            self._built = False
+
+    def rank(self, query):
+        """
+        Ids of documents containing every query term, with tf-idf scores.
+        """
+        terms = set(tokenize(query))
+        if not terms:
+            return {}
+        with self._lock:
+            self._ensure_built()
+            postings = sorted((self._postings.get(term, {}) for term in terms), key=len)
+            candidates = set(postings[0])
+            for posting in postings[1:]:
+                candidates &= posting.keys()
+
+            document_count = max(len(self._documents), 1)
+            scores = dict.fromkeys(candidates, 0.0)
+            for posting in postings:
+                idf = math.log(1 + document_count / (1 + len(posting)))
+                for scholarship_id in candidates:
+                    scores[scholarship_id] += posting[scholarship_id] * idf
+        return scores
+
+
+fallback_index = InvertedIndex()
+
+
+def _search_fallback(query, offset, limit):
+    scores = fallback_index.rank(query)
+    active_ids = set(active_scholarships().filter(id__in=list(scores)).values_list('id', flat=True))
+    ranked = sorted(active_ids, key=lambda scholarship_id: (-scores[scholarship_id], scholarship_id))
+
+    page_ids = ranked[offset:offset + limit]
+    scholarships = Scholarship.objects.select_related('provider').in_bulk(page_ids)
+    page = []
+    for scholarship_id in page_ids:
+        scholarship = scholarships[scholarship_id]
+        scholarship.rank = scores[scholarship_id]
+        page.append(scholarship)
+    return len(ranked), page
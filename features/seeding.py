@@ -0,0 +1,146 @@
+import datetime
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from . import caching
+from .models import Students, Providers, Scholarship, ApplicationFormField, ScholarshipApplication
+from .search import fallback_index
+
+# Every seeded account shares this password, hashed once for the whole run
+SEED_PASSWORD = 'seed-password'
+
+WORDS = (
+    'engineering', 'medicine', 'law', 'arts', 'science', 'research', 'leadership', 'community',
+    'women', 'rural', 'international', 'graduate', 'merit', 'need', 'technology', 'agriculture',
+    'education', 'music', 'sports', 'business', 'climate', 'health', 'mathematics', 'literature',
+)
+# File fields are left out so seeded applications can be submitted as plain JSON
+FIELD_TYPES = ['text', 'textarea', 'number', 'select', 'checkbox']
+# Most seeded scholarships are open, like a live listing
+SCHOLARSHIP_STATUSES = ['ACTIVE'] * 7 + ['CLOSED', 'EXPIRED', 'DRAFT']
+APPLICATION_STATUSES = ['SUBMITTED'] * 5 + ['UNDER_REVIEW'] * 2 + ['ACCEPTED', 'REJECTED']
+
+
+def _phrase(rng, length):
+    return ' '.join(rng.choice(WORDS) for _ in range(length))
+
+
+def _answer(rng, field):
+    if field.field_type == 'number':
+        return rng.randint(0, 100)
+    if field.field_type == 'select':
+        return rng.choice(field.options)
+    if field.field_type == 'checkbox':
+        return rng.random() < 0.5
+    return _phrase(rng, 12 if field.field_type == 'textarea' else 3)
+
+
+def seed(providers=10, students=100, scholarships=200, fields_per_scholarship=4,
+         applications_per_student=5, batch_size=1000, random_seed=0):
+    """
+    Bulk insert synthetic providers, students, scholarships, form fields and applications.
+
+    Rows get a per-run prefix, so seeding can be repeated against the same database.
+    Every student applies to ``applications_per_student`` distinct scholarships (fewer if
+    there aren't enough), and each scholarship's ``current_applicants`` matches its rows.
+    Returns the number of rows created per model.
+    """
+    rng = random.Random(random_seed)
+    run = uuid.uuid4().hex[:6]
+    now = timezone.now()
+    password = make_password(SEED_PASSWORD)
+    levels = [code for code, _ in Scholarship.EDUCATION_CHOICES]
+
+    # Pick every student's scholarships up front so applicant counts are known before insert
+    picks = [
+        rng.sample(range(scholarships), min(applications_per_student, scholarships))
+        for _ in range(students)
+    ]
+    applicants = [0] * scholarships
+    for chosen in picks:
+        for index in chosen:
+            applicants[index] += 1
+
+    with transaction.atomic():
+        provider_rows = Providers.objects.bulk_create([
+            Providers(
+                organizationName=f'Seed {run} Foundation {index}',
+                organizationEmail=f'p{run}{index}@seed.test',
+                organizationWebsite='https://example.com',
+                password=password,
+            )
+            for index in range(providers)
+        ], batch_size=batch_size)
+
+        scholarship_rows = Scholarship.objects.bulk_create([
+            Scholarship(
+                provider=rng.choice(provider_rows),
+                title=f'{_phrase(rng, 3).title()} Scholarship {index}',
+                description=f'Supports students in {_phrase(rng, 10)}.',
+                requirements=f'Applicants must show {_phrase(rng, 6)}.',
+                educationLevel=rng.choice(levels),
+                deadline=now + datetime.timedelta(days=rng.randint(1, 365), minutes=rng.randint(0, 1439)),
+                max_applications=applicants[index] + rng.randint(1, 500),
+                current_applicants=applicants[index],
+                status=rng.choice(SCHOLARSHIP_STATUSES),
+            )
+            for index in range(scholarships)
+        ], batch_size=batch_size)
+
+        field_rows = ApplicationFormField.objects.bulk_create([
+            ApplicationFormField(
+                scholarship=scholarship,
+                field_type=field_type,
+                label=f'Question {order + 1}',
+                required=order == 0,
+                options=['Yes', 'No', 'Maybe'] if field_type == 'select' else None,
+                order=order,
+            )
+            for scholarship in scholarship_rows
+            for order, field_type in enumerate(rng.choices(FIELD_TYPES, k=fields_per_scholarship))
+        ], batch_size=batch_size)
+        fields_by_scholarship = {}
+        for field in field_rows:
+            fields_by_scholarship.setdefault(field.scholarship_id, []).append(field)
+
+        student_rows = Students.objects.bulk_create([
+            Students(
+                firstName='Seed',
+                lastName=f'{run}{index}'[:15],
+                email=f's{run}{index}@seed.test',
+                educationLevel=rng.choice(levels),
+                password=password,
+            )
+            for index in range(students)
+        ], batch_size=batch_size)
+
+        application_rows = ScholarshipApplication.objects.bulk_create([
+            ScholarshipApplication(
+                scholarship=scholarship_rows[index],
+                student=student,
+                status=rng.choice(APPLICATION_STATUSES),
+                responses={
+                    str(field.id): _answer(rng, field)
+                    for field in fields_by_scholarship.get(scholarship_rows[index].id, [])
+                },
+                submitted_at=now - datetime.timedelta(minutes=rng.randint(0, 60 * 24 * 90)),
+            )
+            for student, chosen in zip(student_rows, picks)
+            for index in chosen
+        ], batch_size=batch_size)
+
+    # Bulk inserts skip the save signals that keep cached listings and the search index current
+    caching.invalidate(caching.SCHOLARSHIP_LIST)
+    fallback_index.reset()
+
+    return {
+        'providers': len(provider_rows),
+        'students': len(student_rows),
+        'scholarships': len(scholarship_rows),
+        'form fields': len(field_rows),
+        'applications': len(application_rows),
+    }
@@ -1,5 +1,11 @@
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.template import TemplateSyntaxError
 from rest_framework import serializers
-from .models import Students, Providers,Scholarship, ApplicationFormField, ScholarshipApplication
+from . import caching
+from .letters import compile_template
+from .storage import FILE_OPTION_PARSERS
+from .models import Students, Providers,Scholarship, ApplicationFormField, ScholarshipApplication, Job
 
 class StudentRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, max_length=128)
@@ -15,33 +21,15 @@ class StudentRegistrationSerializer(serializers.ModelSerializer):
         }
 
     def create(self, validated_data):
+        # Views may pass an already computed hash as encoded_password
         password = validated_data.pop('password')
-        student = Students.objects.create(**validated_data)
-        student.set_password(password)
-        student.save()
-        return student
+        encoded = validated_data.pop('encoded_password', None) or make_password(password)
+        return Students.objects.create(password=encoded, **validated_data)
 
+# Account lookup and the password check happen in the async login view
 class StudentLoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
-
-    def validate(self, data):
-        email = data.get('email')
-        password = data.get('password')
-
-        try:
-            student = Students.objects.get(email=email)
-            if not student.check_password(password):
-                raise serializers.ValidationError({
-                    'error': 'Invalid password'
-                })
-            data['student'] = student
-        except Students.DoesNotExist:
-            raise serializers.ValidationError({
-                'error': 'No student account found with this email'
-            })
-        
-        return data
 class ProviderRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, max_length=128)
 
@@ -55,33 +43,15 @@ class ProviderRegistrationSerializer(serializers.ModelSerializer):
         }
 
     def create(self, validated_data):
+        # Views may pass an already computed hash as encoded_password
         password = validated_data.pop('password')
-        provider = Providers.objects.create(**validated_data)
-        provider.set_password(password)
-        provider.save()
-        return provider
+        encoded = validated_data.pop('encoded_password', None) or make_password(password)
+        return Providers.objects.create(password=encoded, **validated_data)
 
+# Account lookup and the password check happen in the async login view
 class ProviderLoginSerializer(serializers.Serializer):
     organizationEmail = serializers.EmailField(max_length=25)
     password = serializers.CharField(write_only=True)
-
-    def validate(self, data):
-        email = data.get('organizationEmail')
-        password = data.get('password')
-
-        try:
-            provider = Providers.objects.get(organizationEmail=email)
-            if not provider.check_password(password):
-                raise serializers.ValidationError({
-                    'error': 'Invalid password'
-                })
-            data['provider'] = provider
-        except Providers.DoesNotExist:
-            raise serializers.ValidationError({
-                'error': 'No provider account found with this email'
-            })
-        
-        return data
     
 
 class ScholarshipSerializer(serializers.ModelSerializer):
@@ -98,11 +68,19 @@ class ScholarshipSerializer(serializers.ModelSerializer):
             'current_applicants', 
             'status',
             'provider',
+            'letter_template',
             'created_at', 
             'updated_at'
         ]
         read_only_fields = ['id', 'current_applicants', 'status', 'provider', 'created_at', 'updated_at']
 
+    def validate_letter_template(self, value):
+        try:
+            compile_template(value)
+        except TemplateSyntaxError as e:
+            raise serializers.ValidationError(f'Invalid letter template: {e}')
+        return value
+
 
 class ScholarshipListPreviewSerializer(serializers.ModelSerializer):
     provider_name = serializers.CharField(source='provider.organizationName', read_only=True)
@@ -116,6 +94,12 @@ class ScholarshipListPreviewSerializer(serializers.ModelSerializer):
             'deadline'
         ]
 
+class ScholarshipSearchResultSerializer(ScholarshipListPreviewSerializer):
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta(ScholarshipListPreviewSerializer.Meta):
+        fields = ScholarshipListPreviewSerializer.Meta.fields + ['rank']
+
 # To return details of a scholarship
 class ScholarshipDetailSerializer(serializers.ModelSerializer):
     provider_name = serializers.CharField(source='provider.organizationName')
@@ -142,24 +126,63 @@ class ApplicationFormFieldSerializer(serializers.ModelSerializer):
         model = ApplicationFormField
         fields = ['id', 'field_type', 'label', 'required', 'options', 'order']
 
+# Incoming form field; sending back an existing field's id keeps that field (and the responses keyed by it)
+class ApplicationFormFieldWriteSerializer(ApplicationFormFieldSerializer):
+    id = serializers.IntegerField(required=False)
+
+    def validate(self, data):
+        # Normalize the upload limits a file field can override, see storage.file_limits
+        options = data.get('options')
+        if data.get('field_type') == 'file' and isinstance(options, dict):
+            options = dict(options)
+            for name, parse in FILE_OPTION_PARSERS.items():
+                if name in options:
+                    options[name] = parse(options[name])
+                    if options[name] is None:
+                        raise serializers.ValidationError({'options': f'Invalid {name}'})
+            data['options'] = options
+        return data
+
+
 class ApplicationFormCreateSerializer(serializers.Serializer):
-    fields = ApplicationFormFieldSerializer(many=True)
+    fields = ApplicationFormFieldWriteSerializer(many=True)
+
+    UPDATABLE_FIELDS = ['field_type', 'label', 'required', 'options', 'order']
 
     def create(self, validated_data):
+        """
+        Replace the scholarship's form with the submitted fields in one transaction.
+        Submitted fields are matched to existing ones by id, or else by type and label,
+        so unchanged fields keep their ids; unmatched existing fields are deleted.
+        """
         scholarship = validated_data['scholarship']
         fields_data = validated_data['fields']
-        
-        # Delete existing fields if any
-        ApplicationFormField.objects.filter(scholarship=scholarship).delete()
-        
-        # Create new fields
-        fields = []
-        for order, field_data in enumerate(fields_data):
-            field_data['order'] = order
-            field_data['scholarship'] = scholarship
-            fields.append(ApplicationFormField.objects.create(**field_data))
-        
-        return fields
+
+        with transaction.atomic():
+            current = ApplicationFormField.objects.select_for_update().filter(scholarship=scholarship)
+            existing = {field.id: field for field in current}
+            by_label = {(field.field_type, field.label): field for field in existing.values()}
+
+            to_update, to_create = [], []
+            for order, field_data in enumerate(fields_data):
+                field_data['order'] = order
+                field_id = field_data.pop('id', None)
+                field = existing.get(field_id) or by_label.get((field_data['field_type'], field_data['label']))
+                if field is None or field in to_update:
+                    to_create.append(ApplicationFormField(scholarship=scholarship, **field_data))
+                    continue
+                for name, value in field_data.items():
+                    setattr(field, name, value)
+                to_update.append(field)
+
+            kept = {field.id for field in to_update}
+            ApplicationFormField.objects.filter(id__in=[pk for pk in existing if pk not in kept]).delete()
+            ApplicationFormField.objects.bulk_update(to_update, self.UPDATABLE_FIELDS)
+            ApplicationFormField.objects.bulk_create(to_create)
+
+        # bulk_update/bulk_create skip the signals that refresh cached forms
+        caching.invalidate(caching.scholarship_scope(scholarship.id))
+        return sorted(to_update + to_create, key=lambda field: field.order)
 
 
 class StudentProfileSerializer(serializers.ModelSerializer):
@@ -204,6 +227,55 @@ class ScholarshipApplicationSerializer(serializers.ModelSerializer):
             'educationLevel': student.educationLevel
         }
 
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # Load students, scholarships, providers and form fields up front instead of per row
+        return queryset.select_related('student', 'scholarship__provider').prefetch_related('scholarship__form_fields')
+
     def get_form_fields(self, obj):
-        fields = ApplicationFormField.objects.filter(scholarship=obj.scholarship)
-        return ApplicationFormFieldSerializer(fields, many=True).data
\ No newline at end of file
+        # Every application to a scholarship shares its form, so serialize it once per scholarship
+        form_fields = self.context.setdefault('form_fields_by_scholarship', {})
+        if obj.scholarship_id not in form_fields:
+            fields = obj.scholarship.form_fields.all()
+            form_fields[obj.scholarship_id] = ApplicationFormFieldSerializer(fields, many=True).data
+        return form_fields[obj.scholarship_id]
+
+
+# Compact row for the provider's application inbox; full detail comes from get_application_detail
+class ScholarshipApplicationListSerializer(serializers.ModelSerializer):
+    student_name = serializers.StringRelatedField(source='student')
+
+    class Meta:
+        model = ScholarshipApplication
+        fields = ['id', 'student_name', 'status', 'submitted_at']
+
+    @staticmethod
+    def setup_eager_loading(queryset):
+        # Skip the responses/files JSON columns, which dominate row size
+        return queryset.select_related('student').only(
+            'id', 'status', 'submitted_at', 'student__firstName', 'student__lastName'
+        )
+
+
+class ApplicationReviewSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    status = serializers.ChoiceField(choices=['ACCEPTED', 'REJECTED'])
+    notes = serializers.CharField(required=False, allow_blank=True, default='')
+
+
+class BatchReviewSerializer(serializers.Serializer):
+    MAX_REVIEWS = 1000
+
+    reviews = ApplicationReviewSerializer(many=True, allow_empty=False, max_length=MAX_REVIEWS)
+
+    def validate_reviews(self, reviews):
+        ids = [review['id'] for review in reviews]
+        if len(set(ids)) != len(ids):
+            raise serializers.ValidationError('Each application can only be reviewed once per batch.')
+        return reviews
+
+
+class JobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Job
+        fields = ['id', 'task', 'status', 'priority', 'attempts', 'result', 'error', 'created_at', 'started_at', 'finished_at']
@@ -0,0 +1,44 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import caching
+from .recommendations import TEXT_FIELDS, feature_table, store_features
+from .search import fallback_index
+from .models import Scholarship, ApplicationFormField
+
+
+@receiver([post_save, post_delete], sender=Scholarship)
+def invalidate_scholarship_responses(sender, instance, **kwargs):
+    # Only once the change is committed; before that a concurrent request would cache the
+    # old row under the new version
+    scopes = [caching.SCHOLARSHIP_LIST, caching.scholarship_scope(instance.pk)]
+    transaction.on_commit(lambda: caching.invalidate(*scopes))
+
+
+@receiver(post_save, sender=Scholarship)
+def update_search_index(sender, instance, **kwargs):
+    fallback_index.update(instance)
+
+
+@receiver(post_delete, sender=Scholarship)
+def remove_from_search_index(sender, instance, **kwargs):
+    fallback_index.remove(instance.pk)
+
+
+@receiver(post_save, sender=Scholarship)
+def update_recommendation_features(sender, instance, created, update_fields, **kwargs):
+    # Other changes reach the feature table through updated_at
+    if created or update_fields is None or not update_fields.isdisjoint(TEXT_FIELDS):
+        store_features(instance)
+
+
+@receiver(post_delete, sender=Scholarship)
+def remove_from_recommendations(sender, instance, **kwargs):
+    feature_table.remove(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=ApplicationFormField)
+def invalidate_application_form_responses(sender, instance, **kwargs):
+    scope = caching.scholarship_scope(instance.scholarship_id)
+    transaction.on_commit(lambda: caching.invalidate(scope))
@@ -0,0 +1,89 @@
+import hashlib
+import math
+import os
+
+from django.conf import settings
+from django.core.files.storage import storages
+
+
+class UploadRejected(Exception):
+    pass
+
+
+def get_storage():
+    return storages[getattr(settings, 'APPLICATION_UPLOAD_STORAGE', 'default')]
+
+
+def parse_max_size_mb(value):
+    """
+    A positive size in MB from a field option (a number or numeric string), or None.
+    """
+    if isinstance(value, bool):
+        return None
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    return value if 0 < value < math.inf else None
+
+
+def parse_extensions(value):
+    """
+    Lowercase extensions with a leading dot from a field option (a list or a
+    comma-separated string), or None if there are none.
+    """
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list) or not all(isinstance(extension, str) for extension in value):
+        return None
+    extensions = ['.' + extension.strip().lstrip('.').lower() for extension in value if extension.strip().lstrip('.')]
+    return extensions or None
+
+
+FILE_OPTION_PARSERS = {'max_size_mb': parse_max_size_mb, 'allowed_extensions': parse_extensions}
+
+
+def file_limits(field):
+    """
+    Size limit in bytes and allowed extensions for a file form field.
+    Providers can override the defaults through the field's options, e.g.
+    ``{"max_size_mb": 5, "allowed_extensions": [".pdf"]}``; options are checked when
+    the form is saved, and any invalid stored value falls back to the default.
+    """
+    options = field.options if isinstance(field.options, dict) else {}
+    max_size_mb = parse_max_size_mb(options.get('max_size_mb')) or settings.APPLICATION_UPLOAD_MAX_SIZE_MB
+    extensions = parse_extensions(options.get('allowed_extensions')) or settings.APPLICATION_UPLOAD_ALLOWED_EXTENSIONS
+    return int(max_size_mb * 1024 * 1024), [extension.lower() for extension in extensions]
+
+
+def validate_upload(field, upload):
+    if field.field_type != 'file':
+        raise UploadRejected(f'Field {field.label} does not accept files')
+
+    max_size, extensions = file_limits(field)
+    if upload.size > max_size:
+        raise UploadRejected(f'File for {field.label} exceeds {max_size / (1024 * 1024):g} MB')
+
+    extension = os.path.splitext(upload.name)[1].lower()
+    if extension not in extensions:
+        raise UploadRejected(f'File for {field.label} must be one of: {", ".join(extensions)}')
+
+
+def store_upload(upload):
+    """
+    Stream an uploaded file into storage under the hash of its content and return its path.
+    Files are read chunk by chunk, never whole; identical uploads share one stored copy.
+    """
+    digest = hashlib.sha256()
+    for chunk in upload.chunks():
+        digest.update(chunk)
+    content_hash = digest.hexdigest()
+
+    extension = os.path.splitext(upload.name)[1].lower()
+    path = f'applications/{content_hash[:2]}/{content_hash}{extension}'
+
+    storage = get_storage()
+    if storage.exists(path):
+        return path
+    upload.seek(0)
+    return storage.save(path, upload)
@@ -0,0 +1,49 @@
+import tempfile
+
+from django.core.files import File
+
+from .exports import EXPORT_FORMATS, stream_export
+from .jobs import task
+from .letters import stream_letters
+from .models import Scholarship
+from .storage import get_storage
+
+# Job tasks, registered by name with jobs.task; apps.py imports this module so every
+# process that queues or runs jobs knows them.
+
+
+def _save_export(chunks, filename, content_type):
+    # Spooled through a temporary file, so memory use stays flat however big the export
+    with tempfile.TemporaryFile() as file:
+        for chunk in chunks:
+            file.write(chunk)
+        size = file.tell()
+        file.seek(0)
+        path = get_storage().save(f'exports/{filename}', File(file, name=filename))
+    return {'path': path, 'filename': filename, 'content_type': content_type, 'bytes': size}
+
+
+@task('export_applications')
+def export_applications(scholarship_id, export_format):
+    """
+    Write a scholarship's application export to storage, for download once the job is done.
+    """
+    scholarship = Scholarship.objects.only('id').get(id=scholarship_id)
+    export = EXPORT_FORMATS[export_format]
+    filename = f'scholarship-{scholarship_id}-applications.{export_format}'
+    return _save_export(stream_export(scholarship, export), filename, export.content_type)
+
+
+@task('export_application_letters', cpu_bound=True)
+def export_application_letters(scholarship_id):
+    """
+    Write every applicant's letter for a scholarship to storage as NDJSON. Rendering
+    the provider's template for each application is pure Python work, so this runs
+    in the worker's process pool.
+    """
+    scholarship = Scholarship.objects.select_related('provider').only(
+        'id', 'title', 'deadline', 'letter_template', 'provider__organizationName'
+    ).get(id=scholarship_id)
+    filename = f'scholarship-{scholarship_id}-letters.ndjson'
+    chunks = stream_letters(scholarship, scholarship.provider.organizationName)
+    return _save_export(chunks, filename, 'application/x-ndjson')
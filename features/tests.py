@@ -1,3 +1,1278 @@
-from django.test import TestCase
+import csv
+import datetime
+import io
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth.models import User
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.db.models import Count, F
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from . import instrumentation, jobs, letters, notifications, rows, urls
+from .expiry import expire_due_scholarships
+from .management.commands.benchmark_endpoints import SCENARIOS
+from .models import (
+    Students, Providers, Scholarship, ApplicationFormField, ScholarshipApplication, RecommendationFeatures,
+    Notification, Job
+)
+from .parsers import FastJSONParser
+from .recommendations import feature_table
+from .renderers import FastJSONRenderer
+from .search import fallback_index
+from .seeding import seed
+from .serializers import ScholarshipApplicationSerializer, ScholarshipListPreviewSerializer
+from .storage import get_storage
+
+
+def create_provider(name='Test Foundation'):
+    return Providers.objects.create(
+        organizationName=name,
+        organizationEmail=f'{name.split()[0].lower()}@example.com',
+        organizationWebsite='https://example.com',
+        password='unused'
+    )
+
+
+def create_student(index=0):
+    return Students.objects.create(
+        firstName='Student',
+        lastName=str(index),
+        email=f'student{index}@example.com',
+        educationLevel='Undergraduate',
+        password='unused'
+    )
+
+
+def create_scholarship(provider, title='Test Scholarship', **kwargs):
+    values = {
+        'provider': provider,
+        'title': title,
+        'description': 'A scholarship used by the test suite. ' * 3,
+        'requirements': 'Applicants must be enrolled full time.',
+        'deadline': timezone.now() + datetime.timedelta(days=30),
+        'max_applications': 100,
+    }
+    values.update(kwargs)
+    scholarship = Scholarship.objects.create(**values)
+    ApplicationFormField.objects.create(scholarship=scholarship, field_type='text', label='Name', order=0)
+    ApplicationFormField.objects.create(scholarship=scholarship, field_type='textarea', label='Essay', order=1)
+    return scholarship
+
+
+def create_application(scholarship, student):
+    return ScholarshipApplication.objects.create(
+        scholarship=scholarship,
+        student=student,
+        status='SUBMITTED',
+        responses={'1': 'answer'},
+        submitted_at=timezone.now()
+    )
+
+
+class APITestCase(TestCase):
+    def login(self, user_type, user_id):
+        refresh = RefreshToken()
+        refresh['user_type'] = user_type
+        refresh['user_id'] = user_id
+        self.client.defaults['HTTP_AUTHORIZATION'] = f'Bearer {refresh.access_token}'
+
+    def get(self, url, **params):
+        return self.client.get(url, params, secure=True)
+
+    def post(self, url, data):
+        return self.client.post(url, data, content_type='application/json', secure=True)
+
+    def count_queries(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(url, **params)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+
+class ApplicationListQueryCountTests(APITestCase):
+    def setUp(self):
+        self.provider = create_provider()
+
+    def test_scholarship_applications_query_count_is_constant(self):
+        scholarship = create_scholarship(self.provider)
+        url = reverse('list_scholarship_applications', args=[scholarship.id])
+        self.login('provider', self.provider.id)
+
+        create_application(scholarship, create_student(0))
+        baseline = self.count_queries(url)
+
+        for index in range(1, 10):
+            create_application(scholarship, create_student(index))
+        self.assertEqual(self.count_queries(url), baseline)
+
+    def test_student_applications_query_count_is_constant(self):
+        student = create_student()
+        url = reverse('list_student_applications')
+        self.login('student', student.id)
+
+        create_application(create_scholarship(self.provider, title='Scholarship 0'), student)
+        baseline = self.count_queries(url)
+
+        for index in range(1, 10):
+            create_application(create_scholarship(self.provider, title=f'Scholarship {index}'), student)
+        self.assertEqual(self.count_queries(url), baseline)
+
+
+class SubmitApplicationTests(APITestCase):
+    def setUp(self):
+        self.scholarship = create_scholarship(create_provider(), max_applications=2)
+        self.url = reverse('submit_application', args=[self.scholarship.id])
+        self.responses = {str(field.id): 'answer' for field in self.scholarship.form_fields.all()}
+
+    def apply(self, student):
+        self.login('student', student.id)
+        return self.post(self.url, {'responses': self.responses})
+
+    def test_last_slot_closes_scholarship(self):
+        self.assertEqual(self.apply(create_student(0)).status_code, 201)
+        self.assertEqual(self.apply(create_student(1)).status_code, 201)
+
+        self.scholarship.refresh_from_db()
+        self.assertEqual(self.scholarship.current_applicants, 2)
+        self.assertEqual(self.scholarship.status, 'CLOSED')
+
+    def test_filling_last_slot_refreshes_list_even_from_stale_instance(self):
+        caches['default'].clear()
+        url = reverse('list_all_scholarships')
+        self.assertEqual(len(self.get(url).json()['results']), 1)
+
+        # Another request took the first slot after this instance was loaded
+        stale = Scholarship.objects.get(id=self.scholarship.id)
+        Scholarship.objects.filter(id=self.scholarship.id).update(current_applicants=1)
+        # The cached list is only refreshed once the transaction commits
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.assertTrue(stale.add_applicant())
+            self.assertEqual(len(self.get(url).json()['results']), 1)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(Scholarship.objects.get(id=self.scholarship.id).status, 'CLOSED')
+        self.assertEqual(self.get(url).json()['results'], [])
+
+    def test_responses_must_be_an_object(self):
+        self.login('student', create_student().id)
+        url = reverse('submit_application', args=[self.scholarship.id])
+        for responses in [['answer'], '["answer"]', 'not json', 42]:
+            self.assertEqual(self.post(url, {'responses': responses}).status_code, 400)
+        self.assertFalse(ScholarshipApplication.objects.exists())
+
+    def test_full_scholarship_rejects_without_creating_application(self):
+        Scholarship.objects.filter(id=self.scholarship.id).update(current_applicants=2)
+
+        response = self.apply(create_student())
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(ScholarshipApplication.objects.exists())
+        self.scholarship.refresh_from_db()
+        self.assertEqual(self.scholarship.current_applicants, 2)
+
+
+class BatchReviewTests(APITestCase):
+    def setUp(self):
+        self.provider = create_provider()
+        scholarship = create_scholarship(self.provider)
+        other = create_scholarship(create_provider('Other Foundation'), title='Other Scholarship')
+        self.owned = [create_application(scholarship, create_student(index)) for index in range(3)]
+        self.foreign = create_application(other, create_student(3))
+        self.login('provider', self.provider.id)
+
+    def review(self, reviews):
+        return self.post(reverse('review_applications'), {'reviews': reviews})
+
+    def test_reviews_owned_applications_in_one_update(self):
+        reviews = [{'id': application.id, 'status': 'ACCEPTED', 'notes': 'Great'} for application in self.owned]
+        reviews += [{'id': self.foreign.id, 'status': 'REJECTED'}, {'id': 0, 'status': 'REJECTED'}]
+        with CaptureQueriesContext(connection) as queries:
+            response = self.review(reviews)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['updated'], 3)
+        self.assertEqual([result['result'] for result in response.data['results']],
+                         ['updated'] * 3 + ['forbidden', 'not_found'])
+        # One query loads and authorizes every application, one writes them
+        statements = [query['sql'].split()[0] for query in queries.captured_queries]
+        self.assertEqual(statements.count('SELECT'), 1)
+        self.assertEqual(statements.count('UPDATE'), 1)
+
+        for application in self.owned:
+            application.refresh_from_db()
+            self.assertEqual((application.status, application.review_notes), ('ACCEPTED', 'Great'))
+            self.assertIsNotNone(application.reviewed_at)
+        self.foreign.refresh_from_db()
+        self.assertEqual(self.foreign.status, 'SUBMITTED')
+
+    def test_rejects_duplicate_ids_and_invalid_statuses(self):
+        application = self.owned[0]
+        duplicate = self.review([{'id': application.id, 'status': 'ACCEPTED'}] * 2)
+        self.assertEqual(duplicate.status_code, 400)
+        invalid = self.review([{'id': application.id, 'status': 'SUBMITTED'}])
+        self.assertEqual(invalid.status_code, 400)
+        application.refresh_from_db()
+        self.assertEqual(application.status, 'SUBMITTED')
+
+
+class ScholarshipListPaginationTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.provider = create_provider()
+        now = timezone.now()
+        # Two share a deadline, so the id tiebreak decides their order across pages
+        deadlines = [now + datetime.timedelta(days=days) for days in (15, 8, 10, 10, 9)]
+        self.scholarships = [
+            create_scholarship(self.provider, title=f'Scholarship {index}', deadline=deadline)
+            for index, deadline in enumerate(deadlines)
+        ]
+        self.url = reverse('list_all_scholarships')
+
+    def test_cursor_walks_every_page_in_deadline_order(self):
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            data = self.get(self.url, **params).json()
+            seen += [row['id'] for row in data['results']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        expected = sorted(self.scholarships, key=lambda scholarship: (scholarship.deadline, scholarship.id))
+        self.assertEqual(seen, [scholarship.id for scholarship in expected])
+
+    def test_malformed_cursor_is_rejected(self):
+        for cursor in ['not-a-cursor', 'WyJub3QgYSBkYXRlIiwgMV0']:
+            self.assertEqual(self.get(self.url, cursor=cursor).status_code, 400)
+
+    def test_filters(self):
+        Scholarship.objects.filter(id=self.scholarships[0].id).update(educationLevel='PhD')
+        other = create_scholarship(create_provider('Other Foundation'), title='Other Scholarship')
+
+        def ids(**params):
+            return {row['id'] for row in self.get(self.url, **params).json()['results']}
+
+        self.assertEqual(ids(educationLevel='PhD'), {self.scholarships[0].id})
+        self.assertEqual(ids(provider=other.provider_id), {other.id})
+        cutoff = (timezone.now() + datetime.timedelta(days=9, hours=12)).isoformat()
+        self.assertEqual(ids(deadline_before=cutoff), {self.scholarships[1].id, self.scholarships[4].id})
+        self.assertNotIn(self.scholarships[1].id, ids(deadline_after=cutoff))
+        self.assertEqual(self.get(self.url, provider='abc').status_code, 400)
+        self.assertEqual(self.get(self.url, deadline_after='soon').status_code, 400)
+
+
+class ScholarshipApplicationListTests(APITestCase):
+    def setUp(self):
+        self.provider = create_provider()
+        self.scholarship = create_scholarship(self.provider)
+        self.url = reverse('list_scholarship_applications', args=[self.scholarship.id])
+        now = timezone.now()
+        # Two share submitted_at, so the id tiebreak decides their order across pages
+        submitted = [
+            ('SUBMITTED', now - datetime.timedelta(hours=3)),
+            ('ACCEPTED', now - datetime.timedelta(hours=1)),
+            ('SUBMITTED', now - datetime.timedelta(hours=2)),
+            ('SUBMITTED', now - datetime.timedelta(hours=2)),
+            ('REJECTED', now - datetime.timedelta(hours=4)),
+            ('DRAFT', None),
+        ]
+        self.applications = []
+        for index, (status, submitted_at) in enumerate(submitted):
+            application = create_application(self.scholarship, create_student(index))
+            application.status, application.submitted_at = status, submitted_at
+            application.save()
+            self.applications.append(application)
+        create_application(create_scholarship(create_provider('Other Foundation')), create_student(9))
+        self.login('provider', self.provider.id)
+
+    def test_rows_are_compact(self):
+        application = self.applications[1]
+        row = self.get(self.url).json()['applications'][0]
+        self.assertEqual(row, {
+            'id': application.id,
+            'student_name': 'Student 1',
+            'status': 'ACCEPTED',
+            'submitted_at': application.submitted_at.isoformat().replace('+00:00', 'Z'),
+        })
+
+    def test_counts_every_status(self):
+        data = self.get(self.url).json()
+        self.assertEqual(data['total_applications'], 6)
+        self.assertEqual(data['status_counts'], {
+            'DRAFT': 1, 'SUBMITTED': 3, 'UNDER_REVIEW': 0, 'ACCEPTED': 1, 'REJECTED': 1,
+        })
+
+    def test_status_filter_keeps_counts_of_every_status(self):
+        data = self.get(self.url, status='SUBMITTED').json()
+        self.assertEqual(data['total_applications'], 3)
+        self.assertEqual(data['status_counts']['ACCEPTED'], 1)
+        self.assertEqual({row['status'] for row in data['applications']}, {'SUBMITTED'})
+        self.assertEqual(self.get(self.url, status='UNDER_REVIEW').json()['total_applications'], 0)
+
+    def test_cursor_walks_every_page_newest_first(self):
+        seen, cursor = [], None
+        while True:
+            params = {'page_size': 2, **({'cursor': cursor} if cursor else {})}
+            data = self.get(self.url, **params).json()
+            seen += [row['id'] for row in data['applications']]
+            cursor = data['next_cursor']
+            if cursor is None:
+                break
+        tied_later, tied_earlier = sorted([self.applications[3].id, self.applications[2].id], reverse=True)
+        self.assertEqual(seen, [
+            self.applications[1].id, tied_later, tied_earlier,
+            self.applications[0].id, self.applications[4].id, self.applications[5].id,
+        ])
+        self.assertEqual(self.get(self.url, cursor='not-a-cursor').status_code, 400)
+
+
+@override_settings(
+    STORAGES={'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'}},
+    APPLICATION_UPLOAD_MAX_SIZE_MB=1, APPLICATION_UPLOAD_ALLOWED_EXTENSIONS=['.pdf', '.txt'],
+)
+class FileUploadTests(APITestCase):
+    def setUp(self):
+        self.provider = create_provider()
+        self.scholarship = create_scholarship(self.provider, max_applications=10)
+        self.transcript = ApplicationFormField.objects.create(
+            scholarship=self.scholarship, field_type='file', label='Transcript', order=2
+        )
+
+    def submit(self, upload, student=None):
+        student = student or create_student(Students.objects.count())
+        self.login('student', student.id)
+        responses = {str(field.id): 'answer' for field in self.scholarship.form_fields.exclude(field_type='file')}
+        return self.client.post(reverse('submit_application', args=[self.scholarship.id]), {
+            'responses': json.dumps(responses), str(self.transcript.id): upload,
+        }, secure=True)
+
+    def test_multipart_submission_stores_one_copy_per_content(self):
+        self.assertEqual(self.submit(SimpleUploadedFile('a.pdf', b'%PDF same content')).status_code, 201)
+        self.assertEqual(self.submit(SimpleUploadedFile('b.PDF', b'%PDF same content')).status_code, 201)
+
+        first, second = ScholarshipApplication.objects.order_by('id')
+        self.assertEqual(first.responses[str(self.scholarship.form_fields.get(label='Name').id)], 'answer')
+        path = first.files[str(self.transcript.id)]
+        self.assertEqual(second.files[str(self.transcript.id)], path)
+        self.assertEqual(get_storage().listdir(os.path.dirname(path))[1], [os.path.basename(path)])
+
+    def test_default_size_and_extension_limits(self):
+        self.assertEqual(self.submit(SimpleUploadedFile('a.exe', b'binary')).status_code, 400)
+        self.assertEqual(self.submit(SimpleUploadedFile('a.pdf', b'x' * (1024 * 1024 + 1))).status_code, 400)
+        self.assertFalse(ScholarshipApplication.objects.exists())
+
+    def test_field_options_override_limits(self):
+        self.login('provider', self.provider.id)
+        response = self.post(reverse('create_application_form', args=[self.scholarship.id]), {'fields': [
+            {'field_type': 'text', 'label': 'Name', 'order': 0},
+            {'field_type': 'textarea', 'label': 'Essay', 'order': 1},
+            {'id': self.transcript.id, 'field_type': 'file', 'label': 'Transcript', 'order': 2,
+             'options': {'max_size_mb': '2', 'allowed_extensions': 'PNG, jpg'}},
+        ]})
+        self.assertEqual(response.status_code, 201)
+        self.transcript.refresh_from_db()
+        self.assertEqual(self.transcript.options, {'max_size_mb': 2.0, 'allowed_extensions': ['.png', '.jpg']})
+
+        self.assertEqual(self.submit(SimpleUploadedFile('a.pdf', b'%PDF')).status_code, 400)
+        self.assertEqual(self.submit(SimpleUploadedFile('a.png', b'x' * (1024 * 1024 + 1))).status_code, 201)
+
+    def test_invalid_options_are_rejected_on_save_and_ignored_when_stored(self):
+        self.login('provider', self.provider.id)
+        response = self.post(reverse('create_application_form', args=[self.scholarship.id]), {'fields': [
+            {'field_type': 'file', 'label': 'Transcript', 'order': 0, 'options': {'max_size_mb': 'five'}},
+        ]})
+        self.assertEqual(response.status_code, 400)
+
+        # Rows saved before validation fall back to the settings defaults
+        ApplicationFormField.objects.filter(id=self.transcript.id).update(
+            options={'max_size_mb': '5', 'allowed_extensions': 7}
+        )
+        self.assertEqual(self.submit(SimpleUploadedFile('a.txt', b'notes')).status_code, 201)
+
+
+class SearchTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        fallback_index.reset()
+        self.provider = create_provider()
+        self.url = reverse('search_scholarships')
+
+    def test_title_match_ranks_above_description_match(self):
+        in_description = create_scholarship(
+            self.provider, title='Engineering Grant', description='Supports students building robotics projects. ' * 2
+        )
+        in_title = create_scholarship(self.provider, title='Robotics Scholarship')
+
+        data = self.get(self.url, q='robotics').json()
+        self.assertEqual(data['count'], 2)
+        self.assertEqual([row['id'] for row in data['results']], [in_title.id, in_description.id])
+
+    def test_index_follows_saves_and_deletes(self):
+        scholarship = create_scholarship(self.provider, title='Astronomy Award')
+        self.assertEqual(set(fallback_index.rank('astronomy')), {scholarship.id})
+
+        scholarship.title = 'Geology Award'
+        scholarship.save()
+        self.assertEqual(fallback_index.rank('astronomy'), {})
+        self.assertEqual(set(fallback_index.rank('geology')), {scholarship.id})
+        later = create_scholarship(self.provider, title='Geology Fellowship')
+        self.assertEqual(set(fallback_index.rank('geology')), {scholarship.id, later.id})
+
+        scholarship.delete()
+        self.assertEqual(set(fallback_index.rank('geology')), {later.id})
+        self.assertEqual([row['id'] for row in self.get(self.url, q='geology').json()['results']], [later.id])
+
+    def test_empty_queries(self):
+        create_scholarship(self.provider)
+        self.assertEqual(self.get(self.url).status_code, 400)
+        self.assertEqual(self.get(self.url, q='   ').status_code, 400)
+        # Only stop words: nothing to match on
+        self.assertEqual(self.get(self.url, q='the and of').json()['count'], 0)
+
+
+class ScholarshipWriteTests(APITestCase):
+    def setUp(self):
+        self.provider = create_provider()
+        self.login('provider', self.provider.id)
+
+    def test_update_reads_once_and_writes_changed_fields(self):
+        scholarship = create_scholarship(self.provider)
+        url = reverse('update_scholarship', args=[scholarship.id])
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(url, {'title': 'Renamed Scholarship'},
+                                         content_type='application/json', secure=True)
+        self.assertEqual(response.status_code, 200)
+
+        scholarship_queries = [q['sql'] for q in queries if 'features_scholarship' in q['sql']]
+        self.assertEqual(len(scholarship_queries), 2)
+        self.assertTrue(scholarship_queries[1].startswith('UPDATE'))
+        self.assertNotIn('"description"', scholarship_queries[1])
+
+    def test_save_writes_fields_assigned_after_deferred_load(self):
+        scholarship = create_scholarship(self.provider)
+        partial = Scholarship.objects.only('id').get(id=scholarship.id)
+        partial.title = 'Renamed Scholarship'
+        partial.save()
+        scholarship.refresh_from_db()
+        self.assertEqual(scholarship.title, 'Renamed Scholarship')
+
+    def test_cannot_reactivate_closed_scholarship(self):
+        scholarship = create_scholarship(self.provider)
+        Scholarship.objects.filter(id=scholarship.id).update(status='CLOSED')
+
+        scholarship = Scholarship.objects.get(id=scholarship.id)
+        scholarship.status = 'ACTIVE'
+        with self.assertRaises(ValidationError):
+            scholarship.save()
+
+
+class ExpiryTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        provider = create_provider()
+        self.scholarships = [create_scholarship(provider, title=f'Scholarship {index}') for index in range(5)]
+
+    def test_expires_and_closes_in_batches_and_refreshes_the_list(self):
+        url = reverse('list_all_scholarships')
+        self.assertEqual(len(self.get(url).json()['results']), 5)
+
+        past = timezone.now() - datetime.timedelta(days=1)
+        Scholarship.objects.filter(id__in=[self.scholarships[0].id, self.scholarships[1].id]).update(deadline=past)
+        Scholarship.objects.filter(id=self.scholarships[2].id).update(current_applicants=F('max_applications'))
+        # Bulk updates skip signals, so the cached list still shows the full scholarship
+        self.assertIn(self.scholarships[2].id, [row['id'] for row in self.get(url).json()['results']])
+
+        result = expire_due_scholarships(batch_size=1)
+        self.assertEqual((result['expired'], result['closed']), (2, 1))
+        statuses = dict(Scholarship.objects.values_list('id', 'status'))
+        self.assertEqual([statuses[scholarship.id] for scholarship in self.scholarships],
+                         ['EXPIRED', 'EXPIRED', 'CLOSED', 'ACTIVE', 'ACTIVE'])
+        self.assertEqual([row['id'] for row in self.get(url).json()['results']],
+                         [self.scholarships[3].id, self.scholarships[4].id])
+        # Nothing is due any more
+        result = expire_due_scholarships()
+        self.assertEqual((result['expired'], result['closed']), (0, 0))
+
+
+class ApplicationFormEditTests(APITestCase):
+    def test_editing_form_keeps_ids_of_untouched_fields(self):
+        provider = create_provider()
+        scholarship = create_scholarship(provider)
+        fields = {field.label: field.id for field in scholarship.form_fields.all()}
+        url = reverse('create_application_form', args=[scholarship.id])
+        self.login('provider', provider.id)
+
+        # Drop "Name", rename "Essay" by id, and add a new field
+        response = self.post(url, {'fields': [
+            {'id': fields['Essay'], 'field_type': 'textarea', 'label': 'Personal Statement', 'order': 0},
+            {'field_type': 'number', 'label': 'GPA', 'order': 1},
+        ]})
+        self.assertEqual(response.status_code, 201)
+
+        saved = {field.label: field.id for field in scholarship.form_fields.all()}
+        self.assertEqual(saved['Personal Statement'], fields['Essay'])
+        self.assertNotIn('Name', saved)
+        self.assertNotIn(saved['GPA'], fields.values())
+
+        # Resubmitting the same form by type and label, without ids, keeps every id
+        self.post(url, {'fields': [
+            {'field_type': 'textarea', 'label': 'Personal Statement', 'order': 0},
+            {'field_type': 'number', 'label': 'GPA', 'order': 1},
+        ]})
+        self.assertEqual({field.label: field.id for field in scholarship.form_fields.all()}, saved)
+
+
+class ResponseCacheTests(APITestCase):
+    def test_detail_is_cached_until_scholarship_changes(self):
+        scholarship = create_scholarship(create_provider())
+        url = reverse('scholarship_details', args=[scholarship.id])
+
+        first = self.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+        self.assertEqual(self.count_queries(url), 0)
+
+        not_modified = self.client.get(url, secure=True, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            scholarship.title = 'Renamed Scholarship'
+            scholarship.save()
+        changed = self.get(url)
+        self.assertEqual(changed['X-Cache'], 'MISS')
+        self.assertEqual(changed.json()['title'], 'Renamed Scholarship')
+        self.assertNotEqual(changed['ETag'], first['ETag'])
+
+
+    def test_list_is_cached_no_longer_than_its_first_deadline(self):
+        caches['default'].clear()
+        scholarship = create_scholarship(create_provider())
+        create_scholarship(scholarship.provider, title='Later Scholarship')
+        Scholarship.objects.filter(id=scholarship.id).update(deadline=timezone.now() + datetime.timedelta(seconds=60))
+        url = reverse('list_all_scholarships')
+
+        self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+        self.assertEqual(self.get(url)['X-Cache'], 'HIT')
+        with mock.patch('django.core.cache.backends.locmem.time') as clock:
+            clock.time.return_value = time.time() + 61
+            self.assertEqual(self.get(url)['X-Cache'], 'MISS')
+
+
+class ResponseCacheCommitTests(TransactionTestCase):
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('an in-memory SQLite database locks tables for other connections during a write')
+        caches['default'].clear()
+
+    def read_concurrently(self, url):
+        # Another request, on its own database connection, while the caller's transaction is open
+        result = {}
+
+        def read():
+            try:
+                result['data'] = self.client.get(url, secure=True).json()
+            finally:
+                connections.close_all()
+        thread = threading.Thread(target=read)
+        thread.start()
+        thread.join()
+        return result['data']
+
+    def test_scholarship_change_is_not_cached_as_its_old_row_before_commit(self):
+        scholarship = create_scholarship(create_provider())
+        url = reverse('scholarship_details', args=[scholarship.id])
+        with transaction.atomic():
+            scholarship.title = 'Renamed Scholarship'
+            scholarship.save()
+            self.assertEqual(self.read_concurrently(url)['title'], 'Test Scholarship')
+        self.assertEqual(self.client.get(url, secure=True).json()['title'], 'Renamed Scholarship')
+
+    def test_form_change_is_not_cached_as_its_old_rows_before_commit(self):
+        scholarship = create_scholarship(create_provider())
+        url = reverse('get_application_form', args=[scholarship.id])
+        with transaction.atomic():
+            ApplicationFormField.objects.create(scholarship=scholarship, field_type='text', label='City', order=2)
+            self.assertEqual(len(self.read_concurrently(url)), 2)
+        self.assertEqual([field['label'] for field in self.client.get(url, secure=True).json()], ['Name', 'Essay', 'City'])
+
+
+class AsyncReadViewTests(APITestCase):
+    async def test_closed_scholarship_only_visible_to_its_provider(self):
+        provider = await Providers.objects.acreate(
+            organizationName='Async Foundation', organizationEmail='async@example.com', password='unused'
+        )
+        scholarship = await Scholarship.objects.acreate(
+            provider=provider, title='Closed Scholarship', description='Closed', requirements='None',
+            deadline=timezone.now() + datetime.timedelta(days=30), max_applications=10, status='CLOSED'
+        )
+        url = reverse('scholarship_details', args=[scholarship.id])
+
+        response = await self.async_client.get(url, secure=True)
+        self.assertEqual(response.status_code, 404)
+
+        self.login('provider', provider.id)
+        response = await self.async_client.get(url, secure=True, headers={
+            'Authorization': self.client.defaults['HTTP_AUTHORIZATION']
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['title'], 'Closed Scholarship')
+
+
+class PurgeSessionsTests(TestCase):
+    def create_session(self, expire_date):
+        return Session.objects.create(session_key=uuid.uuid4().hex, session_data='', expire_date=expire_date)
+
+    def test_deletes_only_expired_sessions_in_batches(self):
+        now = timezone.now()
+        for _ in range(5):
+            self.create_session(now - datetime.timedelta(days=1))
+        live = self.create_session(now + datetime.timedelta(days=1))
+
+        output = io.StringIO()
+        with CaptureQueriesContext(connection) as queries:
+            call_command('purge_sessions', batch_size=2, stdout=output)
+        self.assertIn('Purged 5 expired sessions', output.getvalue())
+        self.assertEqual(list(Session.objects.values_list('pk', flat=True)), [live.pk])
+        self.assertEqual(sum(query['sql'].startswith('DELETE') for query in queries.captured_queries), 3)
+
+    @override_settings(SESSION_ENGINE='django.contrib.sessions.backends.signed_cookies')
+    def test_skips_engines_without_session_rows(self):
+        self.create_session(timezone.now() - datetime.timedelta(days=1))
+        output = io.StringIO()
+        call_command('purge_sessions', stdout=output)
+        self.assertIn('nothing to purge', output.getvalue())
+        self.assertEqual(Session.objects.count(), 1)
+
+
+class AuthenticationTests(APITestCase):
+    def register(self):
+        response = self.post(reverse('student_register'), {
+            'firstName': 'Ada', 'lastName': 'Lovelace', 'email': 'ada@example.com', 'password': 'analytical-engine'
+        })
+        self.assertEqual(response.status_code, 201)
+        return response.json()
+
+    def test_bearer_token_authenticates_without_session_lookup(self):
+        tokens = self.register()
+        self.client.cookies.clear()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f"Bearer {tokens['access']}"
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(reverse('list_student_applications'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([q for q in queries if 'django_session' in q['sql']])
+
+    def test_refresh_token_issues_access_token(self):
+        tokens = self.register()
+        response = self.post(reverse('token_refresh'), {'refresh': tokens['refresh']})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('access', response.json())
+
+    def test_session_login_still_accepted(self):
+        self.register()
+        self.assertEqual(self.get(reverse('list_student_applications')).status_code, 200)
+
+    def test_login_upgrades_outdated_password_hash(self):
+        with override_settings(PASSWORD_PBKDF2_ITERATIONS=1000):
+            self.register()
+        self.assertIn('$1000$', Students.objects.get().password)
+
+        credentials = {'email': 'ada@example.com', 'password': 'analytical-engine'}
+        self.assertEqual(self.post(reverse('student_login'), credentials).status_code, 200)
+        student = Students.objects.get()
+        self.assertNotIn('$1000$', student.password)
+        self.assertTrue(student.check_password('analytical-engine'))
+
+        credentials['password'] = 'difference-engine'
+        self.assertEqual(self.post(reverse('student_login'), credentials).status_code, 400)
+
+    def test_student_token_rejected_for_provider_endpoint(self):
+        tokens = self.register()
+        self.client.defaults['HTTP_AUTHORIZATION'] = f"Bearer {tokens['access']}"
+        self.assertEqual(self.get(reverse('list_scholarship_applications', args=[1])).status_code, 403)
+
+
+def sequential_scans(sql):
+    """
+    Tables the database plans to read with a full table scan for ``sql``.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}')
+            return [table for (line,) in cursor.fetchall() for table in re.findall(r'Seq Scan on (\w+)', line)]
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [match.group(1) for row in cursor.fetchall() if (match := re.match(r'SCAN (\w+)$', row[-1]))]
+
+
+class QueryPlanTests(APITestCase):
+    """
+    EXPLAIN every query the hot read views run, against enough rows that the planner
+    prefers an index wherever one applies, and fail on any sequential scan.
+    """
+    SCHOLARSHIPS = 1500
+    STUDENTS = 300
+    APPLICATIONS_PER_STUDENT = 10
+
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+        levels = [code for code, _ in Scholarship.EDUCATION_CHOICES]
+        statuses = ['ACTIVE', 'CLOSED', 'EXPIRED', 'DRAFT', 'CLOSED', 'EXPIRED', 'CLOSED', 'EXPIRED', 'CLOSED', 'EXPIRED']
+
+        providers = Providers.objects.bulk_create(
+            Providers(organizationName=f'Foundation {index}', organizationEmail=f'foundation{index}@example.com',
+                      organizationWebsite='https://example.com', password='unused')
+            for index in range(30)
+        )
+        scholarships = Scholarship.objects.bulk_create(
+            Scholarship(provider=providers[index % len(providers)], title=f'Scholarship {index}',
+                        description='A scholarship seeded for query plan tests.', requirements='None',
+                        educationLevel=levels[index % len(levels)], max_applications=1000,
+                        deadline=now + datetime.timedelta(days=index % 90 + 1), status=statuses[index % len(statuses)])
+            for index in range(cls.SCHOLARSHIPS)
+        )
+        ApplicationFormField.objects.bulk_create(
+            ApplicationFormField(scholarship=scholarship, field_type='text', label=f'Question {order}', order=order)
+            for scholarship in scholarships for order in range(2)
+        )
+        students = Students.objects.bulk_create(
+            Students(firstName='Student', lastName=str(index), email=f'student{index}@example.com',
+                     educationLevel=levels[index % len(levels)], password='unused')
+            for index in range(cls.STUDENTS)
+        )
+        # Every student applies to the first scholarship, so its inbox spans several pages
+        ScholarshipApplication.objects.bulk_create(
+            ScholarshipApplication(scholarship=scholarships[1 + (index + offset * 150) % (len(scholarships) - 1) if offset else 0],
+                                   student=student, status='SUBMITTED', responses={},
+                                   submitted_at=now - datetime.timedelta(minutes=index * 10 + offset))
+            for index, student in enumerate(students) for offset in range(cls.APPLICATIONS_PER_STUDENT)
+        )
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        cls.provider = providers[0]
+        cls.scholarship = scholarships[0]
+        cls.student = students[0]
+
+    def setUp(self):
+        # Cached responses run no queries, and the search fallback index is in-process
+        caches['default'].clear()
+        fallback_index.reset()
+
+    def assertNoSequentialScans(self, url, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(url, **params)
+        self.assertEqual(response.status_code, 200)
+
+        scans = [
+            (table, query['sql']) for query in queries
+            if query['sql'].startswith('SELECT') for table in sequential_scans(query['sql'])
+        ]
+        self.assertFalse(scans, f'{url} scans whole tables')
+        return response
+
+    def test_scholarship_listing(self):
+        url = reverse('list_all_scholarships')
+        first_page = self.assertNoSequentialScans(url)
+        self.assertNoSequentialScans(url, cursor=first_page.json()['next_cursor'])
+        self.assertNoSequentialScans(url, educationLevel='Masters')
+        self.assertNoSequentialScans(url, provider=self.provider.id)
+
+    def test_scholarship_search(self):
+        # Building the fallback index reads every scholarship once per process, not per request
+        fallback_index.rank('scholarship')
+        self.assertNoSequentialScans(reverse('search_scholarships'), q='scholarship seeded')
+
+    def test_scholarship_detail_and_form(self):
+        self.assertNoSequentialScans(reverse('scholarship_details', args=[self.scholarship.id]))
+        self.assertNoSequentialScans(reverse('get_application_form', args=[self.scholarship.id]))
+
+    def test_provider_application_inbox(self):
+        self.login('provider', self.provider.id)
+        url = reverse('list_scholarship_applications', args=[self.scholarship.id])
+        first_page = self.assertNoSequentialScans(url, page_size=5)
+        self.assertNoSequentialScans(url, page_size=5, cursor=first_page.json()['next_cursor'])
+        self.assertNoSequentialScans(url, status='SUBMITTED')
+
+    def test_student_applications(self):
+        self.login('student', self.student.id)
+        self.assertNoSequentialScans(reverse('list_student_applications'))
+
+
+class ApplicationExportTests(APITestCase):
+    def setUp(self):
+        self.provider = create_provider()
+        self.scholarship = create_scholarship(self.provider)
+        name, essay = self.scholarship.form_fields.all()
+        ApplicationFormField.objects.create(scholarship=self.scholarship, field_type='select', label='Name', order=2)
+        self.application = create_application(self.scholarship, create_student())
+        self.application.responses = {str(name.id): 'Ada, "Countess"', str(essay.id): ['line one', 'line two']}
+        self.application.save()
+        self.login('provider', self.provider.id)
+
+    def export(self, export_format):
+        response = self.get(reverse('export_scholarship_applications', args=[self.scholarship.id, export_format]))
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content).decode()
+
+    def test_csv_flattens_responses_by_label(self):
+        header, row = list(csv.reader(io.StringIO(self.export('csv'))))
+        self.assertEqual(header[-3:], ['Name', 'Essay', 'Name (2)'])
+        self.assertEqual(row[0], str(self.application.id))
+        self.assertEqual(row[-3:], ['Ada, "Countess"', '["line one", "line two"]', ''])
+
+    def test_ndjson_streams_one_object_per_application(self):
+        create_application(self.scholarship, create_student(1))
+        lines = self.export('ndjson').splitlines()
+        self.assertEqual(len(lines), 2)
+        record = json.loads(lines[0])
+        self.assertEqual(record['responses'], {'Name': 'Ada, "Countess"', 'Essay': ['line one', 'line two'], 'Name (2)': None})
+
+    def test_responses_that_are_not_objects_export_as_empty_answers(self):
+        ScholarshipApplication.objects.filter(id=self.application.id).update(responses=['Ada'], files='')
+        header, row = list(csv.reader(io.StringIO(self.export('csv'))))
+        self.assertEqual(row[-3:], ['', '', ''])
+
+    def test_csv_escapes_values_spreadsheets_would_run_as_formulas(self):
+        name, essay = self.scholarship.form_fields.filter(order__lt=2).order_by('order')
+        ApplicationFormField.objects.filter(id=essay.id).update(label='=SUM(A1)')
+        ScholarshipApplication.objects.filter(id=self.application.id).update(
+            responses={str(name.id): '=HYPERLINK("http://evil")', str(essay.id): '\t@cmd'}, review_notes='-2+3'
+        )
+        header, row = list(csv.reader(io.StringIO(self.export('csv'))))
+        self.assertEqual(header[-2], "'=SUM(A1)")
+        self.assertEqual(row[-3:-1], ['\'=HYPERLINK("http://evil")', "'\t@cmd"])
+        self.assertEqual(row[header.index('review_notes')], "'-2+3")
+        self.assertEqual(row[0], str(self.application.id))
+
+    async def test_streams_asynchronously_under_asgi(self):
+        url = reverse('export_scholarship_applications', args=[self.scholarship.id, 'ndjson'])
+        response = await self.async_client.get(url, secure=True, headers={
+            'Authorization': self.client.defaults['HTTP_AUTHORIZATION']
+        })
+        body = b''.join([chunk async for chunk in response.streaming_content])
+        self.assertEqual(json.loads(body)['application_id'], self.application.id)
+
+    def test_only_the_scholarship_provider_can_export(self):
+        self.login('provider', create_provider('Other Foundation').id)
+        url = reverse('export_scholarship_applications', args=[self.scholarship.id, 'csv'])
+        self.assertEqual(self.get(url).status_code, 403)
+        self.login('provider', self.provider.id)
+        self.assertEqual(self.get(url.replace('csv', 'xlsx')).status_code, 404)
+
+
+@override_settings(RECOMMENDATION_REFRESH_SECONDS=0)
+class RecommendationTests(APITestCase):
+    def setUp(self):
+        feature_table.reset()
+        self.provider = create_provider()
+        self.student = create_student()
+        self.login('student', self.student.id)
+
+    def recommend(self):
+        response = self.get(reverse('recommend_scholarships'))
+        self.assertEqual(response.status_code, 200)
+        return [result['title'] for result in response.json()['results']]
+
+    def test_ranks_by_level_and_past_applications(self):
+        robotics = create_scholarship(self.provider, 'Robotics Engineering Grant', educationLevel='Undergraduate',
+                                      description='For engineering students building robots and control systems.')
+        create_application(robotics, self.student)
+        create_scholarship(self.provider, 'Graduate Arts Award', educationLevel='Masters')
+        create_scholarship(self.provider, 'Open Music Prize', description='For students of music and composition.')
+        create_scholarship(self.provider, 'Open Engineering Prize', description='For engineering students and robots.')
+        create_scholarship(self.provider, 'Closed Award', status='CLOSED')
+        create_scholarship(self.provider, 'Full Award', max_applications=1, current_applicants=1)
+
+        self.assertEqual(self.recommend(), ['Open Engineering Prize', 'Open Music Prize', 'Graduate Arts Award'])
+
+    def test_feature_table_picks_up_changes(self):
+        create_scholarship(self.provider, 'Undergraduate Award', educationLevel='Undergraduate')
+        other = create_scholarship(self.provider, 'Open Award')
+        self.assertEqual(self.recommend(), ['Undergraduate Award', 'Open Award'])
+
+        # Changes that skip save signals reach the table through updated_at; new rows without
+        # stored features (bulk inserts) get them computed on the next refresh
+        Scholarship.objects.filter(id=other.id).update(status='CLOSED', updated_at=timezone.now())
+        Scholarship.objects.bulk_create([Scholarship(
+            provider=self.provider, title='Bulk Award', description='Inserted in bulk.', requirements='None',
+            deadline=timezone.now() + datetime.timedelta(days=1), max_applications=5, status='ACTIVE'
+        )])
+        self.assertEqual(self.recommend(), ['Undergraduate Award', 'Bulk Award'])
+        self.assertEqual(RecommendationFeatures.objects.count(), 3)
+
+
+class InstrumentationTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        instrumentation.reset()
+
+    def test_request_timings_reach_header_and_metrics(self):
+        scholarship = create_scholarship(create_provider())
+        response = self.get(reverse('scholarship_details', args=[scholarship.id]))
+        self.assertRegex(response['Server-Timing'], r'^db;dur=[\d.]+;desc="\d+ queries", total;dur=[\d.]+$')
+
+        self.assertEqual(self.get(reverse('metrics')).status_code, 302)
+        self.client.force_login(User.objects.create_user('staff', is_staff=True))
+        body = self.get(reverse('metrics')).content.decode()
+        self.assertIn('scholarhive_request_duration_seconds_count{view="scholarship_details"} 1', body)
+        self.assertIn('scholarhive_requests_total{view="scholarship_details",method="GET",status="200"} 1', body)
+        self.assertIn('scholarhive_response_cache_total{name="scholarship_detail",result="misses"}', body)
+
+    def test_only_slow_requests_are_logged_at_info(self):
+        url = reverse('list_all_scholarships')
+        with self.assertNoLogs('features.instrumentation', 'INFO'):
+            self.get(url)
+        with override_settings(SLOW_REQUEST_MS=0), self.assertLogs('features.instrumentation', 'INFO') as logs:
+            self.get(url)
+        self.assertEqual(logs.records[0].levelname, 'INFO')
+
+    @override_settings(SLOW_QUERY_MS=0)
+    def test_slow_queries_are_sampled_into_the_log(self):
+        with self.assertLogs('features.instrumentation', 'WARNING') as logs:
+            self.get(reverse('list_all_scholarships'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'list_all_scholarships')
+        self.assertEqual(len(record['slow_queries']), record['db_queries'])
+
+
+class FastJSONTests(TestCase):
+    def test_renders_same_bytes_as_drf(self):
+        scholarship = create_scholarship(create_provider())
+        application = create_application(scholarship, create_student())
+        data = {
+            'application': ScholarshipApplicationSerializer(application).data,
+            'deadline': timezone.now(),
+            'naive': datetime.datetime(2024, 1, 2, 3, 4, 5),
+            'amount': Decimal('1500.50'),
+            'text': 'Bourse d\u2019\u00e9tudes \u2028 \U0001f393',
+            'counts': {1: 2},
+            'label': gettext_lazy('Scholarship'),
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+        # Out of range floats are rejected like DRF does with STRICT_JSON, not written as null
+        for value in (float('nan'), [1.5, {'score': float('inf')}], Decimal('NaN')):
+            with self.assertRaises(ValueError):
+                JSONRenderer().render({'value': value})
+            with self.assertRaises(ValueError):
+                FastJSONRenderer().render({'value': value})
+
+    def test_parses_request_bodies(self):
+        response = self.client.post(reverse('token_refresh'), '{"refresh": ', content_type='application/json', secure=True)
+        self.assertEqual(response.status_code, 400)
+
+        parsed = FastJSONParser().parse(io.BytesIO('{"title": "Bourse d\u2019\u00e9tudes", "id": 1}'.encode()))
+        self.assertEqual(parsed, {'title': 'Bourse d\u2019\u00e9tudes', 'id': 1})
+
+
+class FastListSerializationTests(APITestCase):
+    def setUp(self):
+        seed(providers=3, students=10, scholarships=12, applications_per_student=4)
+        reviewed = ScholarshipApplication.objects.order_by('id').values_list('id', flat=True)[:5]
+        ScholarshipApplication.objects.filter(id__in=list(reviewed)).update(
+            status='ACCEPTED', reviewed_at=timezone.now(), review_notes='Tr\u00e8s bien \u2014 admitted'
+        )
+        Students.objects.filter(id=Students.objects.order_by('id').first().id).update(educationLevel=None)
+
+    def render(self, data):
+        return FastJSONRenderer().render(data)
+
+    def test_scholarship_previews_match_serializer(self):
+        scholarships = Scholarship.objects.order_by('deadline', 'id')
+        expected = ScholarshipListPreviewSerializer(scholarships.select_related('provider'), many=True).data
+        actual = [rows.scholarship_preview(row) for row in rows.scholarship_previews(scholarships)]
+        self.assertEqual(self.render(actual), self.render(expected))
+
+    def test_applications_match_serializer(self):
+        applications = ScholarshipApplication.objects.order_by('id')
+        expected = ScholarshipApplicationSerializer(
+            ScholarshipApplicationSerializer.setup_eager_loading(applications), many=True
+        ).data
+        self.assertEqual(self.render(rows.serialize_applications(applications)), self.render(expected))
+
+    def test_student_applications_view_matches_serializer(self):
+        student = Students.objects.order_by('id').first()
+        self.login('student', student.id)
+        response = self.get(reverse('list_student_applications'))
+
+        applications = ScholarshipApplication.objects.filter(student=student).order_by('-submitted_at')
+        expected = ScholarshipApplicationSerializer(
+            ScholarshipApplicationSerializer.setup_eager_loading(applications), many=True
+        ).data
+        self.assertEqual(response.content, self.render(expected))
+
+
+class FailingSender:
+    def send(self, notification):
+        raise ConnectionError('mail server unavailable')
+
+
+class NotificationOutboxTests(APITestCase):
+    def setUp(self):
+        self.provider = create_provider()
+        self.scholarship = create_scholarship(self.provider, max_applications=1)
+        self.student = create_student()
+
+    def submit(self, student):
+        self.login('student', student.id)
+        responses = {str(field.id): 'answer' for field in self.scholarship.form_fields.all()}
+        return self.post(reverse('submit_application', args=[self.scholarship.id]), {'responses': responses})
+
+    def test_writes_are_queued_with_the_change_they_announce(self):
+        self.assertEqual(self.submit(self.student).status_code, 201)
+        # The scholarship is now full, so this submission rolls back along with its notification
+        self.assertEqual(self.submit(create_student(1)).status_code, 400)
+        notification = Notification.objects.get()
+        self.assertEqual((notification.event, notification.recipient), ('APPLICATION_SUBMITTED', 'test@example.com'))
+
+        self.login('provider', self.provider.id)
+        application = ScholarshipApplication.objects.get()
+        self.post(reverse('review_applications'), {'reviews': [{'id': application.id, 'status': 'ACCEPTED'}]})
+        reviewed = Notification.objects.get(event='APPLICATION_REVIEWED')
+        self.assertEqual((reviewed.recipient, reviewed.payload['status']), (self.student.email, 'ACCEPTED'))
+
+    def test_file_sender_delivers_due_notifications(self):
+        create_application(self.scholarship, self.student)
+        notifications.applications_reviewed([(ScholarshipApplication.objects.get(), 'Test Scholarship', 'a@example.com')])
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'outbox.ndjson')
+            result = notifications.drain(notifications.FileSender(path))
+            with open(path) as file:
+                lines = [json.loads(line) for line in file]
+
+        self.assertEqual(result['sent'], 1)
+        self.assertEqual(lines[0]['to'], 'a@example.com')
+        self.assertEqual(lines[0]['subject'], 'Your application for Test Scholarship')
+        self.assertEqual(Notification.objects.get().status, 'SENT')
+        # Nothing is due any more
+        self.assertEqual(notifications.drain(FailingSender())['sent'], 0)
+
+    def test_failures_back_off_then_give_up(self):
+        notification = Notification.objects.create(event='DEADLINE_REMINDER', recipient='a@example.com', payload={})
+        now = timezone.now()
+        for attempt in range(1, 4):
+            result = notifications.send_batch(FailingSender(), max_attempts=3, now=now)
+            notification.refresh_from_db()
+            self.assertEqual(notification.attempts, attempt)
+            if attempt < 3:
+                self.assertEqual(result['retried'], 1)
+                self.assertGreaterEqual(notification.available_at, now + notifications.backoff(attempt))
+                # Not due again until the backoff has passed
+                self.assertEqual(notifications.send_batch(FailingSender(), now=now)['retried'], 0)
+                now = notification.available_at
+        self.assertEqual(result['failed'], 1)
+        self.assertEqual(notification.status, 'FAILED')
+        self.assertIn('mail server unavailable', notification.last_error)
+
+    def test_deadline_reminders_are_queued_once(self):
+        Scholarship.objects.filter(id=self.scholarship.id).update(deadline=timezone.now() + datetime.timedelta(days=1))
+        create_scholarship(self.provider, title='Later Scholarship')
+
+        self.assertEqual(notifications.enqueue_deadline_reminders(), 1)
+        notifications.enqueue_deadline_reminders()
+        reminder = Notification.objects.get()
+        self.assertEqual((reminder.event, reminder.payload['scholarship_id']), ('DEADLINE_REMINDER', self.scholarship.id))
+
+
+@jobs.task('test_square', cpu_bound=True)
+def square(number):
+    return number * number
+
+
+@jobs.task('test_fail', max_attempts=2)
+def fail():
+    raise ValueError('boom')
+
+
+@override_settings(STORAGES={'default': {'BACKEND': 'django.core.files.storage.InMemoryStorage'}})
+class JobQueueTests(APITestCase):
+    def setUp(self):
+        self.provider = create_provider()
+        self.scholarship = create_scholarship(self.provider)
+        create_application(self.scholarship, create_student())
+        self.login('provider', self.provider.id)
+
+    def queue_export(self, key=None):
+        url = reverse('queue_application_export', args=[self.scholarship.id, 'csv'])
+        headers = {'HTTP_IDEMPOTENCY_KEY': key} if key else {}
+        return self.client.post(url, secure=True, **headers)
+
+    def test_export_job_runs_off_the_request_path(self):
+        queued = self.queue_export(key='export-1')
+        self.assertEqual(queued.status_code, 202)
+        self.assertEqual(queued.data['status'], 'QUEUED')
+        # Retrying with the same key doesn't queue a second export
+        repeated = self.queue_export(key='export-1')
+        self.assertEqual((repeated.status_code, repeated.data['id']), (200, queued.data['id']))
+
+        self.assertEqual(jobs.Worker().run(until_empty=True)['succeeded'], 1)
+        status_response = self.get(reverse('job_status', args=[queued.data['id']]))
+        self.assertEqual(status_response.data['status'], 'SUCCEEDED')
+        download = self.get(reverse('download_job_result', args=[queued.data['id']]))
+        rows = list(csv.reader(io.StringIO(b''.join(download.streaming_content).decode())))
+        self.assertEqual(len(rows), 2)
+
+        # Other users can't see the job
+        self.login('provider', create_provider('Other Foundation').id)
+        self.assertEqual(self.get(reverse('job_status', args=[queued.data['id']])).status_code, 404)
+
+    def test_letter_export_job_writes_every_letter(self):
+        create_application(self.scholarship, create_student(1))
+        url = reverse('queue_letter_export', args=[self.scholarship.id])
+        queued = self.client.post(url, secure=True)
+        self.assertEqual(queued.status_code, 202)
+        self.assertTrue(jobs.TASKS['export_application_letters'].cpu_bound)
+
+        self.assertEqual(jobs.Worker().run(until_empty=True)['succeeded'], 1)
+        download = self.get(reverse('download_job_result', args=[queued.data['id']]))
+        lines = [json.loads(line) for line in b''.join(download.streaming_content).splitlines()]
+        self.assertEqual(len(lines), 2)
+        self.assertIn('Dear Test Foundation Selection Committee', lines[0]['letter'])
+
+        self.login('provider', create_provider('Other Foundation').id)
+        self.assertEqual(self.client.post(url, secure=True).status_code, 403)
+
+    def test_purge_deletes_old_finished_jobs_and_their_files(self):
+        old_id, recent_id = self.queue_export().data['id'], self.queue_export().data['id']
+        queued, _ = jobs.enqueue('test_square', {'number': 2})
+        jobs.Worker().run(until_empty=True)
+        Job.objects.filter(id__in=[old_id, queued.id]).update(finished_at=timezone.now() - datetime.timedelta(hours=25))
+        Job.objects.filter(id=queued.id).update(status='QUEUED')
+        old_path, recent_path = [Job.objects.get(id=pk).result['path'] for pk in (old_id, recent_id)]
+
+        out = io.StringIO()
+        call_command('purge_jobs', stdout=out)
+        self.assertEqual(out.getvalue().strip(), 'Purged 1 finished jobs and 1 files.')
+        self.assertFalse(get_storage().exists(old_path))
+        self.assertTrue(get_storage().exists(recent_path))
+        self.assertEqual(set(Job.objects.values_list('id', flat=True)), {recent_id, queued.id})
+        self.assertEqual(self.get(reverse('download_job_result', args=[old_id])).status_code, 404)
+
+    def test_claims_by_priority_and_reclaims_after_visibility_timeout(self):
+        low, _ = jobs.enqueue('test_square', {'number': 2})
+        high, _ = jobs.enqueue('test_square', {'number': 3}, priority=5)
+        [claimed] = jobs.claim(1)
+        self.assertEqual(claimed.id, high.id)
+        self.assertEqual(jobs.claim(5, now=timezone.now())[0].id, low.id)
+
+        # The first worker is presumed lost once the timeout has passed
+        later = timezone.now() + jobs.DEFAULT_VISIBILITY_TIMEOUT + datetime.timedelta(seconds=1)
+        retaken = [job.id for job in jobs.claim(5, now=later)]
+        self.assertEqual(retaken, [high.id, low.id])
+        self.assertFalse(jobs.finish(claimed, result=9))
+
+    def test_failures_are_retried_then_fail(self):
+        job, _ = jobs.enqueue('test_fail')
+        self.assertEqual(jobs.Worker().run_once()['retried'], 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.error), ('QUEUED', 'ValueError: boom'))
+
+        Job.objects.filter(id=job.id).update(available_at=timezone.now())
+        self.assertEqual(jobs.Worker().run_once()['failed'], 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('FAILED', 2))
+
+    def test_cpu_bound_jobs_run_in_the_process_pool(self):
+        job, _ = jobs.enqueue('test_square', {'number': 7})
+        worker = jobs.Worker(processes=1)
+        try:
+            self.assertEqual(worker.run_once()['succeeded'], 1)
+        finally:
+            worker.close()
+        job.refresh_from_db()
+        self.assertEqual(job.result, 49)
+
+
+class ApplicationLetterTests(APITestCase):
+    def setUp(self):
+        caches['default'].clear()
+        self.provider = create_provider()
+        self.scholarship = create_scholarship(self.provider)
+        self.fields = {field.label: str(field.id) for field in self.scholarship.form_fields.all()}
+        self.students = [create_student(index) for index in range(3)]
+        for student in self.students:
+            create_application(self.scholarship, student)
+        ScholarshipApplication.objects.filter(student=self.students[0]).update(
+            responses={self.fields['Essay']: 'I want to study engineering.'}
+        )
+
+    def test_student_letter_uses_profile_and_responses(self):
+        application = ScholarshipApplication.objects.get(student=self.students[0])
+        url = reverse('get_application_letter', args=[application.id])
+        self.login('student', self.students[0].id)
+        letter = self.get(url).data['letter']
+        self.assertIn('Dear Test Foundation Selection Committee', letter)
+        self.assertIn('apply for the Test Scholarship', letter)
+        self.assertIn('Essay:\nI want to study engineering.', letter)
+
+        self.login('student', self.students[1].id)
+        self.assertEqual(self.get(url).status_code, 404)
+
+    def test_responses_that_are_not_objects_render_without_answers(self):
+        application = ScholarshipApplication.objects.get(student=self.students[1])
+        ScholarshipApplication.objects.filter(id=application.id).update(responses=['I want to study.'])
+        self.login('student', self.students[1].id)
+        response = self.get(reverse('get_application_letter', args=[application.id]))
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('I want to study.', response.data['letter'])
+
+    def test_provider_template_is_validated_and_rendered_once_per_input(self):
+        self.login('provider', self.provider.id)
+        url = reverse('update_scholarship', args=[self.scholarship.id])
+        for invalid in (
+            '{% if %}', '{% debug %}', '{% load static %}', '{% include "admin/base.html" %}', '{{ 1|pprint }}',
+            '{{ student.firstName|ljust:"1000000000" }}', '{{ student.firstName|rjust:"1000000000" }}',
+            '{{ student.firstName|center:"1000000000" }}', '{{ student.firstName|stringformat:"1000000000s" }}',
+            '{{ 1|floatformat:"1000000000" }}',
+        ):
+            response = self.client.patch(url, {'letter_template': invalid}, content_type='application/json', secure=True)
+            self.assertEqual(response.status_code, 400, invalid)
+        template = 'To {{ scholarship.provider }}: {{ student.firstName }} {{ student.lastName }} applies.'
+        self.client.patch(url, {'letter_template': template}, content_type='application/json', secure=True)
+
+        response = self.get(reverse('stream_application_letters', args=[self.scholarship.id]))
+        lines = [json.loads(line) for line in b''.join(response.streaming_content).splitlines()]
+        self.assertEqual([line['student_id'] for line in lines], [student.id for student in self.students])
+        self.assertEqual(lines[1]['letter'], 'To Test Foundation: Student 1 applies.\n')
+
+        # The same inputs are served from the letter cache without touching the template
+        with mock.patch.object(letters, 'compile_template') as compile_template:
+            response = self.get(reverse('stream_application_letters', args=[self.scholarship.id]))
+            self.assertEqual(len(b''.join(response.streaming_content).splitlines()), 3)
+        compile_template.assert_not_called()
+
+        self.login('provider', create_provider('Other Foundation').id)
+        self.assertEqual(self.get(reverse('stream_application_letters', args=[self.scholarship.id])).status_code, 403)
+
+
+class SeedingTests(TestCase):
+    def test_seeded_applicant_counts_match_applications(self):
+        created = seed(providers=3, students=20, scholarships=15, applications_per_student=4)
+        self.assertEqual(created['applications'], 80)
+        self.assertEqual(ScholarshipApplication.objects.count(), 80)
+
+        counted = Scholarship.objects.annotate(applications_count=Count('applications'))
+        for scholarship in counted:
+            self.assertEqual(scholarship.current_applicants, scholarship.applications_count)
+
+    def test_every_url_has_a_benchmark_scenario(self):
+        names = {pattern.name for pattern in urls.urlpatterns}
+        self.assertEqual(names - set(SCENARIOS), set())
@@ -8,6 +8,7 @@ urlpatterns = [
     path('students/register/', views.student_register, name='student_register'),
     path('students/login/', views.student_login, name='student_login'),
     
+    path('token/refresh/', views.token_refresh, name='token_refresh'),
     path('logout/', views.user_logout, name='user_logout'),
     path('session-status/', views.get_session_status, name='get_session_status'),
     
@@ -17,6 +18,7 @@ urlpatterns = [
     path('scholarships/delete/<int:scholarship_id>/', views.delete_scholarship, name='delete_scholarship'),
     path('scholarships/details/<int:scholarship_id>/', views.scholarship_detail, name='scholarship_details'),
     path('scholarships/', views.list_scholarships, name='list_all_scholarships'),
+    path('scholarships/search/', views.search_scholarships, name='search_scholarships'),
     
     # Application Forms
     path('scholarships/<int:scholarship_id>/application-form/', views.create_application_form, name='create_application_form'),
@@ -25,12 +27,27 @@ urlpatterns = [
     # Apply and Submissions
     path('scholarships/<int:scholarship_id>/apply/', views.submit_application, name='submit_application'),
     path('scholarships/<int:scholarship_id>/applications/', views.list_scholarship_applications, name='list_scholarship_applications'),
+    path('scholarships/<int:scholarship_id>/applications/export/<str:export_format>/', views.export_scholarship_applications, name='export_scholarship_applications'),
+    path('scholarships/<int:scholarship_id>/applications/export/<str:export_format>/job/', views.queue_application_export, name='queue_application_export'),
+    path('scholarships/<int:scholarship_id>/applications/letters/', views.stream_application_letters, name='stream_application_letters'),
+    path('scholarships/<int:scholarship_id>/applications/letters/job/', views.queue_letter_export, name='queue_letter_export'),
     path('applications/<int:application_id>/', views.get_application_detail, name='get_application_detail'),
     path('applications/<int:application_id>/review/', views.review_application, name='review_application'),
+    path('applications/review/', views.review_applications, name='review_applications'),
 
     # Student Applications
     path('student/applications/', views.list_student_applications, name='list_student_applications'),
     path('student/applications/<int:application_id>/', views.get_application_status, name='get_application_status'),
+    path('student/applications/<int:application_id>/letter/', views.get_application_letter, name='get_application_letter'),
+    path('student/recommendations/', views.recommend_scholarships, name='recommend_scholarships'),
+
+    # Background Jobs
+    path('jobs/<int:job_id>/', views.job_status, name='job_status'),
+    path('jobs/<int:job_id>/result/', views.download_job_result, name='download_job_result'),
+
+    # Monitoring
+    path('cache-stats/', views.cache_stats, name='cache_stats'),
+    path('metrics/', views.metrics, name='metrics'),
 ]
 
 
@@ -1,25 +1,110 @@
 # utils.py
 
 from functools import wraps
+from inspect import iscoroutinefunction
+from typing import NamedTuple
+from django.conf import settings
+from django.middleware.csrf import get_token
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.tokens import RefreshToken
 from .models import Scholarship
+from .renderers import json_response
+
+_token_authentication = JWTStatelessUserAuthentication()
+
+
+class Identity(NamedTuple):
+    user_type: str
+    user_id: int
+
+
+async def aget_identity(request):
+    """
+    get_identity for async views, which get a plain Django request rather than
+    one DRF has already authenticated. Raises AuthenticationFailed for a bad token.
+    """
+    authenticated = _token_authentication.authenticate(request)
+    if authenticated is not None:
+        token = authenticated[1]
+        return Identity(token.get('user_type'), token.get('user_id'))
+
+    if settings.AUTH_SESSION_FALLBACK and await request.session.aget('is_authenticated', False):
+        return Identity(await request.session.aget('user_type'), await request.session.aget('user_id'))
+    return None
+
+
+def get_identity(request):
+    """
+    Who is calling: taken from the bearer token when one was sent (checked by
+    signature and expiry only, no database access), otherwise from the session
+    while AUTH_SESSION_FALLBACK is on. Returns None for anonymous requests.
+    """
+    token = getattr(request.user, 'token', None)
+    if token is not None:
+        return Identity(token.get('user_type'), token.get('user_id'))
+
+    if settings.AUTH_SESSION_FALLBACK and request.session.get('is_authenticated', False):
+        return Identity(request.session.get('user_type'), request.session.get('user_id'))
+    return None
+
+
+async def log_in(request, user_type, user_id):
+    """
+    Issue access/refresh tokens carrying the user type and id, and record the
+    login in the session too while AUTH_SESSION_FALLBACK is on.
+    Returns the token fields to include in the login/register response.
+    """
+    refresh = RefreshToken()
+    refresh['user_type'] = user_type
+    refresh['user_id'] = user_id
+    tokens = {
+        'access': str(refresh.access_token),
+        'refresh': str(refresh),
+    }
+
+    if settings.AUTH_SESSION_FALLBACK:
+        await request.session.aupdate({
+            'user_type': user_type,
+            'user_id': user_id,
+            'is_authenticated': True,
+        })
+        tokens['token'] = get_token(request)
+    return tokens
+
 
 # TO check the authentication of a user type
 def check_auth(user_type):
     """
     Decorator to check if user is authenticated and has correct user type.
-    Maintains existing session-based authentication logic.
+    The caller's identity is made available to the view as ``request.identity``.
+    Works on DRF views and on async Django views.
     """
+    def forbidden():
+        return {'error': f'Unauthorized. Only {user_type}s can access this endpoint.'}
+
     def decorator(view_func):
+        if iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapped_view(request, *args, **kwargs):
+                try:
+                    identity = await aget_identity(request)
+                except AuthenticationFailed as e:
+                    return json_response(e.detail, status=status.HTTP_401_UNAUTHORIZED)
+                if identity is None or identity.user_type != user_type:
+                    return json_response(forbidden(), status=status.HTTP_403_FORBIDDEN)
+                request.identity = identity
+                return await view_func(request, *args, **kwargs)
+            return async_wrapped_view
+
         @wraps(view_func)
         def wrapped_view(request, *args, **kwargs):
-            if not request.session.get('is_authenticated', False) or request.session.get('user_type') != user_type:
-                return Response({
-                    'error': f'Unauthorized. Only {user_type}s can access this endpoint.'
-                }, status=status.HTTP_403_FORBIDDEN)
+            identity = get_identity(request)
+            if identity is None or identity.user_type != user_type:
+                return Response(forbidden(), status=status.HTTP_403_FORBIDDEN)
+            request.identity = identity
             return view_func(request, *args, **kwargs)
         return wrapped_view
     return decorator
-
-
@@ -1,120 +1,201 @@
+from asgiref.sync import sync_to_async
 from rest_framework import status
 from . serializers import (
     ProviderLoginSerializer, ProviderRegistrationSerializer, ScholarshipSerializer, 
-    StudentRegistrationSerializer, StudentLoginSerializer, ScholarshipDetailSerializer, ScholarshipListPreviewSerializer,
-    ApplicationFormCreateSerializer, ApplicationFormFieldSerializer, ScholarshipApplicationSerializer
+    StudentRegistrationSerializer, StudentLoginSerializer, ScholarshipDetailSerializer,
+    ApplicationFormCreateSerializer, ApplicationFormFieldSerializer, ScholarshipApplicationSerializer,
+    ScholarshipApplicationListSerializer, ScholarshipSearchResultSerializer, BatchReviewSerializer, JobSerializer
 )
 from rest_framework.decorators import api_view
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.response import Response
-from django.http import JsonResponse
-from django.middleware.csrf import get_token
-from .models import Students, Providers, Scholarship, ApplicationFormField, ScholarshipApplication
-from django.shortcuts import get_object_or_404
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q
+from django.contrib.admin.views.decorators import staff_member_required
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_GET, require_POST
+from .models import Students, Providers, Scholarship, ApplicationFormField, ScholarshipApplication, Job
+from django.shortcuts import aget_object_or_404, get_object_or_404
 from django.utils import timezone
-from .utils import check_auth
+from django.utils.dateparse import parse_datetime
+from . import caching, instrumentation, jobs, letters, notifications, rows
+from .exports import EXPORT_FORMATS, astream_export, stream_export
+from .hashers import acheck_user_password, run_hasher
+from .pagination import InvalidCursor, apaginate_by_keyset, get_page_size, paginate_by_keyset
+from .parsers import loads
+from .recommendations import feature_table
+from .renderers import json_response
+from .search import search_scholarships as search_scholarships_by_rank
+from .storage import UploadRejected, get_storage, store_upload, validate_upload
+from .utils import aget_identity, check_auth, get_identity, log_in
+
+def parse_request_data(request):
+    """
+    Body of a JSON or form-encoded request for the async views, which don't go through DRF's parsers.
+    Returns None if a JSON body can't be decoded.
+    """
+    if request.content_type == 'application/json':
+        try:
+            return loads(request.body or b'{}')
+        except ValueError:
+            return None
+    return request.POST
+
+
+INVALID_BODY = {'error': ['Request body must be valid JSON']}
+
 
 # For Student and Provider Registration
-@api_view(['POST'])
-def student_register(request):
-    serializer = StudentRegistrationSerializer(data=request.data)
-    if serializer.is_valid():
-        student = serializer.save()
+# These views are async so that, under ASGI, password hashing runs in the hashing
+# pool instead of holding up the thread that serves every other sync view
+@csrf_exempt
+@require_POST
+async def student_register(request):
+    data = parse_request_data(request)
+    if data is None:
+        return JsonResponse(INVALID_BODY, status=status.HTTP_400_BAD_REQUEST)
 
-        request.session['user_type'] = 'student'
-        request.session['user_id'] = student.id 
-        request.session['is_authenticated'] = True
+    serializer = StudentRegistrationSerializer(data=data)
+    if await sync_to_async(serializer.is_valid)():
+        encoded = await run_hasher(make_password, serializer.validated_data['password'])
+        student = await sync_to_async(serializer.save)(encoded_password=encoded)
+        tokens = await log_in(request, 'student', student.id)
 
-        return Response({
+        return JsonResponse({
             'message': 'Registration Successful',
             'id': student.id,
             'email': student.email,
             'firstName': student.firstName,
             'lastName': student.lastName,
-            'token': get_token(request) 
+            **tokens
         }, status=status.HTTP_201_CREATED)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['POST'])
-def student_login(request):
-    serializer = StudentLoginSerializer(data=request.data)
-    if serializer.is_valid():
-        student = serializer.validated_data['student']
-        # Store student details in session
-        request.session['user_type'] = 'student'
-        request.session['user_id'] = student.id
-        request.session['is_authenticated'] = True
-        
-        return Response({
-            'message': 'Login successful',
-            'id': student.id,
-            'email': student.email,
-            'firstName': student.firstName,
-            'lastName': student.lastName,
-            'token': get_token(request)
-        })
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+@csrf_exempt
+@require_POST
+async def student_login(request):
+    data = parse_request_data(request)
+    if data is None:
+        return JsonResponse(INVALID_BODY, status=status.HTTP_400_BAD_REQUEST)
 
+    serializer = StudentLoginSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-@api_view(['POST'])
-def provider_register(request):
-    serializer = ProviderRegistrationSerializer(data=request.data)
-    if serializer.is_valid():
-        provider = serializer.save()
-        # Store provider details in session
-        request.session['user_type'] = 'provider'
-        request.session['user_id'] = provider.id
-        request.session['is_authenticated'] = True
+    student = await Students.objects.filter(email=serializer.validated_data['email']).afirst()
+    if student is None:
+        return JsonResponse({
+            'error': ['No student account found with this email']
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not await acheck_user_password(student, serializer.validated_data['password']):
+        return JsonResponse({
+            'error': ['Invalid password']
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    tokens = await log_in(request, 'student', student.id)
+    return JsonResponse({
+        'message': 'Login successful',
+        'id': student.id,
+        'email': student.email,
+        'firstName': student.firstName,
+        'lastName': student.lastName,
+        **tokens
+    })
+
+
+@csrf_exempt
+@require_POST
+async def provider_register(request):
+    data = parse_request_data(request)
+    if data is None:
+        return JsonResponse(INVALID_BODY, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = ProviderRegistrationSerializer(data=data)
+    if await sync_to_async(serializer.is_valid)():
+        encoded = await run_hasher(make_password, serializer.validated_data['password'])
+        provider = await sync_to_async(serializer.save)(encoded_password=encoded)
+        tokens = await log_in(request, 'provider', provider.id)
         
-        return Response({
+        return JsonResponse({
             'message': 'Registration successful',
             'id': provider.id,
             'organizationName': provider.organizationName,
             'organizationEmail': provider.organizationEmail,
             'organizationWebsite': provider.organizationWebsite,
-            'token': get_token(request)
+            **tokens
         }, status=status.HTTP_201_CREATED)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+@csrf_exempt
+@require_POST
+async def provider_login(request):
+    data = parse_request_data(request)
+    if data is None:
+        return JsonResponse(INVALID_BODY, status=status.HTTP_400_BAD_REQUEST)
+
+    serializer = ProviderLoginSerializer(data=data)
+    if not serializer.is_valid():
+        return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    provider = await Providers.objects.filter(
+        organizationEmail=serializer.validated_data['organizationEmail']
+    ).afirst()
+    if provider is None:
+        return JsonResponse({
+            'error': ['No provider account found with this email']
+        }, status=status.HTTP_400_BAD_REQUEST)
+    if not await acheck_user_password(provider, serializer.validated_data['password']):
+        return JsonResponse({
+            'error': ['Invalid password']
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    tokens = await log_in(request, 'provider', provider.id)
+    return JsonResponse({
+        'message': 'Login successful',
+        'id': provider.id,
+        'organizationName': provider.organizationName,
+        'organizationEmail': provider.organizationEmail,
+        'organizationWebsite': provider.organizationWebsite,
+        **tokens
+    })
 
 
 @api_view(['POST'])
-def provider_login(request):
-    serializer = ProviderLoginSerializer(data=request.data)
-    if serializer.is_valid():
-        provider = serializer.validated_data['provider']
-        # Store provider details in session
-        request.session['user_type'] = 'provider'
-        request.session['user_id'] = provider.id
-        request.session['is_authenticated'] = True
-        
-        return Response({
-            'message': 'Login successful',
-            'id': provider.id,
-            'organizationName': provider.organizationName,
-            'organizationEmail': provider.organizationEmail,
-            'organizationWebsite': provider.organizationWebsite,
-            'token': get_token(request)
-        })
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+def token_refresh(request):
+    """
+    Exchange a refresh token for a new access token. Stateless: no database access.
+    """
+    try:
+        refresh = RefreshToken(request.data.get('refresh', ''))
+    except TokenError as e:
+        return Response({'error': str(e)}, status=status.HTTP_401_UNAUTHORIZED)
+    return Response({'access': str(refresh.access_token)})
 
 
 @api_view(['POST'])
 def user_logout(request):
-    # Clear all session data
+    # Clear all session data; token clients log out by discarding their tokens
     request.session.flush()
     return Response({'message': 'Logged out successfully'})
 
 
 @api_view(['GET'])
 def get_session_status(request):
-    if not request.session.get('is_authenticated', False):
+    identity = get_identity(request)
+    if identity is None:
         return Response({
             'is_authenticated': False,
             'user': None
         })
     
-    user_type = request.session.get('user_type')
-    user_id = request.session.get('user_id')
+    user_type, user_id = identity
     
     try:
         if user_type == 'student':
@@ -151,37 +232,12 @@ def get_session_status(request):
         })
     
 
-def session_authentication_middleware(get_response):
-    def middleware(request):
-        # Check if request path requires authentication
-        protected_paths = ['/protected-endpoint']  # Add your protected endpoints
-        
-        if request.path in protected_paths:
-            is_authenticated = request.session.get('is_authenticated', False)
-            user_type = request.session.get('user_type')
-            
-            if not is_authenticated:
-                return JsonResponse({
-                    'error': 'Authentication required'
-                }, status=status.HTTP_401_UNAUTHORIZED)
-        
-        response = get_response(request)
-        return response
-    
-    return middleware
-
-
 @api_view(['POST'])
 @check_auth('provider')
 def create_scholarships(request):
-    # Check if the user is authenticated as a provider
     # Now to obtain the provider
-    user_type = request.session.get('user_type')
-    if user_type != 'provider':
-        return Response({'error': 'Only providers can create scholarships'}, status=status.HTTP_403_FORBIDDEN)
-    
     try:
-        provider = Providers.objects.get(id=request.session['user_id'])
+        provider = Providers.objects.get(id=request.identity.user_id)
     except Providers.DoesNotExist:
         request.session.flush()
         return Response({'error': 'Provider account not found'}, status=status.HTTP_404_NOT_FOUND)
@@ -191,9 +247,8 @@ def create_scholarships(request):
 
     serializer = ScholarshipSerializer(data=scholarship_data)
     if serializer.is_valid():
-        scholarship = serializer.save(provider=provider)
-        scholarship.status = 'ACTIVE'
-        scholarship.save()
+        # Scholarship.save() activates new scholarships, so a single insert is enough
+        serializer.save(provider=provider)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -210,7 +265,7 @@ def update_scholarship(request, scholarship_id):
         scholarship = get_object_or_404(Scholarship, id=scholarship_id)
         
         # Authorization check - ensure provider owns the scholarship
-        if scholarship.provider.id != request.session['user_id']:
+        if scholarship.provider_id != request.identity.user_id:
             return Response({
                 'error': 'You do not have permission to update this scholarship.'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -243,18 +298,18 @@ def update_scholarship(request, scholarship_id):
                         'error': 'Maximum applications cannot be less than current applicants.'
                     }, status=status.HTTP_400_BAD_REQUEST)
 
-            # Save the updated scholarship
-            updated_scholarship = serializer.save()
-            
             # Update status based on conditions
-            if updated_scholarship.deadline < timezone.now():
-                updated_scholarship.status = 'EXPIRED'
-            elif updated_scholarship.current_applicants >= updated_scholarship.max_applications:
-                updated_scholarship.status = 'CLOSED'
+            deadline = serializer.validated_data.get('deadline', scholarship.deadline)
+            max_applications = serializer.validated_data.get('max_applications', scholarship.max_applications)
+            if deadline < timezone.now():
+                new_status = 'EXPIRED'
+            elif scholarship.current_applicants >= max_applications:
+                new_status = 'CLOSED'
             else:
-                updated_scholarship.status = 'ACTIVE'
-            
-            updated_scholarship.save()
+                new_status = 'ACTIVE'
+
+            # Save the updated scholarship and its status in one write
+            updated_scholarship = serializer.save(status=new_status)
             
             return Response({
                 'message': 'Scholarship updated successfully',
@@ -274,7 +329,8 @@ def delete_scholarship(request, scholarship_id):
     Delete a scholarship. Only the scholarship provider can delete their own scholarships.
     """
     # Authentication check
-    if not request.session.get('is_authenticated', False) or request.session.get('user_type') != 'provider':
+    identity = get_identity(request)
+    if identity is None or identity.user_type != 'provider':
         return Response({
             'error': 'Unauthorized. Only providers can delete scholarships.'
         }, status=status.HTTP_403_FORBIDDEN)
@@ -283,7 +339,7 @@ def delete_scholarship(request, scholarship_id):
         scholarship = get_object_or_404(Scholarship, id=scholarship_id)
         
         # Authorization check - ensure provider owns the scholarship
-        if scholarship.provider.id != request.session['user_id']:
+        if scholarship.provider_id != identity.user_id:
             return Response({
                 'error': 'You do not have permission to delete this scholarship.'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -306,41 +362,130 @@ def delete_scholarship(request, scholarship_id):
         }, status=status.HTTP_404_NOT_FOUND)
 
 
-@api_view(['GET'])
-def list_scholarships(request):
+@require_GET
+async def list_scholarships(request):
     """
-    List all active scholarships with basic preview information.
+    List active scholarships with basic preview information.
+    Results are ordered by deadline and paginated with an opaque ``cursor``.
+    Optional filters: educationLevel, provider, deadline_after, deadline_before.
     """
-    scholarships = Scholarship.objects.filter(
-        status='ACTIVE'
-    ).select_related('provider').order_by('deadline')
-    
-    serializer = ScholarshipListPreviewSerializer(scholarships, many=True)
-    return Response(serializer.data)
+    # The deadline filter hides scholarships that expired since the last expiry run
+    scholarships = Scholarship.objects.filter(status='ACTIVE', deadline__gt=timezone.now())
+
+    education_level = request.GET.get('educationLevel')
+    if education_level:
+        scholarships = scholarships.filter(educationLevel=education_level)
+
+    provider_id = request.GET.get('provider')
+    if provider_id:
+        if not provider_id.isdigit():
+            return json_response({
+                'error': 'provider must be a provider id'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        scholarships = scholarships.filter(provider_id=provider_id)
+
+    for param, lookup in (('deadline_after', 'deadline__gte'), ('deadline_before', 'deadline__lte')):
+        value = request.GET.get(param)
+        if value:
+            try:
+                deadline = parse_datetime(value)
+            except ValueError:
+                deadline = None
+            if deadline is None:
+                return json_response({
+                    'error': f'{param} must be an ISO 8601 datetime'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            scholarships = scholarships.filter(**{lookup: deadline})
+
+    async def build():
+        # Same output as ScholarshipListPreviewSerializer, built from .values() rows
+        page, next_cursor = await apaginate_by_keyset(rows.scholarship_previews(scholarships), request, 'deadline')
+        return {
+            'next_cursor': next_cursor,
+            'results': [rows.scholarship_preview(row) for row in page]
+        }
+
+    def max_age(data):
+        # The page is ordered by deadline; once its first deadline passes, the query drops that row
+        if data['results']:
+            return (parse_datetime(data['results'][0]['deadline']) - timezone.now()).total_seconds()
+        return None
+
+    try:
+        data, etag, hit = await caching.aget_or_build(
+            'list_scholarships', [caching.SCHOLARSHIP_LIST], sorted(request.GET.lists()), build, max_age
+        )
+    except InvalidCursor as e:
+        return json_response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+    return caching.cached_response(request, data, etag, hit)
 
 @api_view(['GET'])
-def scholarship_detail(request, scholarship_id):
+def search_scholarships(request):
+    """
+    Full-text search over active scholarships' title, description and requirements.
+    Results are ranked best match first and paginated with ``page``/``page_size``.
+    """
+    query = request.GET.get('q', '').strip()
+    if not query:
+        return Response({
+            'error': 'A search query (q) is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    try:
+        page = max(int(request.GET.get('page', 1)), 1)
+    except ValueError:
+        page = 1
+    page_size = get_page_size(request)
+
+    def build():
+        total, scholarships = search_scholarships_by_rank(query, (page - 1) * page_size, page_size)
+        return {
+            'count': total,
+            'page': page,
+            'results': ScholarshipSearchResultSerializer(scholarships, many=True).data
+        }
+
+    data, etag, hit = caching.get_or_build(
+        'search_scholarships', [caching.SCHOLARSHIP_LIST], [query, page, page_size], build
+    )
+    return caching.cached_response(request, data, etag, hit)
+
+
+@require_GET
+async def scholarship_detail(request, scholarship_id):
     """
     Get complete detailed information about a specific scholarship.
     """
+    async def build():
+        scholarship = await Scholarship.objects.select_related('provider').aget(id=scholarship_id)
+        return {
+            'status': scholarship.status,
+            'provider_id': scholarship.provider_id,
+            'scholarship': ScholarshipDetailSerializer(scholarship).data
+        }
+
     try:
-        scholarship = Scholarship.objects.select_related('provider').get(id=scholarship_id)
+        cached, etag, hit = await caching.aget_or_build(
+            'scholarship_detail', [caching.scholarship_scope(scholarship_id)], scholarship_id, build
+        )
         
         # Only provider can view their non-active scholarships
-        if scholarship.status != 'ACTIVE':
+        if cached['status'] != 'ACTIVE':
             # i set it to active, remember to change it to active
-            if not request.session.get('is_authenticated') or \
-               request.session.get('user_type') != 'provider' or \
-               request.session.get('user_id') != scholarship.provider.id:
-                return Response({
+            try:
+                identity = await aget_identity(request)
+            except AuthenticationFailed:
+                identity = None
+            if identity != ('provider', cached['provider_id']):
+                return json_response({
                     'error': 'Scholarship not available'
                 }, status=status.HTTP_404_NOT_FOUND)
         
-        serializer = ScholarshipDetailSerializer(scholarship)
-        return Response(serializer.data)
+        return caching.cached_response(request, cached['scholarship'], etag, hit)
         
     except Scholarship.DoesNotExist:
-        return Response({
+        return json_response({
             'error': 'Scholarship not found'
         }, status=status.HTTP_404_NOT_FOUND)
     
@@ -355,16 +500,17 @@ def create_application_form(request, scholarship_id):
         scholarship = get_object_or_404(Scholarship, id=scholarship_id)
         
         # Verify provider owns this scholarship
-        if scholarship.provider.id != request.session['user_id']:
+        if scholarship.provider_id != request.identity.user_id:
             return Response({
                 'error': 'You do not have permission to modify this scholarship'
             }, status=status.HTTP_403_FORBIDDEN)
         
         serializer = ApplicationFormCreateSerializer(data=request.data, context={'scholarship': scholarship})
         if serializer.is_valid():
-            serializer.save(scholarship=scholarship)
+            fields = serializer.save(scholarship=scholarship)
             return Response({
-                'message': 'Application form created successfully'
+                'message': 'Application form created successfully',
+                'fields': ApplicationFormFieldSerializer(fields, many=True).data
             }, status=status.HTTP_201_CREATED)
             
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -374,19 +520,24 @@ def create_application_form(request, scholarship_id):
             'error': 'Scholarship not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
-@api_view(['GET'])
-def get_application_form(request, scholarship_id):
+@require_GET
+async def get_application_form(request, scholarship_id):
     """
     Get application form fields for a scholarship
     """
+    async def build():
+        scholarship = await aget_object_or_404(Scholarship, id=scholarship_id)
+        fields = [field async for field in ApplicationFormField.objects.filter(scholarship=scholarship)]
+        return ApplicationFormFieldSerializer(fields, many=True).data
+
     try:
-        scholarship = get_object_or_404(Scholarship, id=scholarship_id)
-        fields = ApplicationFormField.objects.filter(scholarship=scholarship)
-        serializer = ApplicationFormFieldSerializer(fields, many=True)
-        return Response(serializer.data)
+        data, etag, hit = await caching.aget_or_build(
+            'get_application_form', [caching.scholarship_scope(scholarship_id)], scholarship_id, build
+        )
+        return caching.cached_response(request, data, etag, hit)
         
-    except Scholarship.DoesNotExist:
-        return Response({
+    except Http404:
+        return json_response({
             'error': 'Scholarship not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
@@ -397,8 +548,8 @@ def submit_application(request, scholarship_id):
     Allow students to submit scholarship applications
     """
     try:
-        scholarship = get_object_or_404(Scholarship, id=scholarship_id)
-        student = get_object_or_404(Students, id=request.session['user_id'])
+        scholarship = get_object_or_404(Scholarship.objects.select_related('provider'), id=scholarship_id)
+        student = get_object_or_404(Students, id=request.identity.user_id)
         
         # Check if student already applied
         if ScholarshipApplication.objects.filter(scholarship=scholarship, student=student).exists():
@@ -410,6 +561,17 @@ def submit_application(request, scholarship_id):
         form_fields = ApplicationFormField.objects.filter(scholarship=scholarship)
         responses = request.data.get('responses', {})
         files = request.FILES
+
+        # Multipart submissions carry the responses as a JSON string next to the files
+        if isinstance(responses, str):
+            try:
+                responses = loads(responses)
+            except ValueError:
+                responses = None
+        if not isinstance(responses, dict):
+            return Response({
+                'error': 'responses must be a JSON object'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         # Validate required fields
         for field in form_fields:
@@ -418,32 +580,45 @@ def submit_application(request, scholarship_id):
                     return Response({
                         'error': f'Field {field.label} is required'
                     }, status=status.HTTP_400_BAD_REQUEST)
+
+        # Validate uploads against their file fields before storing anything
+        fields_by_id = {str(field.id): field for field in form_fields}
+        for field_id, file in files.items():
+            if field_id not in fields_by_id:
+                return Response({
+                    'error': f'Unknown file field {field_id}'
+                }, status=status.HTTP_400_BAD_REQUEST)
+            try:
+                validate_upload(fields_by_id[field_id], file)
+            except UploadRejected as e:
+                return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Store files outside the transaction; they are content-addressed, so a
+        # failed submission only leaves a copy that a later upload can reuse
+        file_paths = {field_id: store_upload(file) for field_id, file in files.items()}
         
-        # Create application
-        application = ScholarshipApplication.objects.create(
-            scholarship=scholarship,
-            student=student,
-            responses=responses,
-            files={},  # Will be updated with file paths after upload
-            status='SUBMITTED',
-            submitted_at=timezone.now()
-        )
-        
-        # Handle file uploads
-        if files:
-            file_paths = {}
-            for field_id, file in files.items():
-                # Save file and store path
-                path = f'applications/{application.id}/{file.name}'
-                # Here you would implement file storage logic
-                file_paths[field_id] = path
-            
-            application.files = file_paths
-            application.save()
-        
-        # Update scholarship application count
-        scholarship.current_applicants += 1
-        scholarship.save()
+        # Take a slot and create the application in one transaction, so a full
+        # scholarship or a concurrent duplicate submission leaves nothing behind
+        try:
+            with transaction.atomic():
+                if not scholarship.add_applicant():
+                    return Response({
+                        'error': 'This scholarship is no longer accepting applications'
+                    }, status=status.HTTP_400_BAD_REQUEST)
+
+                application = ScholarshipApplication.objects.create(
+                    scholarship=scholarship,
+                    student=student,
+                    responses=responses,
+                    files=file_paths,
+                    status='SUBMITTED',
+                    submitted_at=timezone.now()
+                )
+                notifications.application_submitted(application, scholarship, student)
+        except IntegrityError:
+            return Response({
+                'error': 'You have already applied for this scholarship'
+            }, status=status.HTTP_400_BAD_REQUEST)
         
         return Response({
             'message': 'Application submitted successfully',
@@ -463,10 +638,6 @@ making sure that students can not create application forms
 mplement password reset functionality for students and providers.
 Add email verification upon signup to enhance security and prevent spam registrations.
 Implement automatic status updates for scholarships based on deadlines (e.g., close applications when the deadline passes).
-Notify providers when their scholarship is approaching its deadline.
-Add a basic notification system:
-Notify students when their application status changes.
-Notify providers about new applications.
 Optionally implement a messaging system to facilitate communication between providers and students.
 '''
 
@@ -475,30 +646,45 @@ Optionally implement a messaging system to facilitate communication between prov
 @check_auth('provider')
 def list_scholarship_applications(request, scholarship_id):
     """
-    List all applications for a specific scholarship
+    List applications for a specific scholarship, newest first, in compact form
+    with per-status counts. Paginated with an opaque ``cursor``.
     Only accessible by the scholarship provider
     """
     try:
         scholarship = get_object_or_404(Scholarship, id=scholarship_id)
         
         # Verify provider owns this scholarship
-        if scholarship.provider.id != request.session['user_id']:
+        if scholarship.provider_id != request.identity.user_id:
             return Response({
                 'error': 'You do not have permission to view these applications'
             }, status=status.HTTP_403_FORBIDDEN)
         
+        # Count every status in a single aggregate query
+        all_applications = ScholarshipApplication.objects.filter(scholarship=scholarship)
+        status_counts = all_applications.aggregate(**{
+            code: Count('id', filter=Q(status=code))
+            for code, _ in ScholarshipApplication.STATUS_CHOICES
+        })
+
         # Get applications with optional status filter
         status_filter = request.GET.get('status', None)
-        applications = ScholarshipApplication.objects.filter(scholarship=scholarship)
-        
+        applications = ScholarshipApplicationListSerializer.setup_eager_loading(all_applications)
         if status_filter:
             applications = applications.filter(status=status_filter)
-        
-        applications = applications.order_by('-submitted_at')
-        
-        serializer = ScholarshipApplicationSerializer(applications, many=True)
+            total_applications = status_counts.get(status_filter, 0)
+        else:
+            total_applications = sum(status_counts.values())
+
+        try:
+            page, next_cursor = paginate_by_keyset(applications, request, 'submitted_at', descending=True)
+        except InvalidCursor as e:
+            return Response({'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        serializer = ScholarshipApplicationListSerializer(page, many=True)
         return Response({
-            'total_applications': applications.count(),
+            'total_applications': total_applications,
+            'status_counts': status_counts,
+            'next_cursor': next_cursor,
             'applications': serializer.data
         })
         
@@ -507,6 +693,128 @@ def list_scholarship_applications(request, scholarship_id):
             'error': 'Scholarship not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
+@require_GET
+@check_auth('provider')
+async def export_scholarship_applications(request, scholarship_id, export_format):
+    """
+    Stream every application for a scholarship as CSV or NDJSON, with form
+    responses flattened into one value per field label.
+    Only accessible by the scholarship provider
+    """
+    export = EXPORT_FORMATS.get(export_format)
+    if export is None:
+        return json_response({
+            'error': f'Export format must be one of: {", ".join(EXPORT_FORMATS)}'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    scholarship = await Scholarship.objects.filter(id=scholarship_id).only('id', 'provider_id').afirst()
+    if scholarship is None:
+        return json_response({
+            'error': 'Scholarship not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if scholarship.provider_id != request.identity.user_id:
+        return json_response({
+            'error': 'You do not have permission to export these applications'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    # Each server streams its own kind of iterator without buffering it
+    if isinstance(request, ASGIRequest):
+        content = astream_export(scholarship, export)
+    else:
+        content = stream_export(scholarship, export)
+    response = StreamingHttpResponse(content, content_type=export.content_type)
+    response['Content-Disposition'] = f'attachment; filename="scholarship-{scholarship.id}-applications.{export_format}"'
+    return response
+
+@api_view(['POST'])
+@check_auth('provider')
+def queue_application_export(request, scholarship_id, export_format):
+    """
+    Queue an export of every application for a scholarship as a background job.
+    Poll /jobs/{id}/ and download from /jobs/{id}/result/ once it has succeeded.
+    Repeating a request with the same Idempotency-Key header returns the same job.
+    Only accessible by the scholarship provider
+    """
+    if export_format not in EXPORT_FORMATS:
+        return Response({
+            'error': f'Export format must be one of: {", ".join(EXPORT_FORMATS)}'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    scholarship = Scholarship.objects.filter(id=scholarship_id).only('id', 'provider_id').first()
+    if scholarship is None:
+        return Response({
+            'error': 'Scholarship not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if scholarship.provider_id != request.identity.user_id:
+        return Response({
+            'error': 'You do not have permission to export these applications'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    key = request.headers.get('Idempotency-Key')
+    job, created = jobs.enqueue(
+        'export_applications', {'scholarship_id': scholarship.id, 'export_format': export_format},
+        idempotency_key=f'provider:{request.identity.user_id}:{key}' if key else None,
+        owner=request.identity
+    )
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+@api_view(['POST'])
+@check_auth('provider')
+def queue_letter_export(request, scholarship_id):
+    """
+    Queue the letters of every applicant to a scholarship as a background job that
+    writes them to an NDJSON file, like stream_application_letters.
+    Poll /jobs/{id}/ and download from /jobs/{id}/result/ once it has succeeded.
+    Repeating a request with the same Idempotency-Key header returns the same job.
+    Only accessible by the scholarship provider
+    """
+    scholarship = Scholarship.objects.filter(id=scholarship_id).only('id', 'provider_id').first()
+    if scholarship is None:
+        return Response({
+            'error': 'Scholarship not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if scholarship.provider_id != request.identity.user_id:
+        return Response({
+            'error': 'You do not have permission to view these applications'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    key = request.headers.get('Idempotency-Key')
+    job, created = jobs.enqueue(
+        'export_application_letters', {'scholarship_id': scholarship.id},
+        idempotency_key=f'provider:{request.identity.user_id}:{key}' if key else None,
+        owner=request.identity
+    )
+    return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED if created else status.HTTP_200_OK)
+
+@require_GET
+@check_auth('provider')
+async def stream_application_letters(request, scholarship_id):
+    """
+    Stream the application letter of every applicant to a scholarship as NDJSON,
+    one ``{application_id, student_id, letter}`` object per line.
+    Only accessible by the scholarship provider
+    """
+    scholarship = await Scholarship.objects.filter(id=scholarship_id).select_related('provider').only(
+        'id', 'title', 'deadline', 'letter_template', 'provider__organizationName'
+    ).afirst()
+    if scholarship is None:
+        return json_response({
+            'error': 'Scholarship not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    if scholarship.provider_id != request.identity.user_id:
+        return json_response({
+            'error': 'You do not have permission to view these applications'
+        }, status=status.HTTP_403_FORBIDDEN)
+
+    provider_name = scholarship.provider.organizationName
+    if isinstance(request, ASGIRequest):
+        content = letters.astream_letters(scholarship, provider_name)
+    else:
+        content = letters.stream_letters(scholarship, provider_name)
+    response = StreamingHttpResponse(content, content_type='application/x-ndjson')
+    response['Content-Disposition'] = f'attachment; filename="scholarship-{scholarship.id}-letters.ndjson"'
+    return response
+
 @api_view(['GET'])
 @check_auth('provider')
 def get_application_detail(request, application_id):
@@ -515,10 +823,13 @@ def get_application_detail(request, application_id):
     Only accessible by the scholarship provider
     """
     try:
-        application = get_object_or_404(ScholarshipApplication, id=application_id)
+        application = get_object_or_404(
+            ScholarshipApplicationSerializer.setup_eager_loading(ScholarshipApplication.objects.all()),
+            id=application_id
+        )
         
         # Verify provider owns the scholarship
-        if application.scholarship.provider.id != request.session['user_id']:
+        if application.scholarship.provider.id != request.identity.user_id:
             return Response({
                 'error': 'You do not have permission to view this application'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -539,10 +850,13 @@ def review_application(request, application_id):
     Only accessible by the scholarship provider
     """
     try:
-        application = get_object_or_404(ScholarshipApplication, id=application_id)
+        application = get_object_or_404(
+            ScholarshipApplicationSerializer.setup_eager_loading(ScholarshipApplication.objects.all()),
+            id=application_id
+        )
         
         # Verify provider owns the scholarship
-        if application.scholarship.provider.id != request.session['user_id']:
+        if application.scholarship.provider.id != request.identity.user_id:
             return Response({
                 'error': 'You do not have permission to review this application'
             }, status=status.HTTP_403_FORBIDDEN)
@@ -558,7 +872,11 @@ def review_application(request, application_id):
         application.status = new_status
         application.reviewed_at = timezone.now()
         application.review_notes = request.data.get('notes', '')
-        application.save()
+        with transaction.atomic():
+            application.save()
+            notifications.applications_reviewed([
+                (application, application.scholarship.title, application.student.email)
+            ])
         
         serializer = ScholarshipApplicationSerializer(application)
         return Response({
@@ -571,25 +889,132 @@ def review_application(request, application_id):
             'error': 'Application not found'
         }, status=status.HTTP_404_NOT_FOUND)
 
-@api_view(['GET'])
+@api_view(['POST'])
+@check_auth('provider')
+def review_applications(request):
+    """
+    Accept or reject many applications at once. Takes ``reviews``: a list of
+    ``{id, status, notes}``, and returns one compact result per review.
+    Applications of other providers' scholarships are skipped as forbidden.
+    """
+    serializer = BatchReviewSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    reviews = serializer.validated_data['reviews']
+    now = timezone.now()
+
+    with transaction.atomic():
+        # Load every application with its scholarship's provider in one query, locking them for the update
+        applications = {
+            application.id: application
+            for application in ScholarshipApplication.objects.filter(
+                id__in=[review['id'] for review in reviews]
+            ).select_for_update(of=('self',)).annotate(
+                provider_id=F('scholarship__provider_id'),
+                scholarship_title=F('scholarship__title'),
+                student_email=F('student__email'),
+            ).only('id', 'status', 'reviewed_at', 'review_notes')
+        }
+
+        results, reviewed = [], []
+        for review in reviews:
+            application = applications.get(review['id'])
+            if application is None:
+                results.append({'id': review['id'], 'result': 'not_found'})
+            elif application.provider_id != request.identity.user_id:
+                results.append({'id': review['id'], 'result': 'forbidden'})
+            else:
+                application.status = review['status']
+                application.review_notes = review['notes']
+                application.reviewed_at = now
+                application.updated_at = now
+                reviewed.append(application)
+                results.append({'id': review['id'], 'result': 'updated', 'status': review['status']})
+
+        ScholarshipApplication.objects.bulk_update(
+            reviewed, ['status', 'review_notes', 'reviewed_at', 'updated_at'], batch_size=500
+        )
+        notifications.applications_reviewed([
+            (application, application.scholarship_title, application.student_email) for application in reviewed
+        ])
+
+    return Response({
+        'updated': len(reviewed),
+        'results': results
+    })
+
+@require_GET
 @check_auth('student')
-def list_student_applications(request):
+async def list_student_applications(request):
     """
     List all applications submitted by the current student
     """
     try:
         applications = ScholarshipApplication.objects.filter(
-            student_id=request.session['user_id']
+            student_id=request.identity.user_id
         ).order_by('-submitted_at')
         
-        serializer = ScholarshipApplicationSerializer(applications, many=True)
-        return Response(serializer.data)
+        # Same output as ScholarshipApplicationSerializer, built from .values() rows
+        return json_response(await rows.aserialize_applications(applications))
         
     except Exception as e:
-        return Response({
+        return json_response({
             'error': str(e)
         }, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['GET'])
+@check_auth('student')
+def recommend_scholarships(request):
+    """
+    Open scholarships ranked for the current student by education level match,
+    deadline urgency, remaining places and similarity to their past applications.
+    Returns up to ``page_size`` (default 20, max 100), best first.
+    """
+    try:
+        student = Students.objects.only('educationLevel').get(id=request.identity.user_id)
+    except Students.DoesNotExist:
+        return Response({
+            'error': 'Student not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    applied_ids = list(ScholarshipApplication.objects.filter(student=student).values_list('scholarship_id', flat=True))
+    limit = get_page_size(request)
+
+    feature_table.refresh()
+    # Ask for a few extra in case some closed since the feature table's last refresh
+    ranked = feature_table.score(student.educationLevel, applied_ids, limit + 10)
+
+    open_scholarships = Scholarship.objects.filter(
+        id__in=[scholarship_id for scholarship_id, _ in ranked], status='ACTIVE', deadline__gt=timezone.now()
+    )
+    previews = {row['id']: row for row in rows.scholarship_previews(open_scholarships)}
+    results = [
+        {**rows.scholarship_preview(previews[scholarship_id]), 'score': round(score, 4)}
+        for scholarship_id, score in ranked if scholarship_id in previews
+    ]
+    return Response({'results': results[:limit]})
+
+@api_view(['GET'])
+@check_auth('student')
+def get_application_letter(request, application_id):
+    """
+    Generate an application letter from the student's profile and form responses,
+    using the scholarship's letter template
+    Only accessible by the student who submitted the application
+    """
+    application = ScholarshipApplication.objects.filter(
+        id=application_id, student_id=request.identity.user_id
+    ).select_related('student', 'scholarship__provider').first()
+    if application is None:
+        return Response({
+            'error': 'Application not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+
+    return Response({
+        'application_id': application.id,
+        'letter': letters.application_letter(application)
+    })
+
 @api_view(['GET'])
 @check_auth('student')
 def get_application_status(request, application_id):
@@ -599,9 +1024,9 @@ def get_application_status(request, application_id):
     """
     try:
         application = get_object_or_404(
-            ScholarshipApplication,
+            ScholarshipApplicationSerializer.setup_eager_loading(ScholarshipApplication.objects.all()),
             id=application_id,
-            student_id=request.session['user_id']
+            student_id=request.identity.user_id
         )
         
         serializer = ScholarshipApplicationSerializer(application)
@@ -610,4 +1035,57 @@ def get_application_status(request, application_id):
     except ScholarshipApplication.DoesNotExist:
         return Response({
             'error': 'Application not found'
-        }, status=status.HTTP_404_NOT_FOUND)
\ No newline at end of file
+        }, status=status.HTTP_404_NOT_FOUND)
+
+
+def get_owned_job(request, job_id):
+    # Jobs are only visible to the user who queued them
+    identity = get_identity(request)
+    if identity is None:
+        return None
+    return Job.objects.filter(id=job_id, owner_type=identity.user_type, owner_id=identity.user_id).first()
+
+@api_view(['GET'])
+def job_status(request, job_id):
+    """
+    Status of a background job, with its result once it has succeeded
+    Only accessible by the user who queued it
+    """
+    job = get_owned_job(request, job_id)
+    if job is None:
+        return Response({
+            'error': 'Job not found'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return Response(JobSerializer(job).data)
+
+@api_view(['GET'])
+def download_job_result(request, job_id):
+    """
+    Download the file a succeeded job wrote, such as an application export
+    Only accessible by the user who queued it
+    """
+    job = get_owned_job(request, job_id)
+    if job is None or job.status != 'SUCCEEDED' or 'path' not in (job.result or {}):
+        return Response({
+            'error': 'No file for this job'
+        }, status=status.HTTP_404_NOT_FOUND)
+    return FileResponse(
+        get_storage().open(job.result['path']), as_attachment=True,
+        filename=job.result['filename'], content_type=job.result['content_type']
+    )
+
+@staff_member_required
+def cache_stats(request):
+    """
+    Response cache hit/miss counters for this process. Staff only.
+    """
+    return JsonResponse(caching.stats())
+
+
+@staff_member_required
+def metrics(request):
+    """
+    Request, database and response cache metrics for this process, in the
+    Prometheus text format. Staff only.
+    """
+    return HttpResponse(instrumentation.render_metrics(), content_type='text/plain; version=0.0.4; charset=utf-8')